@@ -0,0 +1,78 @@
+"""
+单根管节拍：仿真轴 + 仿真信号源跑完整流程，对比流水线（边走边算）和串行（算完再走）。
+
+用法（在项目根目录）：
+    python -m bench.bench_cycle
+    python -m bench.bench_cycle --sections 8 --samples-per-rev 400000
+    python -m bench.bench_cycle --edge-search 0     # 不找边，直接走到标称管端
+"""
+
+import argparse
+import asyncio
+
+from logic.acquisition import AcquisitionWorker
+from logic.edges import EdgeScanner
+from logic.measurement_flow import MeasureStep
+from logic.sequencer import SequencePlan, Sequencer, SimAxis, Station, SweepStation
+from logic.session import MeasurementSession
+from logic.simulator import PipeGeometry, PipeSimulator, SimulatedSource
+
+
+def run_once(args, pipeline: bool):
+    # 管子故意不放在标称位置，找边时看得出误差
+    geom = PipeGeometry(length_mm=args.length, start_mm=12.3, ends=args.edge_search > 0)
+    rate = args.samples_per_rev * args.deg_per_s / 360.0
+    sim = PipeSimulator(geom, rate_hz=rate, deg_per_s=args.deg_per_s, seed=1)
+    session = MeasurementSession(max_sections=args.sections, samples_per_rev=args.samples_per_rev)
+    sinks = [session.add_samples]
+
+    def on_move(pos):
+        sim.slide_mm = pos
+
+    slide, rotary = SimAxis(args.slide_speed, on_move=on_move), SimAxis(args.deg_per_s)
+    if args.edge_search > 0:
+        scanner = EdgeScanner(geom.od_mm / 2, geom.od_mm / 4)
+        sinks.append(scanner.add_samples)
+        station = SweepStation(
+            slide, rotary, scanner, edge_positions=(0.0, args.length), search_mm=args.edge_search
+        )
+    else:
+        station = Station(slide, rotary, edge_positions=(0.0, args.length))
+    worker = AcquisitionWorker(SimulatedSource(sim), sinks=sinks)
+    seq = Sequencer(station, SequencePlan(sections=args.sections, pipeline=pipeline))
+    worker.start()
+    try:
+        result = asyncio.run(seq.run(session))
+    finally:
+        worker.stop()
+    if result is None:
+        raise SystemExit(f"sequence failed: {seq.error}")
+    waited = sum(t for step, _, t in seq.timings if step == MeasureStep.NEXT_SECTION)
+    edges = sum(
+        t for step, _, t in seq.timings
+        if step in (MeasureStep.LOCATE_EDGE1, MeasureStep.LOCATE_EDGE2)
+    )
+    return seq.cycle_time_s, waited, edges, session.length_mm - args.length, session.n_samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=5)
+    parser.add_argument("--samples-per-rev", type=int, default=200_000)
+    parser.add_argument("--deg-per-s", type=float, default=3600.0)
+    parser.add_argument("--slide-speed", type=float, default=3000.0, help="mm/s")
+    parser.add_argument("--length", type=float, default=3000.0, help="管长 mm")
+    parser.add_argument("--edge-search", type=float, default=50.0, help="找边范围 ± mm，0 = 不找边")
+    args = parser.parse_args(argv)
+
+    print(f"sections={args.sections} samples/rev={args.samples_per_rev}")
+    for name, pipeline in (("serial", False), ("pipelined", True)):
+        cycle, waited, edges, length_err, n = run_once(args, pipeline)
+        print(
+            f"{name:>10}: cycle {cycle:7.3f} s, waiting on compute {waited:6.3f} s, "
+            f"locating edges {edges:6.3f} s (length error {length_err:+.3f} mm), {n} samples"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+逐点 vs 批量推点的吞吐对比（micro-benchmark）。
+
+用法（在项目根目录）：
+    python -m bench.bench_ingest
+    python -m bench.bench_ingest --samples 200000 --block 180
+
+Linux 下需要先编译核心库：
+    g++ -O2 -shared -fPIC -o core/libfrp_core.so core/frp_core.cpp
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from core import frp_core
+
+
+def _make_data(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    angles = np.arange(n, dtype=np.float64) * (360.0 / 180) % 360.0
+    rad = np.radians(angles)
+    od = 152.0 + 0.2 * np.sin(rad) + rng.uniform(-0.02, 0.02, n)
+    id_ = 76.0 + 0.05 * np.cos(rad) + rng.uniform(-0.01, 0.01, n)
+    return angles, od, id_
+
+
+def bench_per_sample(angles, od, id_) -> float:
+    frp_core.reset()
+    # 和旧的 auto 页面一样：每个点都是 Python float，逐个跨 ctypes
+    a, o, i = angles.tolist(), od.tolist(), id_.tolist()
+    t0 = time.perf_counter()
+    for x, y, z in zip(a, o, i):
+        frp_core.add_sample(x, y, z)
+    return time.perf_counter() - t0
+
+
+def bench_batched(angles, od, id_, block: int) -> float:
+    frp_core.reset()
+    n = angles.shape[0]
+    t0 = time.perf_counter()
+    for s in range(0, n, block):
+        frp_core.add_samples(angles[s:s + block], od[s:s + block], id_[s:s + block])
+    return time.perf_counter() - t0
+
+
+def bench_fallback(angles, od, id_, block: int) -> float:
+    """强制走“没有批量接口”的退路，看旧 dll 上 add_samples 的代价"""
+    saved = frp_core._has_bulk
+    frp_core._has_bulk = False
+    try:
+        return bench_batched(angles, od, id_, block)
+    finally:
+        frp_core._has_bulk = saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=100_000)
+    parser.add_argument("--block", type=int, default=180, help="每次 add_samples 的点数")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    frp_core.get_lib()
+    angles, od, id_ = _make_data(args.samples)
+
+    cases = [("per-sample", lambda: bench_per_sample(angles, od, id_))]
+    if frp_core.has_bulk_api():
+        cases.append(("batched", lambda: bench_batched(angles, od, id_, args.block)))
+    else:
+        print("core library has no frp_add_samples, batched case skipped")
+    cases.append(("batched-fallback", lambda: bench_fallback(angles, od, id_, args.block)))
+
+    print(f"samples={args.samples} block={args.block} repeat={args.repeat}")
+    base = None
+    for name, fn in cases:
+        best = min(fn() for _ in range(args.repeat))
+        rate = args.samples / best
+        if base is None:
+            base = rate
+        print(f"{name:>18}: {best * 1e3:9.2f} ms  {rate / 1e6:8.2f} Msample/s  x{rate / base:6.1f}")
+
+    frp_core.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+多工位吞吐：N 个仿真工位各测若干根管，对比“一个进程里 N 个线程”和“每个工位一个进程”。
+
+用法（在项目根目录）：
+    python -m bench.bench_stations
+    python -m bench.bench_stations --stations 4 --pipes 3 --samples-per-rev 200000
+
+线程模式下所有工位的采集 / 计算抢同一个 GIL，进程模式（logic.stations.StationPool）各用各的核；
+核数不少于工位数时，进程模式的单根管节拍应该和只开一个工位时差不多。
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+
+from logic.stations import StationConfig, StationPool, station_main
+
+
+def make_configs(args) -> list:
+    return [
+        StationConfig(
+            f"S{i + 1}",
+            samples_per_rev=args.samples_per_rev,
+            sections=args.sections,
+            deg_per_s=args.deg_per_s,
+            slide_mm_s=args.slide_speed,
+            seed=100 * i,
+            pipes=args.pipes,
+            pause_s=0.0,
+        )
+        for i in range(args.stations)
+    ]
+
+
+def run_threads(configs) -> list:
+    events, stop = queue.Queue(), threading.Event()
+    threads = [
+        threading.Thread(target=station_main, args=(cfg, events, stop), daemon=True)
+        for cfg in configs
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results = []
+    while True:
+        try:
+            kind, name, *payload = events.get_nowait()
+        except queue.Empty:
+            return results
+        if kind == "result":
+            results.append((name, *payload))
+
+
+def run_processes(configs) -> list:
+    pool = StationPool(configs)
+    pool.start()
+    results = []
+    while pool.running:
+        results.extend(pool.poll())
+        time.sleep(0.02)
+    results.extend(pool.stop())
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--stations", type=int, default=4)
+    parser.add_argument("--pipes", type=int, default=2, help="每个工位测几根")
+    parser.add_argument("--sections", type=int, default=3)
+    parser.add_argument("--samples-per-rev", type=int, default=100_000)
+    parser.add_argument("--deg-per-s", type=float, default=3600.0)
+    parser.add_argument("--slide-speed", type=float, default=6000.0, help="mm/s")
+    args = parser.parse_args(argv)
+
+    print(
+        f"stations={args.stations} pipes={args.pipes} sections={args.sections} "
+        f"samples/rev={args.samples_per_rev} cpus={os.cpu_count()}"
+    )
+    for name, fn in (("threads", run_threads), ("processes", run_processes)):
+        t0 = time.perf_counter()
+        results = fn(make_configs(args))
+        wall = time.perf_counter() - t0
+        cycles = [meta["cycle_s"] for _, _, meta in results]
+        mean = sum(cycles) / len(cycles) if cycles else float("nan")
+        print(
+            f"{name:>10}: {len(results)} pipes in {wall:6.2f} s, "
+            f"mean cycle {mean:6.3f} s, {len(results) / wall:5.2f} pipes/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
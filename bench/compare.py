@@ -0,0 +1,55 @@
+"""
+对比两次 bench.suite 的结果（按 name 配对）。
+
+用法（在项目根目录）：
+    python -m bench.compare before.json after.json
+    python -m bench.compare before.json after.json --threshold 0.1
+
+ratio > 1 表示 after 更好（不论指标是越大越好还是越小越好）；
+变差超过 threshold 的条目标 REGRESSION，有的话返回码为 1。
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path) -> tuple:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    results = {r["name"]: r for r in report["results"] if "skipped" not in r}
+    return report.get("meta", {}), results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.15, help="判为退化的相对变差")
+    args = parser.parse_args(argv)
+
+    meta_a, before = load(args.before)
+    meta_b, after = load(args.after)
+    print(f"before: {meta_a.get('commit', '?')}  after: {meta_b.get('commit', '?')}")
+
+    regressions = 0
+    for name in sorted(before.keys() & after.keys()):
+        a, b = before[name], after[name]
+        if not a["value"] or not b["value"]:
+            continue
+        ratio = b["value"] / a["value"]
+        if a.get("better", "lower") == "lower":
+            ratio = 1.0 / ratio
+        flag = ""
+        if ratio < 1.0 - args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:<56} {a['value']:>12.4g} -> {b['value']:>12.4g} {a['unit']:<9} x{ratio:5.2f}{flag}")
+
+    for name in sorted(before.keys() ^ after.keys()):
+        print(f"{name:<56} only in {'before' if name in before else 'after'}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
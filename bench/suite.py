@@ -0,0 +1,372 @@
+"""
+端到端性能基准：采集 -> 计算 -> 画图 -> 界面刷新，结果存成 JSON 方便跨提交对比。
+
+用法（在项目根目录）：
+    python -m bench.suite                          # 全部跑，写 bench_results.json
+    python -m bench.suite -o before.json --quick   # 少跑几档，几秒钟出结果
+    python -m bench.compare before.json after.json
+
+测的东西：
+- ingest：frp_core / MeasurementSession 批量推点，以及 仿真源 -> 采集线程 -> session 整条链路
+- compute：整根管重算的耗时随点数的变化（NumPy 后端 / 谐波谱；有原生库时也测原生库）
+- plot：曲线从数据到顶点的耗时随显示窗口点数 / 控件宽度的变化（和 LivePlotWidget 同一段代码）
+- edges：扫管端的边缘检测吞吐，以及找到的管端位置误差随采样间距的变化
+- ui：HomeScreen.update_labels / LivePlotWidget.update_data 每次刷新的耗时。
+  这部分要 Kivy，放在子进程里跑；没装 Kivy 或开不了窗口就记成 skipped，不影响其他结果。
+
+每条结果是 {"name", "value", "unit", "better", ...参数}，name 在各次运行之间保持不变。
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from core import frp_core
+from core.frp_numpy import compute_arrays
+from logic.acquisition import AcquisitionWorker
+from logic.edges import EdgeDetector
+from logic.harmonics import analyze_sections, gaussian_filter
+from logic.plot_math import autoscale, new_vertex_buffer, series_to_vertices
+from logic.ringbuffer import RingBuffer
+from logic.session import MeasurementSession
+from logic.simulator import PipeGeometry, PipeSimulator, SimulatedSource, generate_pipe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CHILD_TAG = "BENCH_JSON "
+
+
+def best_of(fn, repeat=5, number=1) -> float:
+    """跑 repeat 组、每组 number 次，返回单次耗时的最小值（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / number)
+    return best
+
+
+def record(name, value, unit, better="lower", **params) -> dict:
+    return {"name": name, "value": float(value), "unit": unit, "better": better, **params}
+
+
+def _native_available() -> bool:
+    try:
+        frp_core.get_lib()
+        return True
+    except OSError:
+        return False
+
+
+# ---------- ingest ----------
+
+
+def bench_ingest(n: int, repeat: int) -> list:
+    angle, od, id_, slide = generate_pipe(samples_per_rev=n, seed=1)
+    out = []
+
+    def batched(block):
+        def run():
+            frp_core.reset()
+            for s in range(0, n, block):
+                frp_core.add_samples(angle[s : s + block], od[s : s + block], id_[s : s + block])
+
+        return run
+
+    backends = ["numpy"] + (["native"] if _native_available() else [])
+    saved = frp_core.get_backend()
+    try:
+        for backend in backends:
+            frp_core.set_backend(backend)
+            for block in (180, 4096):
+                dt = best_of(batched(block), repeat)
+                out.append(
+                    record(
+                        f"ingest/frp_core/{backend}/block={block}",
+                        n / dt,
+                        "sample/s",
+                        "higher",
+                        samples=n,
+                    )
+                )
+    finally:
+        frp_core.set_backend(saved)
+        frp_core.reset()
+
+    # session：默认带增量统计；nostream 看统计本身占多少
+    for streaming, tag in ((True, "session"), (False, "session-nostream")):
+        for block in (180, 4096):
+
+            def run_session(block=block, streaming=streaming):
+                session = MeasurementSession(
+                    max_sections=1, section_capacity=n, streaming=streaming
+                )
+                session.open_section(0.0)
+                for s in range(0, n, block):
+                    session.add_samples(
+                        angle[s : s + block], od[s : s + block], id_[s : s + block],
+                        slide[s : s + block],
+                    )
+
+            dt = best_of(run_session, repeat)
+            out.append(record(f"ingest/{tag}/block={block}", n / dt, "sample/s", "higher", samples=n))
+
+    # 整条链路：仿真源（不限速）-> 采集线程 -> session，包括生成数据的开销
+    def run_pipeline():
+        session = MeasurementSession(max_sections=1, section_capacity=n)
+        session.open_section(0.0)
+        src = SimulatedSource(PipeSimulator(seed=1), realtime=False, block_size=4096, max_samples=n)
+        worker = AcquisitionWorker(src, sinks=[session.add_samples], queue_len=1 << 16)
+        worker.run()  # 直接在当前线程跑，不计线程调度的噪声
+        assert session.n_samples == n
+
+    dt = best_of(run_pipeline, repeat)
+    out.append(record("ingest/pipeline/simulated", n / dt, "sample/s", "higher", samples=n))
+    return out
+
+
+# ---------- compute ----------
+
+
+def bench_compute(sizes, repeat: int) -> list:
+    out = []
+    native = _native_available()
+    positions = np.linspace(0.0, 6000.0, 5)
+    for n in sizes:
+        per_section = max(n // len(positions), 1)
+        angle, od, id_, _ = generate_pipe(
+            PipeGeometry(), positions, samples_per_rev=per_section, seed=2
+        )
+        dt = best_of(lambda: compute_arrays(angle, od, id_), repeat)
+        out.append(record(f"compute/numpy/n={n}", dt, "s", samples=n))
+
+        # session：逐截面 开 -> 推点 -> 关（关的时候算该截面），最后 finish 合并
+        def run_session():
+            session = MeasurementSession(max_sections=len(positions), section_capacity=per_section)
+            for k, pos in enumerate(positions):
+                sl = slice(k * per_section, (k + 1) * per_section)
+                session.open_section(pos)
+                session.add_samples(angle[sl], od[sl], id_[sl])
+                session.close_section()
+            return session.finish()
+
+        dt = best_of(run_session, repeat)
+        out.append(record(f"compute/session/n={n}", dt, "s", samples=n, sections=len(positions)))
+
+        # 谐波谱：所有截面一次 FFT（网格 4096 点 / 转，带高斯滤波）
+        secs = [
+            (pos, *(c[k * per_section : (k + 1) * per_section] for c in (angle, od, id_)))
+            for k, pos in enumerate(positions)
+        ]
+        dt = best_of(lambda: analyze_sections(secs, 4096, 50, gaussian_filter(50)), repeat)
+        out.append(record(f"compute/harmonics/n={n}", dt, "s", samples=n, sections=len(positions)))
+
+        if native:
+            saved = frp_core.get_backend()
+            frp_core.set_backend("native")
+            try:
+                frp_core.reset()
+                frp_core.add_samples(angle, od, id_)
+                dt = best_of(frp_core.compute, repeat)
+            finally:
+                frp_core.set_backend(saved)
+                frp_core.reset()
+            out.append(record(f"compute/native/n={n}", dt, "s", samples=n))
+    return out
+
+
+# ---------- plot ----------
+
+
+def bench_plot(windows, widths, repeat: int) -> list:
+    out = []
+    _, od, id_, _ = generate_pipe(samples_per_rev=max(windows), seed=3)
+    verts = new_vertex_buffer(8192)
+    for window in windows:
+        ods, ids_ = RingBuffer(window), RingBuffer(window)
+        ods.extend(od[-window:])
+        ids_.extend(id_[-window:])
+        for width in widths:
+
+            def run():
+                # 和 LivePlotWidget.update_data 一样：外径固定量程，内径自动量程
+                series_to_vertices(ods.view(), 150.0, 154.0, 0, 0, width, 300, verts)
+                lo, hi = autoscale(ids_.min(), ids_.max())
+                series_to_vertices(ids_.view(), lo, hi, 0, 0, width, 300, verts)
+
+            dt = best_of(run, repeat, number=20)
+            out.append(record(f"plot/points/window={window}/width={width}", dt, "s"))
+    return out
+
+
+# ---------- edges ----------
+
+
+def bench_edges(n: int, repeat: int) -> list:
+    out = []
+    geom = PipeGeometry(ends=True, start_mm=37.3, length_mm=1000.0)
+    rng = np.random.default_rng(5)
+    level, hyst = geom.od_mm / 2, geom.od_mm / 4
+
+    def sweep(spacing):
+        pos = np.arange(-50.0, geom.length_mm + 100.0, spacing) + rng.uniform(0.0, spacing)
+        sig = geom.od_mm * geom.coverage(pos) + rng.normal(0.0, geom.od_noise_mm, pos.shape[0])
+        return pos, sig
+
+    # 吞吐：按 4096 点一块喂，和采集线程交过来的块差不多大
+    pos, sig = sweep(geom.length_mm / n)
+
+    def run():
+        det = EdgeDetector(level, hyst)
+        for s in range(0, pos.shape[0], 4096):
+            det.feed(pos[s : s + 4096], sig[s : s + 4096])
+
+    dt = best_of(run, repeat)
+    out.append(record("edges/detect/block=4096", pos.shape[0] / dt, "sample/s", "higher", samples=n))
+
+    # 精度：两个管端位置误差的最大值；采样间距 = 扫描速度 / 采样率
+    for spacing in (0.01, 0.1, 0.5, 2.0):
+        pos, sig = sweep(spacing)
+        edges = EdgeDetector(level, hyst).feed(pos, sig)
+        truth = (geom.start_mm, geom.start_mm + geom.length_mm)
+        err = max(abs(e.position_mm - t) for e, t in zip(edges, truth)) if len(edges) == 2 else np.inf
+        out.append(record(f"edges/error/spacing={spacing}", err, "mm", spot_mm=geom.probe_spot_mm))
+    return out
+
+
+# ---------- ui（子进程里跑）----------
+
+
+def _kivy_child(ticks: int):
+    """子进程入口：真正建出 HomeScreen / LivePlotWidget 来测，结果打印到 stdout"""
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    sys.path.insert(0, ROOT)
+
+    from kivy.lang import Builder
+    from kivymd.app import MDApp
+
+    from logic.models import global_state
+    from ui.screens.home import HomeScreen
+    from ui.widgets.live_plot import LivePlotWidget
+
+    MDApp()  # KivyMD 控件要从 running app 拿 theme_cls，不用真正 run()
+    Builder.load_file(os.path.join(ROOT, "kv", "home.kv"))
+    home = HomeScreen(name="home")
+    live = global_state.live
+    out = []
+
+    def full_refresh():
+        home.update_labels()
+
+    vals = iter(np.linspace(150.0, 154.0, ticks * 8))
+
+    def new_values():
+        # 走 global_state 的变更通知（无调度器时同步 flush），只刷新变了的 label
+        live.outer_diameter = next(vals)
+        live.inner_diameter = live.outer_diameter - 76.0
+        live.angle_deg = (live.angle_deg + 1.0) % 360.0
+
+    home.on_pre_enter()
+    out.append(record("ui/home/update_labels/full", best_of(full_refresh, 3, ticks), "s"))
+    out.append(record("ui/home/update_labels/changed", best_of(new_values, 3, ticks), "s"))
+    home.on_leave()
+
+    _, od, id_, _ = generate_pipe(samples_per_rev=10_000, seed=4)
+    plot = LivePlotWidget(size=(1280, 300))
+    dt = best_of(lambda: plot.update_data(od, id_, 150.0, 154.0), 3, ticks)
+    out.append(record("ui/live_plot/update_data/window=10000/width=1280", dt, "s"))
+
+    print(_CHILD_TAG + json.dumps(out), flush=True)
+
+
+def bench_ui(ticks: int, timeout: float = 120.0) -> list:
+    cmd = [sys.executable, "-m", "bench.suite", "--kivy-child", "--ticks", str(ticks)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return [{"name": "ui", "skipped": "timeout"}]
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(_CHILD_TAG):
+            return json.loads(line[len(_CHILD_TAG) :])
+    tail = (proc.stderr.strip().splitlines() or [f"exit code {proc.returncode}"])[-1]
+    return [{"name": "ui", "skipped": tail}]
+
+
+# ---------- main ----------
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--quick", action="store_true", help="少跑几档，快速看个大概")
+    parser.add_argument("--no-ui", action="store_true", help="跳过需要 Kivy 的部分")
+    parser.add_argument("--ticks", type=int, default=200, help="ui 部分每组刷新次数")
+    parser.add_argument("--kivy-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.kivy_child:
+        _kivy_child(args.ticks)
+        return
+
+    repeat = 3 if args.quick else 5
+    sizes = (1_000, 10_000, 100_000) if args.quick else (1_000, 10_000, 100_000, 1_000_000)
+    windows = (180, 10_000, 100_000) if args.quick else (180, 1_000, 10_000, 100_000)
+    widths = (800, 1920)
+
+    suites = [
+        ("ingest", lambda: bench_ingest(200_000, repeat)),
+        ("compute", lambda: bench_compute(sizes, repeat)),
+        ("plot", lambda: bench_plot(windows, widths, repeat)),
+        ("edges", lambda: bench_edges(1_000_000, repeat)),
+    ]
+    if not args.no_ui:
+        suites.append(("ui", lambda: bench_ui(args.ticks)))
+
+    results = []
+    for name, fn in suites:
+        t0 = time.perf_counter()
+        part = fn()
+        results.extend(part)
+        print(f"[{name}] {len(part)} results in {time.perf_counter() - t0:.1f} s")
+        for r in part:
+            if "skipped" in r:
+                print(f"    {r['name']}: skipped ({r['skipped']})")
+            else:
+                print(f"    {r['name']}: {r['value']:.6g} {r['unit']}")
+
+    report = {
+        "meta": {
+            "commit": _git_rev(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "native_core": _native_available(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"-> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
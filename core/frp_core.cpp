@@ -3,49 +3,78 @@
 #include <vector>
 #include <cmath>
 
-static std::vector<double> g_outer;
-static std::vector<double> g_inner;
+// 一个测量头的全部状态；不同上下文之间没有共享数据
+struct FrpContext
+{
+    std::vector<double> outer;
+    std::vector<double> inner;
+};
+
+// 旧的无句柄接口用的默认上下文
+static FrpContext g_default;
+
+static double avg(const std::vector<double> &v)
+{
+    if (v.empty())
+        return 0.0;
+    double s = 0.0;
+    for (double x : v)
+        s += x;
+    return s / v.size();
+}
 
 extern "C"
 {
 
-    FRP_API void frp_init()
+    FRP_API FrpContext *frp_ctx_create()
     {
-        g_outer.clear();
-        g_inner.clear();
+        return new FrpContext();
     }
 
-    FRP_API void frp_reset()
+    FRP_API void frp_ctx_destroy(FrpContext *ctx)
     {
-        g_outer.clear();
-        g_inner.clear();
+        delete ctx;
     }
 
-    FRP_API void frp_add_sample(double angle_deg,
-                                double outer_d_mm,
-                                double inner_d_mm)
+    FRP_API void frp_ctx_reset(FrpContext *ctx)
+    {
+        if (!ctx)
+            return;
+        ctx->outer.clear();
+        ctx->inner.clear();
+    }
+
+    FRP_API void frp_ctx_add_sample(FrpContext *ctx,
+                                    double angle_deg,
+                                    double outer_d_mm,
+                                    double inner_d_mm)
     {
         (void)angle_deg; // demo 里暂时不用
-        g_outer.push_back(outer_d_mm);
-        g_inner.push_back(inner_d_mm);
+        if (!ctx)
+            return;
+        ctx->outer.push_back(outer_d_mm);
+        ctx->inner.push_back(inner_d_mm);
     }
 
-    static double avg(const std::vector<double> &v)
+    FRP_API void frp_ctx_add_samples(FrpContext *ctx,
+                                     const double *angle_deg,
+                                     const double *outer_d_mm,
+                                     const double *inner_d_mm,
+                                     int n)
     {
-        if (v.empty())
-            return 0.0;
-        double s = 0.0;
-        for (double x : v)
-            s += x;
-        return s / v.size();
+        (void)angle_deg; // demo 里暂时不用
+        if (!ctx || !outer_d_mm || !inner_d_mm || n <= 0)
+            return;
+        ctx->outer.insert(ctx->outer.end(), outer_d_mm, outer_d_mm + n);
+        ctx->inner.insert(ctx->inner.end(), inner_d_mm, inner_d_mm + n);
     }
 
-    FRP_API void frp_compute(FrpResult *result)
+    FRP_API void frp_ctx_compute(FrpContext *ctx, FrpResult *result)
     {
-        if (!result)
+        if (!ctx || !result)
             return;
-        result->outer_diameter_avg = avg(g_outer);
-        result->inner_diameter_avg = avg(g_inner);
+        result->outer_diameter_avg = avg(ctx->outer);
+        result->inner_diameter_avg = avg(ctx->inner);
         // 下面这些先随便给个假值，方便联调 UI
         result->roundness_outer = 0.03;
         result->roundness_inner = 0.02;
@@ -54,4 +83,36 @@ extern "C"
         result->length = 1.8;
         result->ok_flag = 1;
     }
+
+    // ---- 无句柄接口：都落到默认上下文上 ----
+
+    FRP_API void frp_init()
+    {
+        frp_ctx_reset(&g_default);
+    }
+
+    FRP_API void frp_reset()
+    {
+        frp_ctx_reset(&g_default);
+    }
+
+    FRP_API void frp_add_sample(double angle_deg,
+                                double outer_d_mm,
+                                double inner_d_mm)
+    {
+        frp_ctx_add_sample(&g_default, angle_deg, outer_d_mm, inner_d_mm);
+    }
+
+    FRP_API void frp_add_samples(const double *angle_deg,
+                                 const double *outer_d_mm,
+                                 const double *inner_d_mm,
+                                 int n)
+    {
+        frp_ctx_add_samples(&g_default, angle_deg, outer_d_mm, inner_d_mm, n);
+    }
+
+    FRP_API void frp_compute(FrpResult *result)
+    {
+        frp_ctx_compute(&g_default, result);
+    }
 }
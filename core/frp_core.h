@@ -36,6 +36,37 @@ extern "C"
                                 double outer_d_mm,
                                 double inner_d_mm);
 
+    // 批量推点：三个等长的连续 double 数组，一次调用写入 n 个点
+    FRP_API void frp_add_samples(const double *angle_deg,
+                                 const double *outer_d_mm,
+                                 const double *inner_d_mm,
+                                 int n);
+
     // 计算结果，填充到 result 里
     FRP_API void frp_compute(FrpResult *result);
+
+    // ---- 句柄接口：每个测量头一个上下文，互不干扰，可以在不同线程里同时用 ----
+    // 上面的 frp_* 等价于对一个进程内默认上下文调用 frp_ctx_*
+
+    typedef struct FrpContext FrpContext;
+
+    // 新建一个空的上下文；用完 frp_ctx_destroy
+    FRP_API FrpContext *frp_ctx_create();
+
+    FRP_API void frp_ctx_destroy(FrpContext *ctx);
+
+    FRP_API void frp_ctx_reset(FrpContext *ctx);
+
+    FRP_API void frp_ctx_add_sample(FrpContext *ctx,
+                                    double angle_deg,
+                                    double outer_d_mm,
+                                    double inner_d_mm);
+
+    FRP_API void frp_ctx_add_samples(FrpContext *ctx,
+                                     const double *angle_deg,
+                                     const double *outer_d_mm,
+                                     const double *inner_d_mm,
+                                     int n);
+
+    FRP_API void frp_ctx_compute(FrpContext *ctx, FrpResult *result);
 }
@@ -1,6 +1,8 @@
 import os
 import ctypes
-from ctypes import c_double, c_int, Structure
+from ctypes import c_double, c_int, c_void_p, Structure
+
+import numpy as np
 
 
 class FrpResult(Structure):
@@ -16,6 +18,14 @@ class FrpResult(Structure):
     ]
 
 
+_c_double_p = ctypes.POINTER(c_double)
+
+
+def result_to_dict(res: FrpResult) -> dict:
+    """FrpResult -> 普通 dict（写文件 / 数据库用）"""
+    return {name: getattr(res, name) for name, _ in FrpResult._fields_}
+
+
 def _load_lib():
     base_dir = os.path.dirname(__file__)
     if os.name == "nt":
@@ -27,28 +37,314 @@ def _load_lib():
 
 
 _lib = None
+_has_bulk = False
+_has_ctx = False
+
+# 计算后端："native" = libfrp_core.so / frp_core.dll，"numpy" = core.frp_numpy，
+# "auto" = 能加载原生库就用原生库，加载失败自动退回 numpy。
+# 也可以用环境变量 FRP_CORE_BACKEND 指定。
+BACKENDS = ("auto", "native", "numpy")
+_backend = os.environ.get("FRP_CORE_BACKEND", "auto").strip().lower() or "auto"
+_active = None  # 解析后的实际后端："native" / "numpy"
+_np_core = None
+
+# 原生库的 ctypes 调用次数（函数名 -> 次数）；只在打开时计，见 logic/profiling.py
+_count_calls = os.environ.get("FRP_PROFILE", "").strip().lower() in ("1", "true", "yes")
+_calls = {}
 
 
 def get_lib():
-    global _lib
+    global _lib, _has_bulk, _has_ctx
     if _lib is None:
         _lib = _load_lib()
         _lib.frp_init()
         _lib.frp_reset()
         _lib.frp_add_sample.argtypes = [c_double, c_double, c_double]
         _lib.frp_compute.argtypes = [ctypes.POINTER(FrpResult)]
+        # 旧版 dll 没有批量入口，找不到符号时退回逐点调用
+        try:
+            bulk = _lib.frp_add_samples
+        except AttributeError:
+            _has_bulk = False
+        else:
+            bulk.argtypes = [_c_double_p, _c_double_p, _c_double_p, c_int]
+            bulk.restype = None
+            _has_bulk = True
+        # 句柄接口（frp_ctx_*）同样是新版才有
+        try:
+            create = _lib.frp_ctx_create
+        except AttributeError:
+            _has_ctx = False
+        else:
+            create.argtypes = []
+            create.restype = c_void_p
+            _lib.frp_ctx_destroy.argtypes = [c_void_p]
+            _lib.frp_ctx_reset.argtypes = [c_void_p]
+            _lib.frp_ctx_add_sample.argtypes = [c_void_p, c_double, c_double, c_double]
+            _lib.frp_ctx_add_samples.argtypes = [
+                c_void_p, _c_double_p, _c_double_p, _c_double_p, c_int
+            ]
+            _lib.frp_ctx_compute.argtypes = [c_void_p, ctypes.POINTER(FrpResult)]
+            for name in ("frp_ctx_destroy", "frp_ctx_reset", "frp_ctx_add_sample",
+                         "frp_ctx_add_samples", "frp_ctx_compute"):
+                getattr(_lib, name).restype = None
+            _has_ctx = True
     return _lib
 
 
+def count_calls(on: bool = True):
+    global _count_calls
+    _count_calls = bool(on)
+
+
+def call_counts() -> dict:
+    return dict(_calls)
+
+
+def reset_call_counts():
+    _calls.clear()
+
+
+def _count(fn: str, n: int = 1):
+    _calls[fn] = _calls.get(fn, 0) + n
+
+
+def set_backend(name: str):
+    """切换计算后端；切换后当前累积的样本不会带过去，需要重新 reset()"""
+    global _backend, _active
+    name = name.strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"unknown frp_core backend {name!r}, expected one of {BACKENDS}")
+    _backend = name
+    _active = None
+
+
+def get_backend() -> str:
+    """返回实际生效的后端名（"native" / "numpy"），第一次调用时才去加载原生库"""
+    global _active, _np_core
+    if _active is None:
+        if _backend not in BACKENDS:
+            raise ValueError(
+                f"unknown frp_core backend {_backend!r}, expected one of {BACKENDS}"
+            )
+        if _backend == "numpy":
+            _active = "numpy"
+        elif _backend == "native":
+            get_lib()
+            _active = "native"
+        else:
+            try:
+                get_lib()
+                _active = "native"
+            except OSError:
+                _active = "numpy"
+        if _active == "numpy" and _np_core is None:
+            from core.frp_numpy import NumpyCore
+
+            _np_core = NumpyCore()
+    return _active
+
+
+def _use_native() -> bool:
+    return get_backend() == "native"
+
+
+def has_bulk_api() -> bool:
+    """当前加载的核心库是否带 frp_add_samples 批量接口"""
+    get_lib()
+    return _has_bulk
+
+
+def has_context_api() -> bool:
+    """当前加载的核心库是否带 frp_ctx_* 句柄接口"""
+    get_lib()
+    return _has_ctx
+
+
+def _as_f64(values) -> np.ndarray:
+    """转成一维连续 float64；本来就是连续 float64 的 ndarray / array('d') 不会拷贝"""
+    return np.ascontiguousarray(values, dtype=np.float64).reshape(-1)
+
+
 def reset():
-    get_lib().frp_reset()
+    if _use_native():
+        if _count_calls:
+            _count("frp_reset")
+        get_lib().frp_reset()
+    else:
+        _np_core.reset()
 
 
 def add_sample(angle_deg: float, outer_d: float, inner_d: float):
-    get_lib().frp_add_sample(angle_deg, outer_d, inner_d)
+    if _use_native():
+        if _count_calls:
+            _count("frp_add_sample")
+        get_lib().frp_add_sample(angle_deg, outer_d, inner_d)
+    else:
+        _np_core.add_sample(angle_deg, outer_d, inner_d)
+
+
+def add_samples(angles, outer_d, inner_d) -> int:
+    """
+    批量推点：三个等长的一维序列（numpy 数组或任意支持 buffer 协议的对象）。
+    有批量接口时只跨一次 ctypes 边界，直接把连续 float64 指针交给核心。
+    返回写入的点数。
+    """
+    a = _as_f64(angles)
+    od = _as_f64(outer_d)
+    id_ = _as_f64(inner_d)
+
+    n = a.shape[0]
+    if od.shape[0] != n or id_.shape[0] != n:
+        raise ValueError(
+            f"add_samples: length mismatch ({n}, {od.shape[0]}, {id_.shape[0]})"
+        )
+    if n == 0:
+        return 0
+    if not _use_native():
+        return _np_core.add_samples(a, od, id_)
+
+    lib = get_lib()
+    if _has_bulk:
+        if _count_calls:
+            _count("frp_add_samples")
+        lib.frp_add_samples(
+            a.ctypes.data_as(_c_double_p),
+            od.ctypes.data_as(_c_double_p),
+            id_.ctypes.data_as(_c_double_p),
+            n,
+        )
+    else:
+        # 退回逐点：先 tolist() 一次，避免循环里逐个装箱 numpy 标量
+        if _count_calls:
+            _count("frp_add_sample", n)
+        add = lib.frp_add_sample
+        for x, y, z in zip(a.tolist(), od.tolist(), id_.tolist()):
+            add(x, y, z)
+    return n
 
 
 def compute() -> FrpResult:
+    if not _use_native():
+        return _np_core.compute()
+    if _count_calls:
+        _count("frp_compute")
     res = FrpResult()
     get_lib().frp_compute(ctypes.byref(res))
     return res
+
+
+# ---------- 句柄接口：每个测量头一个上下文 ----------
+
+
+class CoreContext:
+    """
+    一份独立的测量数据（一个测量头 / 工位一个），接口和模块级的
+    reset / add_sample / add_samples / compute 一样，但互不干扰。
+    原生库带 frp_ctx_* 时用原生上下文（ctypes 调用期间释放 GIL，多个工位可以在不同线程里同时算），
+    否则用 NumpyCore。backend 为 None 时跟随 set_backend() / FRP_CORE_BACKEND。
+
+        with CoreContext() as ctx:
+            ctx.add_samples(angle, od, id_)
+            res = ctx.compute()
+    """
+
+    def __init__(self, backend: str = None):
+        name = (backend or _backend).strip().lower()
+        if name not in BACKENDS:
+            raise ValueError(f"unknown frp_core backend {name!r}, expected one of {BACKENDS}")
+        self._handle = None
+        self._np = None
+        if name != "numpy":
+            try:
+                native = has_context_api()
+            except OSError:
+                if name == "native":
+                    raise
+                native = False
+            if native:
+                self._handle = get_lib().frp_ctx_create()
+            elif name == "native":
+                raise OSError("frp_core library has no frp_ctx_* API, rebuild it from frp_core.cpp")
+        if self._handle is None:
+            from core.frp_numpy import NumpyCore
+
+            self._np = NumpyCore()
+        self.backend = "native" if self._handle is not None else "numpy"
+
+    def _check(self):
+        if self._handle is None and self._np is None:
+            raise ValueError("CoreContext is closed")
+
+    def reset(self):
+        self._check()
+        if self._np is not None:
+            self._np.reset()
+            return
+        if _count_calls:
+            _count("frp_ctx_reset")
+        _lib.frp_ctx_reset(self._handle)
+
+    def add_sample(self, angle_deg: float, outer_d: float, inner_d: float):
+        self._check()
+        if self._np is not None:
+            self._np.add_sample(angle_deg, outer_d, inner_d)
+            return
+        if _count_calls:
+            _count("frp_ctx_add_sample")
+        _lib.frp_ctx_add_sample(self._handle, angle_deg, outer_d, inner_d)
+
+    def add_samples(self, angles, outer_d, inner_d) -> int:
+        self._check()
+        if self._np is not None:
+            return self._np.add_samples(angles, outer_d, inner_d)
+        a = _as_f64(angles)
+        od = _as_f64(outer_d)
+        id_ = _as_f64(inner_d)
+        n = a.shape[0]
+        if od.shape[0] != n or id_.shape[0] != n:
+            raise ValueError(
+                f"add_samples: length mismatch ({n}, {od.shape[0]}, {id_.shape[0]})"
+            )
+        if n == 0:
+            return 0
+        if _count_calls:
+            _count("frp_ctx_add_samples")
+        _lib.frp_ctx_add_samples(
+            self._handle,
+            a.ctypes.data_as(_c_double_p),
+            od.ctypes.data_as(_c_double_p),
+            id_.ctypes.data_as(_c_double_p),
+            n,
+        )
+        return n
+
+    def compute(self, tolerances=None) -> FrpResult:
+        """tolerances 只对 numpy 后端有效（原生库自己判 OK/NG）"""
+        self._check()
+        if self._np is not None:
+            return self._np.compute(tolerances)
+        if _count_calls:
+            _count("frp_ctx_compute")
+        res = FrpResult()
+        _lib.frp_ctx_compute(self._handle, ctypes.byref(res))
+        return res
+
+    def close(self):
+        if self._handle is not None:
+            _lib.frp_ctx_destroy(self._handle)
+            self._handle = None
+        self._np = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
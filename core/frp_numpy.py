@@ -0,0 +1,288 @@
+"""
+frp_core 的纯 NumPy 实现，不依赖 libfrp_core.so / frp_core.dll。
+
+几何约定：
+- 每个采样点 (angle_deg, d) 看成截面轮廓上的一点，半径取 d / 2；
+- 同一截面的点用最小二乘圆（Kasa 法）拟合圆心和半径；
+- 圆度 = 径向残差的 max - min；
+- 同心度 = 2 × 外圆心到内圆心的距离；
+- 直线度 = 2 × 各截面外圆心到拟合轴线的最大距离（至少 3 个截面）。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.frp_core import FrpResult
+
+# 判定 OK/NG 用的公差，单位 mm；nominal 为 None 时不检查直径
+DEFAULT_TOLERANCES = {
+    "roundness_max_mm": 0.10,
+    "straightness_max_mm": 0.50,
+    "concentricity_max_mm": 0.25,
+    "od_nominal_mm": None,
+    "od_tol_mm": 0.5,
+    "id_nominal_mm": None,
+    "id_tol_mm": 0.5,
+}
+
+
+@dataclass
+class SectionResult:
+    """单个截面的中间结果，合并整根管时只需要这些量"""
+
+    pos_mm: float
+    n: int
+    outer_sum: float
+    inner_sum: float
+    outer_center: tuple
+    inner_center: tuple
+    roundness_outer: float
+    roundness_inner: float
+
+    @property
+    def outer_avg(self) -> float:
+        return self.outer_sum / self.n if self.n else 0.0
+
+    @property
+    def inner_avg(self) -> float:
+        return self.inner_sum / self.n if self.n else 0.0
+
+
+def profile_xy(angle_deg, diameter):
+    """角度 + 直径 -> 轮廓点的 x / y（半径取 d / 2）"""
+    rad = np.radians(angle_deg)
+    r = 0.5 * np.asarray(diameter, dtype=np.float64)
+    return r * np.cos(rad), r * np.sin(rad)
+
+
+def solve_circles(m):
+    """
+    按分组矩阵批量解 Kasa 圆拟合的正规方程。
+    m: (k, 9) -> n, Σx, Σy, Σxx, Σyy, Σxy, Σxz, Σyz, Σz   (z = x² + y²)
+    返回 xc, yc, r，均为 (k,)
+    """
+    n, sx, sy, sxx, syy, sxy, sxz, syz, sz = m.T
+    a = np.empty((m.shape[0], 3, 3))
+    a[:, 0] = np.stack([sxx, sxy, sx], axis=1)
+    a[:, 1] = np.stack([sxy, syy, sy], axis=1)
+    a[:, 2] = np.stack([sx, sy, n], axis=1)
+    b = np.stack([sxz, syz, sz], axis=1)
+
+    # 点数不足 3 或者退化（全在一个角度上）时，圆心取质心
+    det = np.linalg.det(a)
+    ok = (n >= 3) & (np.abs(det) > 1e-12 * np.maximum(n, 1) ** 3)
+    sol = np.zeros((m.shape[0], 3))
+    if ok.any():
+        sol[ok] = np.linalg.solve(a[ok], b[ok][..., None])[..., 0]
+
+    xc = 0.5 * sol[:, 0]
+    yc = 0.5 * sol[:, 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cx = np.where(n > 0, sx / np.maximum(n, 1), 0.0)
+        cy = np.where(n > 0, sy / np.maximum(n, 1), 0.0)
+    xc = np.where(ok, xc, cx)
+    yc = np.where(ok, yc, cy)
+    r = np.sqrt(np.maximum(sol[:, 2] + xc * xc + yc * yc, 0.0))
+    return xc, yc, r
+
+
+def group_moments(x, y, starts):
+    """按截面（已按截面排好序）累加拟合所需的各阶矩，一次 reduceat 完成"""
+    z = x * x + y * y
+    cols = np.stack([np.ones_like(x), x, y, x * x, y * y, x * y, x * z, y * z, z])
+    return np.add.reduceat(cols, starts, axis=1).T
+
+
+def _fit_groups(x, y, groups, starts):
+    """分组拟合圆 + 求圆度；x / y / groups 已按截面排好序，starts 为每组起点"""
+    xc, yc, r = solve_circles(group_moments(x, y, starts))
+    res = np.hypot(x - xc[groups], y - yc[groups]) - r[groups]
+    roundness = np.maximum.reduceat(res, starts) - np.minimum.reduceat(res, starts)
+    return xc, yc, roundness
+
+
+def compute_sections(angle_deg, outer_d, inner_d, pos_mm=None) -> list:
+    """
+    把累积的采样按截面（同一 slide 位置）拆开，所有截面一次向量化算完。
+    pos_mm 为 None 时全部当作一个截面。
+    """
+    a = np.asarray(angle_deg, dtype=np.float64).reshape(-1)
+    od = np.asarray(outer_d, dtype=np.float64).reshape(-1)
+    id_ = np.asarray(inner_d, dtype=np.float64).reshape(-1)
+    if a.size == 0:
+        return []
+
+    if pos_mm is None:
+        positions = np.zeros(1)
+        groups = np.zeros(a.size, dtype=np.intp)
+    else:
+        positions, groups = np.unique(
+            np.asarray(pos_mm, dtype=np.float64).reshape(-1), return_inverse=True
+        )
+        # 正常采集时一个截面的点是连续的，只有乱序时才需要重排
+        if np.any(groups[1:] < groups[:-1]):
+            order = np.argsort(groups, kind="stable")
+            a, od, id_, groups = a[order], od[order], id_[order], groups[order]
+    k = positions.size
+
+    counts = np.bincount(groups, minlength=k)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    # 内外径共用同一组角度，三角函数只算一次
+    rad = np.radians(a)
+    c, s = np.cos(rad), np.sin(rad)
+    ro_, ri_ = 0.5 * od, 0.5 * id_
+    oxc, oyc, ro = _fit_groups(ro_ * c, ro_ * s, groups, starts)
+    ixc, iyc, ri = _fit_groups(ri_ * c, ri_ * s, groups, starts)
+
+    od_sum = np.add.reduceat(od, starts)
+    id_sum = np.add.reduceat(id_, starts)
+
+    return [
+        SectionResult(
+            pos_mm=float(positions[j]),
+            n=int(counts[j]),
+            outer_sum=float(od_sum[j]),
+            inner_sum=float(id_sum[j]),
+            outer_center=(float(oxc[j]), float(oyc[j])),
+            inner_center=(float(ixc[j]), float(iyc[j])),
+            roundness_outer=float(ro[j]),
+            roundness_inner=float(ri[j]),
+        )
+        for j in range(k)
+    ]
+
+
+def straightness(positions, centers) -> float:
+    """各截面圆心到最小二乘轴线的最大距离 × 2；截面少于 3 个时为 0"""
+    z = np.asarray(positions, dtype=np.float64)
+    c = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    if z.size < 3 or np.ptp(z) == 0:
+        return 0.0
+    # x(z)、y(z) 各拟合一条直线
+    design = np.stack([z, np.ones_like(z)], axis=1)
+    coef, *_ = np.linalg.lstsq(design, c, rcond=None)
+    dev = c - design @ coef
+    return float(2.0 * np.hypot(dev[:, 0], dev[:, 1]).max())
+
+
+def _is_ok(res: FrpResult, tol: dict) -> bool:
+    if max(res.roundness_outer, res.roundness_inner) > tol["roundness_max_mm"]:
+        return False
+    if res.straightness > tol["straightness_max_mm"]:
+        return False
+    if res.concentricity > tol["concentricity_max_mm"]:
+        return False
+    if tol.get("od_nominal_mm") is not None:
+        if abs(res.outer_diameter_avg - tol["od_nominal_mm"]) > tol["od_tol_mm"]:
+            return False
+    if tol.get("id_nominal_mm") is not None:
+        if abs(res.inner_diameter_avg - tol["id_nominal_mm"]) > tol["id_tol_mm"]:
+            return False
+    return True
+
+
+def combine_sections(sections, length_mm=None, tolerances=None) -> FrpResult:
+    """
+    把各截面的中间结果合成整根管的 FrpResult。
+    length_mm 为 None 时用首末截面的间距近似管长。
+    """
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    res = FrpResult()
+    total = sum(s.n for s in sections)
+    if total == 0:
+        res.ok_flag = 0
+        return res
+
+    res.outer_diameter_avg = sum(s.outer_sum for s in sections) / total
+    res.inner_diameter_avg = sum(s.inner_sum for s in sections) / total
+    res.roundness_outer = max(s.roundness_outer for s in sections)
+    res.roundness_inner = max(s.roundness_inner for s in sections)
+    res.concentricity = max(
+        2.0
+        * float(
+            np.hypot(
+                s.outer_center[0] - s.inner_center[0],
+                s.outer_center[1] - s.inner_center[1],
+            )
+        )
+        for s in sections
+    )
+
+    positions = [s.pos_mm for s in sections]
+    res.straightness = straightness(positions, [s.outer_center for s in sections])
+
+    if length_mm is None:
+        length_mm = max(positions) - min(positions)
+    # 结果表里长度单位是 m
+    res.length = float(length_mm) / 1000.0
+
+    res.ok_flag = 1 if _is_ok(res, tol) else 0
+    return res
+
+
+def compute_arrays(
+    angle_deg, outer_d, inner_d, pos_mm=None, length_mm=None, tolerances=None
+) -> FrpResult:
+    """一次性从原始采样算出 FrpResult"""
+    sections = compute_sections(angle_deg, outer_d, inner_d, pos_mm)
+    return combine_sections(sections, length_mm=length_mm, tolerances=tolerances)
+
+
+class NumpyCore:
+    """
+    和原生库同一套接口（reset / add_sample / add_samples / compute），
+    样本存在按倍数扩容的预分配数组里。
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self._buf = np.empty((3, max(int(capacity), 16)))
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def _reserve(self, extra: int):
+        need = self._n + extra
+        cap = self._buf.shape[1]
+        if need <= cap:
+            return
+        while cap < need:
+            cap *= 2
+        buf = np.empty((3, cap))
+        buf[:, : self._n] = self._buf[:, : self._n]
+        self._buf = buf
+
+    def reset(self):
+        self._n = 0
+
+    def add_sample(self, angle_deg: float, outer_d: float, inner_d: float):
+        self._reserve(1)
+        self._buf[:, self._n] = (angle_deg, outer_d, inner_d)
+        self._n += 1
+
+    def add_samples(self, angles, outer_d, inner_d) -> int:
+        a = np.asarray(angles, dtype=np.float64).reshape(-1)
+        od = np.asarray(outer_d, dtype=np.float64).reshape(-1)
+        id_ = np.asarray(inner_d, dtype=np.float64).reshape(-1)
+        n = a.shape[0]
+        if od.shape[0] != n or id_.shape[0] != n:
+            raise ValueError(
+                f"add_samples: length mismatch ({n}, {od.shape[0]}, {id_.shape[0]})"
+            )
+        self._reserve(n)
+        s = self._n
+        self._buf[0, s : s + n] = a
+        self._buf[1, s : s + n] = od
+        self._buf[2, s : s + n] = id_
+        self._n += n
+        return n
+
+    def samples(self):
+        """当前累积的 angle / od / id 视图（不拷贝）"""
+        b = self._buf[:, : self._n]
+        return b[0], b[1], b[2]
+
+    def compute(self, tolerances=None) -> FrpResult:
+        return compute_arrays(*self.samples(), tolerances=tolerances)
@@ -0,0 +1,75 @@
+"""
+不带界面的核心包：配置、状态模型、计算后端、测量流程、多工位。
+
+    import frp
+    cfg = frp.load_config()
+    frp.set_backend("numpy")
+    session = frp.MeasurementSession(...)
+
+import frp 本身只有几毫秒：下面的名字都是第一次用到时才 import 对应模块
+（numpy / asyncio 之类也是那时才加载）。整个包不会 import Kivy / KivyMD / matplotlib，
+工作进程、命令行工具、测试都可以在没有显示器的机器上用。
+检查：python -m tools.check_headless
+"""
+
+import importlib
+
+# 名字 -> 所在模块
+_EXPORTS = {
+    # 配置
+    "DEFAULT_CONFIG": "frp.config",
+    "app_base_dir": "frp.config",
+    "load_config": "frp.config",
+    "resolve_path": "frp.config",
+    "resource_path": "frp.config",
+    "save_config": "frp.config",
+    # 状态模型
+    "LiveData": "logic.models",
+    "Observable": "logic.models",
+    "SystemState": "logic.models",
+    "global_state": "logic.models",
+    "set_scheduler": "logic.models",
+    # 计算后端
+    "BACKENDS": "core.frp_core",
+    "CoreContext": "core.frp_core",
+    "FrpResult": "core.frp_core",
+    "get_backend": "core.frp_core",
+    "result_to_dict": "core.frp_core",
+    "set_backend": "core.frp_core",
+    "DEFAULT_TOLERANCES": "core.frp_numpy",
+    "SectionResult": "core.frp_numpy",
+    "combine_sections": "core.frp_numpy",
+    "compute_arrays": "core.frp_numpy",
+    "compute_sections": "core.frp_numpy",
+    "MeasurementSession": "logic.session",
+    # 测量流程
+    "Edge": "logic.edges",
+    "EdgeDetector": "logic.edges",
+    "EdgeScanner": "logic.edges",
+    "MeasureStep": "logic.measurement_flow",
+    "PipeRejected": "logic.sequencer",
+    "SequenceError": "logic.sequencer",
+    "SequencePlan": "logic.sequencer",
+    "Sequencer": "logic.sequencer",
+    "SimAxis": "logic.sequencer",
+    "Station": "logic.sequencer",
+    "SweepStation": "logic.sequencer",
+    # 多工位
+    "StationConfig": "logic.stations",
+    "StationPool": "logic.stations",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'frp' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value  # 之后直接命中，不再走 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,98 @@
+"""
+本机配置（config/frp_hmi_config.json）和路径工具。
+不依赖 Kivy：工作进程 / 命令行工具 / 测试都从这里读配置。
+"""
+
+import json
+import sys
+from pathlib import Path
+
+
+def app_base_dir() -> Path:
+    """
+    应用外部文件的基准目录：
+    - 开发时：项目根目录（frp/ 的上一级）
+    - 打包 onefile 后：exe 所在目录
+    """
+    if getattr(sys, "frozen", False):
+        # PyInstaller 打包后的 exe
+        return Path(sys.executable).resolve().parent
+    else:
+        # 当前文件在 frp/ 下，根目录是它的上一级
+        return Path(__file__).resolve().parent.parent
+
+
+def resource_path(rel_path: str) -> str:
+    """
+    读取打包进 exe 的资源文件（kv 等）。
+    开发环境：返回源码目录下的路径。
+    onefile：返回 sys._MEIPASS 下的路径。
+    """
+    base = getattr(sys, "_MEIPASS", None)  # PyInstaller onefile 解压目录
+    root = Path(base) if base else Path(__file__).resolve().parent.parent
+    return str(root.joinpath(*rel_path.split("/")))
+
+
+CONFIG_DIR = app_base_dir() / "config"
+CONFIG_PATH = CONFIG_DIR / "frp_hmi_config.json"
+
+DEFAULT_CONFIG = {
+    # 是否连 PLC（logic/plc.py 的 PlcLink 周期轮询状态表写进 global_state）；False = 纯演示
+    "plc_enabled": False,
+    "plc_ip": "192.168.0.10",
+    "plc_port": 502,
+    "samples_per_rev": 180,
+    # 每根管测几个截面
+    "sections_per_pipe": 3,
+    # 找管端：滑台在标称管端 ± 多少 mm 内连续扫描找边（logic/edges.py）；0 = 直接走到标称位置，不找边
+    "edge_search_mm": 50.0,
+    # 原始采样录制目录（.frpcap）；空字符串 = 不录
+    "capture_dir": "",
+    # 演示 / 仿真信号的随机种子，同一个种子每次数据一样
+    "sim_seed": 0,
+    # 谐波分析：最多看到几阶；圆度高斯滤波的截止 UPR（每转波数），0 = 不滤波
+    "harmonics_max": 50,
+    "roundness_filter_upr": 0,
+    # 测量结果库（SQLite）；相对路径相对于应用目录，空字符串 = 不存
+    "results_db": "results/results.db",
+    # 当前批次 / 料号，跟每根管的结果一起存
+    "batch_id": "",
+    "lot_id": "",
+    # SPC：每组几根管、滚动窗口多少根、窗口里至少几组才开始按规则报警
+    "spc_subgroup": 5,
+    "spc_window": 10000,
+    "spc_min_subgroups": 20,
+    # 性能统计（logic/profiling.py）：是否一启动就记；统计文件路径（.prom = Prometheus 文本，
+    # 其他 = JSON，空字符串 = 不写）和写文件的间隔秒数。F12 随时显示统计浮层
+    "profiling": False,
+    "profile_dump": "",
+    "profile_dump_s": 5.0,
+    # 采集放到单独的进程里，经共享内存环（多少个点）交给界面；False = 采集线程和界面同一进程
+    "acquisition_process": False,
+    "acquisition_ring": 1 << 18,
+}
+
+
+def resolve_path(path: str) -> Path:
+    """配置里的相对路径按应用目录解析"""
+    p = Path(path)
+    return p if p.is_absolute() else app_base_dir() / p
+
+
+def load_config() -> dict:
+    if CONFIG_PATH.is_file():
+        try:
+            return {
+                **DEFAULT_CONFIG,
+                **json.loads(CONFIG_PATH.read_text(encoding="utf-8")),
+            }
+        except Exception:
+            # 解析失败时退回默认
+            return DEFAULT_CONFIG.copy()
+    else:
+        return DEFAULT_CONFIG.copy()
+
+
+def save_config(cfg: dict):
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    CONFIG_PATH.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
@@ -0,0 +1,309 @@
+"""
+采集线程：和 Kivy Clock 解耦。
+
+    source.read_block()  ──>  sinks（session / frp_core，采集线程里直接批量写）
+                         └─>  SpscQueue  ──>  UI 按自己的刷新率 drain()
+
+采样节奏只由数据源决定，UI 卡顿只会让队列变深 / 丢显示用的块，
+不会丢测量数据。
+
+采集也可以整个放到单独的进程里（AcquisitionProcess）：
+
+    子进程 source.read_block()  ──>  ShmRing（共享内存）
+    HMI 进程  ShmRingSource ──> AcquisitionWorker ──> sinks（session）
+              曲线 / 数值直接读 ShmRing 的最新窗口（零拷贝）
+
+HMI 进程 GC、重建大表格时采集进程照常出数，回来后从环里接着读。
+"""
+
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+
+from logic.shm_ring import ShmRing
+
+logger = logging.getLogger(__name__)
+
+
+class SampleBlock:
+    """一块连续采样，四列等长：angle / OD / ID / slide 位置"""
+
+    __slots__ = ("angle", "outer", "inner", "slide", "t")
+
+    def __init__(self, angle, outer, inner, slide, t=0.0):
+        self.angle = angle
+        self.outer = outer
+        self.inner = inner
+        self.slide = slide
+        self.t = t  # 块最后一个点的时间戳（perf_counter）
+
+    def __len__(self):
+        return self.angle.shape[0]
+
+
+class SampleSource(ABC):
+    """数据源接口：read_block() 阻塞到有数据为止，返回 SampleBlock 或 None（结束）"""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    @abstractmethod
+    def read_block(self):
+        ...
+
+
+class SpscQueue:
+    """
+    单生产者 / 单消费者的有界队列。
+    deque 的 append / popleft 在 CPython 里是原子的，不需要额外加锁；
+    满了就丢最旧的块（显示用的数据，宁可跳过也不能卡住采集线程）。
+    丢块交给 deque(maxlen) 的 append 自己做：先判断再 popleft 的话，
+    中间 UI 线程可能刚好把队列取空，popleft 会抛 IndexError。
+    """
+
+    def __init__(self, maxlen=256):
+        self.maxlen = int(maxlen)
+        self._q = deque(maxlen=self.maxlen)
+        self.dropped = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return len(self._q)
+
+    def push(self, item):
+        q = self._q
+        if len(q) == self.maxlen:
+            self.dropped += 1
+        q.append(item)
+        depth = len(q)
+        if depth > self.high_water:
+            self.high_water = depth
+
+    def pop_all(self) -> list:
+        q = self._q
+        out = []
+        try:
+            while True:
+                out.append(q.popleft())
+        except IndexError:
+            pass
+        return out
+
+
+class AcquisitionWorker(threading.Thread):
+    """
+    采集线程。sinks 里的回调在采集线程里以 (angle, od, id, slide) 调用，
+    用来直接批量写 MeasurementSession / frp_core；UI 通过 drain() / stats() 取数据。
+    queue_len=0 时不给 UI 留队列（UI 直接读共享内存环的时候），drain() 总是 None。
+    """
+
+    def __init__(self, source: SampleSource, sinks=(), queue_len=256):
+        super().__init__(name="frp-acquisition", daemon=True)
+        self.source = source
+        self.sinks = list(sinks)
+        self.queue = SpscQueue(queue_len) if queue_len else None
+        self._stop_ev = threading.Event()
+
+        # 计数器（只在采集线程里写）
+        self.samples_total = 0
+        self.blocks_total = 0
+        self.empty_reads = 0
+        self.sink_errors = 0
+        self.last_sink_error = ""  # 最近一次 sink 异常，"" 表示没出过错
+        self.last_block_t = 0.0
+        self.latest = None  # 最后一个点 (angle, od, id, slide)
+
+    def run(self):
+        src = self.source
+        src.open()
+        try:
+            while not self._stop_ev.is_set():
+                blk = src.read_block()
+                if blk is None:
+                    break
+                n = len(blk)
+                if n == 0:
+                    self.empty_reads += 1
+                    continue
+
+                for sink in self.sinks:
+                    try:
+                        sink(blk.angle, blk.outer, blk.inner, blk.slide)
+                    except Exception as exc:
+                        # 只在第一次记完整堆栈，之后每块都失败也不刷屏；次数和最近一次看 stats()
+                        if not self.sink_errors:
+                            logger.exception("acquisition sink %r failed", sink)
+                        self.sink_errors += 1
+                        self.last_sink_error = f"{type(exc).__name__}: {exc}"
+
+                self.samples_total += n
+                self.blocks_total += 1
+                self.last_block_t = blk.t
+                self.latest = (
+                    float(blk.angle[-1]),
+                    float(blk.outer[-1]),
+                    float(blk.inner[-1]),
+                    float(blk.slide[-1]),
+                )
+                if self.queue is not None:
+                    self.queue.push(blk)
+        finally:
+            src.close()
+
+    def stop(self, timeout=1.0):
+        self._stop_ev.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def drain(self):
+        """
+        UI 线程调用：把队列里攒下的块一次拼起来返回 (angle, od, id, slide)；
+        没有新数据时返回 None。
+        """
+        if self.queue is None:
+            return None
+        blocks = self.queue.pop_all()
+        if not blocks:
+            return None
+        if len(blocks) == 1:
+            b = blocks[0]
+            return b.angle, b.outer, b.inner, b.slide
+        return tuple(
+            np.concatenate([getattr(b, col) for b in blocks])
+            for col in ("angle", "outer", "inner", "slide")
+        )
+
+    def stats(self) -> dict:
+        """丢块数 / 队列深度等计数，给 UI 或日志看"""
+        age = time.perf_counter() - self.last_block_t if self.last_block_t else math.inf
+        q = self.queue
+        return {
+            "samples_total": self.samples_total,
+            "blocks_total": self.blocks_total,
+            "blocks_dropped": q.dropped if q is not None else 0,
+            "queue_depth": len(q) if q is not None else 0,
+            "queue_high_water": q.high_water if q is not None else 0,
+            "empty_reads": self.empty_reads,
+            "sink_errors": self.sink_errors,
+            "last_sink_error": self.last_sink_error,
+            "last_block_age_s": age,
+        }
+
+
+# ---------- 采集进程 + 共享内存 ----------
+
+
+class ShmRingSource(SampleSource):
+    """
+    从共享内存环读别的进程采到的数据，接到 AcquisitionWorker 上用法和其他数据源一样。
+    读慢了（落后超过环能保证的范围）直接跳到还有效的最旧位置，跳过的点数记在 skipped。
+    """
+
+    def __init__(self, ring: ShmRing, poll_s=0.002, max_block=None):
+        self.ring = ring
+        self.poll_s = float(poll_s)
+        self.max_block = max_block
+        self.skipped = 0
+        self._cursor = None
+
+    def open(self):
+        # 从现在开始读，之前的数据不要
+        self._cursor = self.ring.head
+
+    @property
+    def lag(self) -> int:
+        """环里还没读走的点数"""
+        return self.ring.head - self._cursor if self._cursor is not None else 0
+
+    def read_block(self):
+        if self._cursor is None:
+            self.open()
+        cols, self._cursor, skipped = self.ring.read_new(self._cursor, self.max_block)
+        self.skipped += skipped
+        if cols[0].shape[0]:
+            return SampleBlock(*cols, t=time.perf_counter())
+        if self.ring.closed:
+            return None
+        time.sleep(self.poll_s)
+        return SampleBlock(*(np.empty(0),) * 4, t=time.perf_counter())
+
+
+def _acquisition_main(source_factory, ring_name, slide, stop):
+    """采集子进程：建数据源，一块块写进共享内存环，直到 stop 置位或数据源结束"""
+    ring = ShmRing.attach(ring_name)
+    source = source_factory()
+    # 仿真源的轴向位置跟着 HMI 里的仿真滑台走；真实数据源自己读编码器，没有这个属性
+    follow = hasattr(source, "slide_mm")
+    source.open()
+    try:
+        while not stop.is_set():
+            if follow:
+                source.slide_mm = slide.value
+            blk = source.read_block()
+            if blk is None:
+                break
+            if len(blk):
+                ring.write(blk.angle, blk.outer, blk.inner, blk.slide)
+    finally:
+        source.close()
+        ring.mark_closed()
+        ring.close()
+
+
+class AcquisitionProcess:
+    """
+    采集放到单独的进程里跑，数据写进共享内存环（ring，本进程建、本进程 unlink）。
+    source_factory() 在子进程里调用来建数据源，所以要能 pickle（模块级函数 / functools.partial）。
+    """
+
+    def __init__(self, source_factory, capacity=1 << 18, mp_context="spawn"):
+        self.ring = ShmRing.create(capacity)
+        self._mp = multiprocessing.get_context(mp_context)
+        self._slide = self._mp.Value("d", 0.0, lock=False)
+        self._stop = self._mp.Event()
+        self._proc = self._mp.Process(
+            target=_acquisition_main,
+            args=(source_factory, self.ring.name, self._slide, self._stop),
+            name="frp-acquisition-proc",
+            daemon=True,
+        )
+
+    @property
+    def slide_mm(self) -> float:
+        return self._slide.value
+
+    @slide_mm.setter
+    def slide_mm(self, value):
+        self._slide.value = float(value)
+
+    def start(self):
+        self._proc.start()
+
+    def is_alive(self) -> bool:
+        return self._proc.is_alive()
+
+    def source(self, **kwargs) -> ShmRingSource:
+        """给 AcquisitionWorker 用的数据源（从环里读）"""
+        return ShmRingSource(self.ring, **kwargs)
+
+    def stop(self, timeout=2.0):
+        """停子进程、释放共享内存；读环的 AcquisitionWorker 要先停"""
+        self._stop.set()
+        if self._proc.pid is not None:
+            self._proc.join(timeout)
+            if self._proc.is_alive():
+                self._proc.terminate()
+                self._proc.join(1.0)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
@@ -0,0 +1,258 @@
+"""
+原始采样的录制文件（.frpcap）：只追加写，读的时候整个文件 mmap，
+各截面直接是文件上的 numpy 视图，不整文件读进内存。
+
+文件布局（小端）：
+    文件头 16 字节：magic "FRPCAP01" | JSON 头长度 u32 | 保留 u32
+    JSON 头：版本 / 列定义 / 采集时的配置，补齐到 8 字节对齐
+    之后是一串 chunk，每个 chunk 32 字节头 + 数据：
+        "CHNK" | kind u16 | 保留 u16 | section u32 | n u32 | pos_mm f64 | t f64
+        kind = 0：n 条记录，每条 4 个 float64（angle, OD, ID, slide）
+        kind = 1：n 字节 JSON（管长、结果等收尾信息），补齐到 8 字节
+写到一半断电时最后一个不完整的 chunk 会被忽略。
+"""
+
+import json
+import mmap
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core.frp_numpy import combine_sections, compute_sections
+
+MAGIC = b"FRPCAP01"
+CHUNK_MAGIC = b"CHNK"
+VERSION = 1
+
+KIND_SAMPLES = 0
+KIND_META = 1
+
+_FILE_HEAD = struct.Struct("<8sII")
+_CHUNK_HEAD = struct.Struct("<4sHHIIdd")
+
+COLUMNS = ("angle_deg", "outer_d_mm", "inner_d_mm", "slide_mm")
+RECORD_DTYPE = np.dtype([(name, "<f8") for name in COLUMNS])
+
+
+def _pad8(n: int) -> int:
+    return (-n) % 8
+
+
+class CaptureWriter:
+    """
+    只追加的录制器。接口和 MeasurementSession 的截面流程一致：
+    open_section(pos) -> add_samples(...) -> ... -> close(meta)
+
+    同一截面的点先攒在内存里，攒够 chunk_samples 或换截面时才落盘成一个 chunk；
+    默认一块能装下一整个截面，这样读回来每个截面都是一段连续记录。
+    """
+
+    def __init__(
+        self, path, config: dict = None, chunk_samples: int = 65536, extra: dict = None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_samples = int(chunk_samples)
+        self._buf = np.empty(self.chunk_samples, dtype=RECORD_DTYPE)
+        self._n = 0
+        self._section = -1
+        self._pos_mm = 0.0
+        self.samples_written = 0
+
+        header = {
+            "version": VERSION,
+            "columns": list(COLUMNS),
+            "dtype": "<f8",
+            "created": time.time(),
+            "config": config or {},
+            **(extra or {}),
+        }
+        raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        raw += b" " * _pad8(_FILE_HEAD.size + len(raw))
+        self._f = open(self.path, "wb")
+        self._f.write(_FILE_HEAD.pack(MAGIC, len(raw), 0))
+        self._f.write(raw)
+        self._f.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._f is None
+
+    def open_section(self, pos_mm: float):
+        self.flush()
+        self._section += 1
+        self._pos_mm = float(pos_mm)
+
+    def add_samples(self, angles, outer_d, inner_d, slide_mm=None) -> int:
+        if self._f is None or self._section < 0:
+            return 0
+        a = np.asarray(angles, dtype=np.float64).reshape(-1)
+        n = a.shape[0]
+        if slide_mm is None:
+            slide = self._pos_mm
+        else:
+            slide = np.asarray(slide_mm, dtype=np.float64).reshape(-1)
+        cols = (
+            a,
+            np.asarray(outer_d, dtype=np.float64).reshape(-1),
+            np.asarray(inner_d, dtype=np.float64).reshape(-1),
+            slide,
+        )
+        done = 0
+        while done < n:
+            take = min(n - done, self.chunk_samples - self._n)
+            dst = self._buf[self._n : self._n + take]
+            for name, col in zip(COLUMNS, cols):
+                dst[name] = col if np.ndim(col) == 0 else col[done : done + take]
+            self._n += take
+            done += take
+            if self._n == self.chunk_samples:
+                self.flush()
+        return n
+
+    def add_sample(self, angle_deg, outer_d, inner_d, slide_mm=None) -> int:
+        slide = None if slide_mm is None else (slide_mm,)
+        return self.add_samples((angle_deg,), (outer_d,), (inner_d,), slide)
+
+    def flush(self):
+        """把当前截面攒下的点写成一个 chunk"""
+        if self._f is None or self._n == 0:
+            return
+        head = _CHUNK_HEAD.pack(
+            CHUNK_MAGIC, KIND_SAMPLES, 0, self._section, self._n, self._pos_mm, time.time()
+        )
+        self._f.write(head)
+        self._f.write(self._buf[: self._n].tobytes())
+        self._f.flush()
+        self.samples_written += self._n
+        self._n = 0
+
+    def close(self, meta: dict = None):
+        """收尾：写掉剩余的点，可选再追加一段 JSON（管长、结果等）"""
+        if self._f is None:
+            return
+        self.flush()
+        if meta:
+            raw = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+            head = _CHUNK_HEAD.pack(CHUNK_MAGIC, KIND_META, 0, 0, len(raw), 0.0, time.time())
+            self._f.write(head)
+            self._f.write(raw + b" " * _pad8(len(raw)))
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """
+    mmap 方式读取 .frpcap。打开时只扫一遍 chunk 头建索引，
+    section() 返回的是文件上的结构化数组视图，不拷贝数据。
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        size = self.path.stat().st_size
+        if size < _FILE_HEAD.size:
+            self._file.close()
+            raise ValueError(f"{self.path}: not a capture file")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, hlen, _ = _FILE_HEAD.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path}: bad magic {magic!r}")
+        self.header = json.loads(bytes(self._mm[_FILE_HEAD.size : _FILE_HEAD.size + hlen]))
+        self.meta = {}
+        self.chunks = []  # (section, pos_mm, t, 数据偏移, 记录数)
+        self._scan(_FILE_HEAD.size + hlen, size)
+
+    def _scan(self, off: int, size: int):
+        rec = RECORD_DTYPE.itemsize
+        while off + _CHUNK_HEAD.size <= size:
+            magic, kind, _, section, n, pos, t = _CHUNK_HEAD.unpack_from(self._mm, off)
+            if magic != CHUNK_MAGIC:
+                break
+            data = off + _CHUNK_HEAD.size
+            if kind == KIND_SAMPLES:
+                end = data + n * rec
+                if end > size:
+                    break  # 最后一块没写完整
+                self.chunks.append((section, pos, t, data, n))
+            elif kind == KIND_META:
+                end = data + n + _pad8(n)
+                if data + n > size:
+                    break
+                self.meta.update(json.loads(bytes(self._mm[data : data + n])))
+            else:
+                break
+            off = end
+
+    def close(self):
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                pass  # 外面还拿着截面视图，映射留给 GC 回收
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def sections(self) -> list:
+        return sorted({c[0] for c in self.chunks})
+
+    @property
+    def n_samples(self) -> int:
+        return sum(c[4] for c in self.chunks)
+
+    def section_pos(self, section: int) -> float:
+        for c in self.chunks:
+            if c[0] == section:
+                return c[1]
+        raise KeyError(section)
+
+    def chunk_views(self, section: int) -> list:
+        """某截面的所有 chunk，各自是文件上的零拷贝视图"""
+        return [
+            np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=n, offset=off)
+            for sec, _, _, off, n in self.chunks
+            if sec == section
+        ]
+
+    def section(self, section: int) -> np.ndarray:
+        """
+        某截面的全部记录（结构化数组，字段见 COLUMNS）。
+        只有一个 chunk 时是零拷贝视图；被拆成多块时会拼接一次。
+        """
+        views = self.chunk_views(section)
+        if not views:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return views[0] if len(views) == 1 else np.concatenate(views)
+
+    def compute(self, tolerances=None):
+        """离线重算整根管的 FrpResult（管长优先用录制时记下的 length_mm）"""
+        results = []
+        for sec in self.sections:
+            rec = self.section(sec)
+            parts = compute_sections(rec["angle_deg"], rec["outer_d_mm"], rec["inner_d_mm"])
+            if parts:
+                part = parts[0]
+                part.pos_mm = self.section_pos(sec)
+                results.append(part)
+        return combine_sections(
+            results, length_mm=self.meta.get("length_mm"), tolerances=tolerances
+        )
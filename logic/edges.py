@@ -0,0 +1,179 @@
+"""
+管端检测：滑台连续扫过管端时，从采样流里找探头信号的跳变，位置插值到两个采样点之间。
+
+每个采样点都带着滑台位置（slide 列），所以边的位置直接从数据里算出来：
+分辨率只和 采样间距（= 扫描速度 / 采样率）与插值有关，和轴走多快、停在哪里无关，
+不用再一步一停地试探。
+
+- 阈值：信号高于 level + hysteresis 算“有管”，低于 level - hysteresis 算“没管”，
+  中间沿用上一个状态（滞回），噪声在 level 附近来回穿不会报出一串边
+- 插值：状态翻转时，在 level 的最后一次穿越处两点线性插值，得到边的位置
+- 斜率：穿越处的 dy / dx（信号 / mm），可以用 min_slope 挡掉慢漂移造成的穿越
+
+按块处理，全部是 NumPy 向量运算；块与块之间只留很少的几个点（见 EdgeDetector.feed）。
+"""
+
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+# EdgeScanner 可以看的探头列（和 AcquisitionWorker sink 的参数顺序一致）
+CHANNELS = ("outer", "inner")
+
+
+@dataclass
+class Edge:
+    position_mm: float
+    rising: bool  # True：信号从低到高（滑台从管外进到管上）
+    slope: float  # 穿越处的斜率，信号 / mm；滑台没动时为 inf
+
+
+class EdgeDetector:
+    """
+    流式边缘检测：一块块 feed(位置, 信号)，返回这一块里新确认的边。
+    nan_value=None 时 NaN（掉点）直接丢掉；给一个数时把 NaN 当成这个值（比如“没有目标”= 0）。
+    """
+
+    def __init__(self, level: float, hysteresis: float, min_slope=0.0, nan_value=None,
+                 max_carry=1 << 16):
+        if hysteresis < 0:
+            raise ValueError("hysteresis must be >= 0")
+        self.level = float(level)
+        self.hysteresis = float(hysteresis)
+        self.min_slope = float(min_slope)
+        self.nan_value = nan_value
+        self.max_carry = int(max_carry)
+        self.reset()
+
+    def reset(self):
+        # 上一块留下来的点，和这些点之前的状态（+1 有管 / -1 没管 / 0 还不知道）
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._state = 0
+
+    @property
+    def state(self) -> int:
+        return self._state
+
+    def feed(self, position, signal) -> list:
+        pos = np.asarray(position, dtype=np.float64).reshape(-1)
+        sig = np.asarray(signal, dtype=np.float64).reshape(-1)
+        if pos.shape != sig.shape:
+            raise ValueError("position / signal length mismatch")
+        bad = np.isnan(sig)
+        if bad.any():
+            if self.nan_value is None:
+                pos, sig = pos[~bad], sig[~bad]
+            else:
+                sig = np.where(bad, float(self.nan_value), sig)
+        x = np.concatenate((self._x, pos))
+        y = np.concatenate((self._y, sig))
+        n = y.shape[0]
+        if n == 0:
+            return []
+
+        # 滞回状态：越过上 / 下阈值的点定状态，中间的点沿用前面最近一个定了状态的点
+        idx = np.arange(n)
+        mark = np.zeros(n, dtype=np.int8)
+        mark[y > self.level + self.hysteresis] = 1
+        mark[y < self.level - self.hysteresis] = -1
+        last_mark = np.maximum.accumulate(np.where(mark != 0, idx, -1))
+        state = np.where(last_mark >= 0, mark[np.maximum(last_mark, 0)], self._state)
+        prev = np.empty_like(state)
+        prev[0] = self._state
+        prev[1:] = state[:-1]
+        flips = np.flatnonzero((state != prev) & (prev != 0))
+
+        # level 的哪一边，以及到每个点为止最后一个在下面 / 上面的点
+        above = y >= self.level
+        last_below = np.maximum.accumulate(np.where(above, -1, idx))
+        last_above = np.maximum.accumulate(np.where(above, idx, -1))
+
+        edges = []
+        if flips.size:
+            rising = state[flips] > 0
+            # 翻转之前最后一次穿越 level：j 在起始一侧，j + 1 已经过去
+            j = np.where(rising, last_below[flips], last_above[flips])
+            j = np.clip(j, 0, n - 2) if n > 1 else np.zeros_like(j)
+            k = np.minimum(j + 1, n - 1)
+            dx, dy = x[k] - x[j], y[k] - y[j]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                frac = np.clip(np.where(dy != 0, (self.level - y[j]) / dy, 0.0), 0.0, 1.0)
+                slope = np.where(dx != 0, dy / dx, np.inf)
+            where = x[j] + frac * dx
+            ok = np.abs(slope) >= self.min_slope
+            edges = [
+                Edge(float(p), bool(r), float(s))
+                for p, r, s in zip(where[ok], rising[ok], slope[ok])
+            ]
+
+        # 留给下一块的点：当前已经穿过 level、但还没越过另一个阈值时，从最后一次穿越的地方留起
+        # （之后确认翻转时要用穿越处的两个点插值）；否则只留最后一个点
+        end_state = int(state[-1])
+        end_side = 1 if above[-1] else -1
+        start = n - 1
+        if end_state != 0 and end_side != end_state:
+            cross = int(last_above[-1] if end_state > 0 else last_below[-1])
+            if cross >= 0 and n - cross <= self.max_carry:
+                start = cross
+        self._x = x[start:].copy()
+        self._y = y[start:].copy()
+        self._state = int(state[start])
+        return edges
+
+
+class EdgeScanner:
+    """
+    挂在 AcquisitionWorker 的 sinks 上（在采集线程里调用）。arm() 之后新来的块喂给 EdgeDetector，
+    找到的边攒起来，找边的一方（测量流程线程）用 take() 取走；没 arm 的时候什么都不做。
+    channel 选用哪个探头的读数当边缘信号。
+    """
+
+    def __init__(self, level: float, hysteresis: float, channel="outer", **kwargs):
+        if channel not in CHANNELS:
+            raise ValueError(f"channel must be one of {CHANNELS}")
+        self.channel = channel
+        self.detector = EdgeDetector(level, hysteresis, **kwargs)
+        self._lock = threading.Lock()
+        self._armed = False
+        self._rising = None
+        self._edges = []
+
+    @property
+    def armed(self) -> bool:
+        return self._armed
+
+    @property
+    def state(self) -> int:
+        """arm 之后看到的信号状态：+1 有管 / -1 没管 / 0 还不知道"""
+        return self.detector.state
+
+    def arm(self, rising=None):
+        """开始找边；rising=True / False 只收上升 / 下降沿，None 都收"""
+        with self._lock:
+            self.detector.reset()
+            self._edges = []
+            self._rising = rising
+            self._armed = True
+
+    def disarm(self):
+        with self._lock:
+            self._armed = False
+
+    def add_samples(self, angles, outer_d, inner_d, slide_mm=None):
+        if not self._armed or slide_mm is None:
+            return
+        signal = outer_d if self.channel == "outer" else inner_d
+        with self._lock:
+            if not self._armed:
+                return
+            for e in self.detector.feed(slide_mm, signal):
+                if self._rising is None or e.rising == self._rising:
+                    self._edges.append(e)
+
+    def take(self) -> list:
+        """取走到目前为止找到的边（按时间顺序）"""
+        with self._lock:
+            edges, self._edges = self._edges, []
+        return edges
@@ -0,0 +1,146 @@
+"""
+截面轮廓的谐波分析：把每个截面的半径 r(θ) = d / 2 重采样到等间距角度网格上（logic.resample），
+整根管所有截面（内外径一起）一次 rfft，得到各阶谐波的幅值 / 相位。
+
+    1 阶 ≈ 偏心（测量中心和管子中心不重合）
+    2 阶 = 椭圆度
+    3 阶及以上 = 多棱（lobing）
+
+滤波都在频域里做（对每阶谐波乘一个传递系数），不逐点卷积：
+- gaussian_filter(upr)：ISO 12181-2 的高斯圆度滤波，upr 阶处传递 50 %
+- bandpass(lo, hi)：理想带通，只留 lo..hi 阶
+滤波后的圆度 = 去掉 0 / 1 阶（半径 + 偏心，对应最小二乘圆）后轮廓的峰谷值。
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from logic.resample import resample
+
+
+def gaussian_filter(upr: float):
+    """高斯圆度滤波的传递函数：H(h) = exp(-π (α h / upr)²)，α = √(ln2 / π)"""
+    alpha = math.sqrt(math.log(2.0) / math.pi)
+
+    def transmission(h):
+        return np.exp(-math.pi * (alpha * h / upr) ** 2)
+
+    return transmission
+
+
+def bandpass(lo: int, hi: int):
+    """理想带通：lo..hi 阶原样保留，其余清零"""
+
+    def transmission(h):
+        return ((h >= lo) & (h <= hi)).astype(np.float64)
+
+    return transmission
+
+
+@dataclass
+class HarmonicResult:
+    """幅值是半径上的峰值（mm），相位是弧度；数组形状都是 (截面数, 阶数 + 1)"""
+
+    positions: np.ndarray
+    outer_amp: np.ndarray
+    outer_phase: np.ndarray
+    inner_amp: np.ndarray
+    inner_phase: np.ndarray
+    roundness_outer: np.ndarray  # 滤波后的圆度，(截面数,)
+    roundness_inner: np.ndarray
+    coverage: np.ndarray  # 各截面网格里有实测点的比例（内外径取小），低了说明谱不可信
+
+    @property
+    def max_harmonic(self) -> int:
+        return self.outer_amp.shape[1] - 1
+
+    def ovality(self):
+        """各截面外 / 内圆的椭圆度（2 阶幅值 × 2，即半径的峰峰值）"""
+        return 2.0 * self.outer_amp[:, 2], 2.0 * self.inner_amp[:, 2]
+
+    def dominant(self, lo=2):
+        """各截面外圆 lo 阶以上幅值最大的那一阶"""
+        return lo + np.argmax(self.outer_amp[:, lo:], axis=1)
+
+
+def analyze_profiles(profiles: np.ndarray, max_harmonic: int = None, transmission=None):
+    """
+    核心计算：profiles 为 (m, n) 的等间距半径轮廓，一次 rfft。
+    返回 (幅值, 相位, 滤波后圆度)，前两者形状 (m, max_harmonic + 1)。
+    """
+    p = np.asarray(profiles, dtype=np.float64)
+    n = p.shape[1]
+    spec = np.fft.rfft(p, axis=1)
+    h = np.arange(spec.shape[1])
+    if transmission is not None:
+        spec = spec * transmission(h)
+
+    amp = np.abs(spec) * (2.0 / n)
+    amp[:, 0] *= 0.5
+    if n % 2 == 0:
+        amp[:, -1] *= 0.5  # Nyquist 那一阶没有共轭对
+    phase = np.angle(spec)
+
+    # 圆度：去掉 0 / 1 阶后回到角度域取峰谷值
+    form = spec.copy()
+    form[:, :2] = 0.0
+    roundness = np.ptp(np.fft.irfft(form, n=n, axis=1), axis=1)
+
+    if max_harmonic is not None:
+        amp, phase = amp[:, : max_harmonic + 1], phase[:, : max_harmonic + 1]
+    return amp, phase, roundness
+
+
+def analyze_sections(sections, samples_per_rev: int, max_harmonic: int = 50, transmission=None):
+    """
+    sections：可迭代的 (pos_mm, angle, od, id)，每项一个截面。
+    全部截面先重采样到 samples_per_rev 点的网格上，内外径拼成一个矩阵一次做 FFT。
+    """
+    n = int(samples_per_rev)
+    positions, rows, coverage = [], [], []
+    for pos, angle, od, id_ in sections:
+        grid = resample(angle, od, id_, samples_per_rev=n)
+        positions.append(float(pos))
+        rows.append(grid.values)
+        coverage.append(float(grid.coverage.min()))
+    if not rows:
+        empty = np.empty((0, max_harmonic + 1))
+        none = np.empty(0)
+        return HarmonicResult(none, empty, empty, empty, empty, none, none, none)
+
+    # (截面数, 2, n) -> (2 × 截面数, n)，外 / 内径交替；直径 -> 半径
+    profiles = 0.5 * np.stack(rows).reshape(-1, n)
+    amp, phase, rnd = analyze_profiles(profiles, max_harmonic, transmission)
+    return HarmonicResult(
+        positions=np.asarray(positions),
+        outer_amp=amp[0::2],
+        outer_phase=phase[0::2],
+        inner_amp=amp[1::2],
+        inner_phase=phase[1::2],
+        roundness_outer=rnd[0::2],
+        roundness_inner=rnd[1::2],
+        coverage=np.asarray(coverage),
+    )
+
+
+def analyze_session(session, samples_per_rev: int, max_harmonic: int = 50, transmission=None):
+    """MeasurementSession 的所有截面（截面数据是零拷贝视图）"""
+    return analyze_sections(
+        ((s.pos_mm, s.angle, s.outer, s.inner) for s in session.sections if s.n),
+        samples_per_rev,
+        max_harmonic,
+        transmission,
+    )
+
+
+def analyze_capture(reader, samples_per_rev: int, max_harmonic: int = 50, transmission=None):
+    """logic.capture.CaptureReader 里的所有截面"""
+
+    def sections():
+        for sec in reader.sections:
+            rec = reader.section(sec)
+            yield reader.section_pos(sec), rec["angle_deg"], rec["outer_d_mm"], rec["inner_d_mm"]
+
+    return analyze_sections(sections(), samples_per_rev, max_harmonic, transmission)
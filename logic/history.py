@@ -0,0 +1,128 @@
+"""
+历史结果的分页读取（给 HistoryScreen 的 RecycleView 用，不依赖 Kivy）。
+
+排序 / 筛选都交给 SQL（logic.results_db），每次只取当前一页；
+最近看过的几页缓存着，来回翻页不重复查库。有新结果写入时调 invalidate()。
+"""
+
+import time
+from collections import OrderedDict
+
+# (列名, 表头, 格式)；格式是 str.format 的格式串或者一个函数
+HISTORY_COLUMNS = [
+    ("ts", "Time", lambda v: time.strftime("%m-%d %H:%M:%S", time.localtime(v))),
+    ("batch", "Batch", "{}"),
+    ("lot", "Lot", "{}"),
+    ("outer_diameter_avg", "OD Avg", "{:0.3f}"),
+    ("inner_diameter_avg", "ID Avg", "{:0.3f}"),
+    ("roundness_outer", "Rnd OD", "{:0.3f}"),
+    ("roundness_inner", "Rnd ID", "{:0.3f}"),
+    ("straightness", "Straight", "{:0.3f}"),
+    ("concentricity", "Conc.", "{:0.3f}"),
+    ("length", "Length", "{:0.3f}"),
+    ("ok_flag", "OK?", lambda v: "OK" if v else "NG"),
+]
+
+
+def _formatter(fmt):
+    if callable(fmt):
+        return fmt
+    return fmt.format
+
+
+def format_cell(value, fmt) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return "-"
+    return _formatter(fmt)(value)
+
+
+class HistoryPager:
+    """按页取结果：page 从 0 开始，每页 page_size 行"""
+
+    def __init__(self, store, page_size=100, columns=HISTORY_COLUMNS, cache_pages=8):
+        self.store = store
+        self.page_size = int(page_size)
+        self.columns = list(columns)
+        self.cache_pages = int(cache_pages)
+        self.sort_by = "ts"
+        self.descending = True
+        self.filters = {}
+        self.page = 0
+        self._total = None
+        self._cache = OrderedDict()
+
+    # ---------- 条件 ----------
+
+    def set_sort(self, column: str, descending: bool = None):
+        """按某列排序；同一列再点一次就反过来"""
+        if descending is None:
+            descending = not self.descending if column == self.sort_by else True
+        self.sort_by = column
+        self.descending = bool(descending)
+        self.page = 0
+        self._cache.clear()
+
+    def set_filters(self, **filters):
+        """since / until / batch / lot / ok；值为 None 或空字符串的条件去掉"""
+        self.filters = {k: v for k, v in filters.items() if v is not None and v != ""}
+        self.page = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """库里的数据变了（新写入一根管）：总数和缓存都作废"""
+        self._total = None
+        self._cache.clear()
+
+    # ---------- 页 ----------
+
+    @property
+    def total(self) -> int:
+        if self._total is None:
+            self._total = self.store.count(**self.filters)
+        return self._total
+
+    @property
+    def pages(self) -> int:
+        return max((self.total + self.page_size - 1) // self.page_size, 1)
+
+    def goto(self, page: int) -> int:
+        self.page = min(max(int(page), 0), self.pages - 1)
+        return self.page
+
+    def rows(self, page: int = None) -> list:
+        """某一页（默认当前页）的行：[{"cells": (str, ...), "ok": bool}, ...]"""
+        page = self.page if page is None else page
+        if page in self._cache:
+            self._cache.move_to_end(page)
+            return self._cache[page]
+
+        names = [name for name, _, _ in self.columns]
+        fetch = names if "ok_flag" in names else names + ["ok_flag"]
+        data = self.store.query(
+            fetch,
+            order_by=self.sort_by,
+            descending=self.descending,
+            limit=self.page_size,
+            offset=page * self.page_size,
+            **self.filters,
+        )
+        # 一列一列地格式化，再转成行
+        cells = [
+            [format_cell(v, fmt) for v in data[name].tolist()] for name, _, fmt in self.columns
+        ]
+        rows = [
+            {"cells": tuple(row), "ok": bool(ok)}
+            for row, ok in zip(zip(*cells), data["ok_flag"].tolist())
+        ]
+
+        self._cache[page] = rows
+        while len(self._cache) > self.cache_pages:
+            self._cache.popitem(last=False)
+        return rows
+
+    def span(self) -> tuple:
+        """当前页是第几行到第几行（从 1 开始，给界面显示）"""
+        if self.total == 0:
+            return 0, 0
+        first = self.page * self.page_size + 1
+        return first, min(first + self.page_size - 1, self.total)
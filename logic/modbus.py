@@ -0,0 +1,395 @@
+"""
+asyncio 版 Modbus/TCP 客户端（只用标准库）。
+
+- 长连接：断线后下一次请求自动重连，重连间隔指数退避；
+- 流水线：同一连接上可以同时挂多个请求，按事务号配对响应；
+- 合并读：RegisterMap 把零散的寄存器字段合并成尽量少的连续读；
+- 每种功能码一份延迟直方图（LatencyHistogram）。
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import struct
+import time
+
+# 功能码
+FC_READ_HOLDING = 0x03
+FC_READ_INPUT = 0x04
+FC_WRITE_SINGLE = 0x06
+FC_WRITE_MULTIPLE = 0x10
+
+# 协议限制：一次最多读 125 个、写 123 个寄存器
+MAX_READ_COUNT = 125
+MAX_WRITE_COUNT = 123
+
+_MBAP = struct.Struct(">HHHB")  # 事务号, 协议号(0), 长度, 单元号
+# MBAP 长度字段 = 单元号 1 字节 + PDU（至少 1 字节功能码，最多 253 字节）
+_MBAP_LEN_MIN = 2
+_MBAP_LEN_MAX = 254
+
+
+class ModbusError(Exception):
+    pass
+
+
+class ModbusConnectionError(ModbusError):
+    """连不上 / 连接中途断开 / 超时"""
+
+
+class ModbusException(ModbusError):
+    """从站返回了异常响应"""
+
+    def __init__(self, function: int, code: int):
+        super().__init__(f"modbus exception: function 0x{function:02x}, code {code}")
+        self.function = function
+        self.code = code
+
+
+# ---------- 延迟统计 ----------
+
+
+class LatencyHistogram:
+    """对数分桶的延迟直方图：第 i 个桶上限是 base_s × 2^i，最后一个桶兜底"""
+
+    def __init__(self, base_s=50e-6, buckets=18):
+        self.bounds = [base_s * (2**i) for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds: float):
+        if seconds <= self.bounds[0]:
+            i = 0
+        else:
+            i = min(int(math.ceil(math.log2(seconds / self.bounds[0]))), len(self.bounds))
+        self.counts[i] += 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+
+    def percentile(self, q: float) -> float:
+        """按桶上限估计分位数（偏保守）"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return self.bounds[i] if i < len(self.bounds) else self.max_s
+        return self.max_s
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_s / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+            "max_ms": self.max_s * 1e3,
+            "buckets_ms": [b * 1e3 for b in self.bounds],
+            "counts": list(self.counts),
+        }
+
+
+# ---------- 客户端 ----------
+
+
+class ModbusTcpClient:
+    """单个 TCP 长连接，支持流水线（多个请求同时在途）和断线重连"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 502,
+        unit_id: int = 1,
+        timeout: float = 1.0,
+        max_in_flight: int = 16,
+        backoff_min: float = 0.1,
+        backoff_max: float = 5.0,
+    ):
+        self.host = host
+        self.port = int(port)
+        self.unit_id = int(unit_id)
+        self.timeout = float(timeout)
+        self.backoff_min = float(backoff_min)
+        self.backoff_max = float(backoff_max)
+
+        self._reader = None
+        self._writer = None
+        self._rx_task = None
+        self._pending = {}  # 事务号 -> Future
+        self._tid = itertools.count(1)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._connect_lock = asyncio.Lock()
+        self._backoff = 0.0
+        self._next_attempt = 0.0
+        self._closed = False
+
+        self.latency = {}  # 功能码 -> LatencyHistogram
+        self.reconnects = 0
+        self.timeouts = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def connect(self):
+        """建立连接；失败时按指数退避限制下一次尝试的时间"""
+        async with self._connect_lock:
+            if self.connected:
+                return
+            if self._closed:
+                raise ModbusConnectionError("client closed")
+            wait = self._next_attempt - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.timeout
+                )
+            except (OSError, asyncio.TimeoutError) as exc:
+                self._backoff = min(
+                    max(self._backoff * 2, self.backoff_min), self.backoff_max
+                )
+                # 加一点抖动，避免多个客户端同时重连
+                self._next_attempt = time.monotonic() + self._backoff * random.uniform(
+                    0.8, 1.2
+                )
+                raise ModbusConnectionError(
+                    f"connect {self.host}:{self.port} failed: {exc}"
+                ) from exc
+            if self._backoff:
+                self.reconnects += 1
+            self._backoff = 0.0
+            self._rx_task = asyncio.ensure_future(self._rx_loop())
+
+    async def close(self):
+        self._closed = True
+        self._drop_connection(ModbusConnectionError("client closed"))
+        if self._rx_task is not None:
+            self._rx_task.cancel()
+            try:
+                await self._rx_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._rx_task = None
+
+    def _drop_connection(self, exc: Exception):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        # 在途请求全部失败，调用方自己决定要不要重试
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        if self._backoff == 0.0:
+            self._backoff = self.backoff_min / 2
+
+    async def _rx_loop(self):
+        reader = self._reader
+        try:
+            while True:
+                head = await reader.readexactly(_MBAP.size)
+                tid, proto, length, _unit = _MBAP.unpack(head)
+                if not _MBAP_LEN_MIN <= length <= _MBAP_LEN_MAX:
+                    # 长度不对之后的字节流已经对不齐了，只能断开重连
+                    raise ModbusConnectionError(f"bad MBAP length {length}")
+                pdu = await reader.readexactly(length - 1)
+                fut = self._pending.pop(tid, None)
+                if fut is not None and not fut.done() and proto == 0:
+                    fut.set_result(pdu)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # 接收任务一退出，这条连接上就再也收不到响应：不管什么原因都断开，下次请求重连
+            if self._reader is reader:
+                self._drop_connection(ModbusConnectionError(f"connection lost: {exc!r}"))
+
+    async def request(self, pdu: bytes) -> bytes:
+        """发一个 PDU，等对应事务号的响应 PDU；异常响应转成 ModbusException"""
+        if not self.connected:
+            await self.connect()
+        function = pdu[0]
+        async with self._slots:
+            # 等名额的时候连接可能已经断了
+            if not self.connected:
+                raise ModbusConnectionError("connection lost while waiting for a request slot")
+            tid = next(self._tid) & 0xFFFF
+            fut = asyncio.get_running_loop().create_future()
+            self._pending[tid] = fut
+            t0 = time.perf_counter()
+            self._writer.write(_MBAP.pack(tid, 0, len(pdu) + 1, self.unit_id) + pdu)
+            try:
+                resp = await asyncio.wait_for(fut, self.timeout)
+            except asyncio.TimeoutError:
+                self._pending.pop(tid, None)
+                self.timeouts += 1
+                raise ModbusConnectionError(
+                    f"request 0x{function:02x} timed out after {self.timeout}s"
+                ) from None
+            hist = self.latency.get(function)
+            if hist is None:
+                hist = self.latency[function] = LatencyHistogram()
+            hist.record(time.perf_counter() - t0)
+
+        if resp[0] == function | 0x80:
+            raise ModbusException(function, resp[1])
+        return resp
+
+    # ---------- 常用功能码 ----------
+
+    async def _read(self, function: int, address: int, count: int) -> list:
+        if not 1 <= count <= MAX_READ_COUNT:
+            raise ValueError(f"register count {count} out of range 1..{MAX_READ_COUNT}")
+        resp = await self.request(struct.pack(">BHH", function, address, count))
+        return list(struct.unpack(f">{count}H", resp[2 : 2 + 2 * count]))
+
+    async def read_holding_registers(self, address: int, count: int) -> list:
+        return await self._read(FC_READ_HOLDING, address, count)
+
+    async def read_input_registers(self, address: int, count: int) -> list:
+        return await self._read(FC_READ_INPUT, address, count)
+
+    async def write_register(self, address: int, value: int):
+        await self.request(struct.pack(">BHH", FC_WRITE_SINGLE, address, value & 0xFFFF))
+
+    async def write_registers(self, address: int, values):
+        values = [int(v) & 0xFFFF for v in values]
+        if not 1 <= len(values) <= MAX_WRITE_COUNT:
+            raise ValueError(f"register count {len(values)} out of range 1..{MAX_WRITE_COUNT}")
+        pdu = struct.pack(
+            f">BHHB{len(values)}H",
+            FC_WRITE_MULTIPLE,
+            address,
+            len(values),
+            2 * len(values),
+            *values,
+        )
+        await self.request(pdu)
+
+    def latency_report(self) -> dict:
+        return {f"0x{fc:02x}": h.as_dict() for fc, h in sorted(self.latency.items())}
+
+
+class ModbusPool:
+    """
+    同一个从站的多个长连接；每次请求挑在途最少的那个。
+    PLC 一般限制单连接的在途请求数，多开一两个连接能把吞吐再翻一倍。
+    """
+
+    def __init__(self, host: str, port: int = 502, size: int = 2, **client_kwargs):
+        self.clients = [ModbusTcpClient(host, port, **client_kwargs) for _ in range(size)]
+
+    def _pick(self) -> ModbusTcpClient:
+        return min(self.clients, key=lambda c: (not c.connected, c.in_flight))
+
+    async def connect(self):
+        await asyncio.gather(*(c.connect() for c in self.clients))
+
+    async def close(self):
+        await asyncio.gather(*(c.close() for c in self.clients))
+
+    async def read_holding_registers(self, address: int, count: int) -> list:
+        return await self._pick().read_holding_registers(address, count)
+
+    async def read_input_registers(self, address: int, count: int) -> list:
+        return await self._pick().read_input_registers(address, count)
+
+    async def write_register(self, address: int, value: int):
+        await self._pick().write_register(address, value)
+
+    async def write_registers(self, address: int, values):
+        await self._pick().write_registers(address, values)
+
+    def latency_report(self) -> dict:
+        """所有连接合并后的延迟直方图"""
+        merged = {}
+        for c in self.clients:
+            for fc, h in c.latency.items():
+                m = merged.setdefault(fc, LatencyHistogram())
+                m.counts = [a + b for a, b in zip(m.counts, h.counts)]
+                m.count += h.count
+                m.total_s += h.total_s
+                m.max_s = max(m.max_s, h.max_s)
+        return {f"0x{fc:02x}": h.as_dict() for fc, h in sorted(merged.items())}
+
+
+# ---------- 寄存器表 & 合并读 ----------
+
+# 类型 -> (占用寄存器数, 解码函数)；32 位量按高字在前
+_DECODERS = {
+    "u16": (1, lambda r: r[0]),
+    "i16": (1, lambda r: r[0] - 0x10000 if r[0] & 0x8000 else r[0]),
+    "u32": (2, lambda r: (r[0] << 16) | r[1]),
+    "i32": (2, lambda r: struct.unpack(">i", struct.pack(">HH", r[0], r[1]))[0]),
+    "f32": (2, lambda r: struct.unpack(">f", struct.pack(">HH", r[0], r[1]))[0]),
+}
+
+
+def encode_value(kind: str, value) -> list:
+    """把一个值编码成寄存器列表（写 PLC / 仿真站初始化用）"""
+    if kind in ("u16", "i16"):
+        return [int(value) & 0xFFFF]
+    if kind == "u32":
+        v = int(value) & 0xFFFFFFFF
+        return [v >> 16, v & 0xFFFF]
+    fmt = ">i" if kind == "i32" else ">f"
+    return list(struct.unpack(">HH", struct.pack(fmt, value)))
+
+
+def coalesce(spans, max_gap: int = 8, max_count: int = MAX_READ_COUNT) -> list:
+    """
+    把 (起始地址, 数量) 合并成尽量少的连续读；
+    两段之间空隙不超过 max_gap 就顺带读过去，单次读不超过 max_count。
+    """
+    merged = []
+    for addr, count in sorted(spans):
+        if merged:
+            start, n = merged[-1]
+            end = start + n
+            new_end = max(end, addr + count)
+            if addr - end <= max_gap and new_end - start <= max_count:
+                merged[-1] = (start, new_end - start)
+                continue
+        merged.append((addr, count))
+    return merged
+
+
+class RegisterMap:
+    """
+    一组命名的寄存器字段：name -> (地址, 类型)。
+    read_all() 把所有字段合并成少数几个连续读，并发发出（同一连接上流水线），再解码。
+    """
+
+    def __init__(self, fields: dict, function: int = FC_READ_HOLDING, max_gap: int = 8):
+        self.fields = dict(fields)
+        self.function = function
+        spans = [(addr, _DECODERS[kind][0]) for addr, kind in self.fields.values()]
+        self.plan = coalesce(spans, max_gap=max_gap)
+
+    async def read_all(self, client) -> dict:
+        if self.function == FC_READ_INPUT:
+            reader = client.read_input_registers
+        else:
+            reader = client.read_holding_registers
+        blocks = await asyncio.gather(*(reader(a, n) for a, n in self.plan))
+
+        regs = {}
+        for (start, _), values in zip(self.plan, blocks):
+            for i, v in enumerate(values):
+                regs[start + i] = v
+
+        out = {}
+        for name, (addr, kind) in self.fields.items():
+            width, decode = _DECODERS[kind]
+            out[name] = decode([regs[addr + i] for i in range(width)])
+        return out
@@ -0,0 +1,109 @@
+"""
+进程内的 Modbus/TCP 仿真从站，没有 PLC 时联调 / 压测客户端用。
+
+支持 0x03 / 0x04 / 0x06 / 0x10；保持寄存器和输入寄存器共用一张 65536 的表。
+"""
+
+import asyncio
+import struct
+
+from logic.modbus import (
+    FC_READ_HOLDING,
+    FC_READ_INPUT,
+    FC_WRITE_MULTIPLE,
+    FC_WRITE_SINGLE,
+    MAX_READ_COUNT,
+    MAX_WRITE_COUNT,
+)
+
+_MBAP = struct.Struct(">HHHB")
+
+# Modbus 异常码
+EXC_ILLEGAL_FUNCTION = 1
+EXC_ILLEGAL_ADDRESS = 2
+EXC_ILLEGAL_VALUE = 3
+
+
+class ModbusSimServer:
+    def __init__(self, host="127.0.0.1", port=0, latency_s=0.0):
+        self.host = host
+        self.port = int(port)  # 0 = 让系统分配，start() 之后读 self.port
+        self.latency_s = float(latency_s)  # 人为加的处理延迟，模拟慢 PLC
+        self.registers = [0] * 65536
+        self.requests = 0
+        self._server = None
+        self._conns = set()
+        self._tasks = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for w in list(self._conns):
+                w.close()
+            # 等连接处理协程自己收尾，免得事件循环退出时再被强行取消
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def drop_clients(self):
+        """主动断开所有客户端连接（测重连用）"""
+        for w in list(self._conns):
+            w.close()
+
+    def set_registers(self, address: int, values):
+        self.registers[address : address + len(values)] = [int(v) & 0xFFFF for v in values]
+
+    async def _serve(self, reader, writer):
+        task = asyncio.current_task()
+        self._tasks.add(task)
+        self._conns.add(writer)
+        try:
+            while True:
+                head = await reader.readexactly(_MBAP.size)
+                tid, proto, length, unit = _MBAP.unpack(head)
+                pdu = await reader.readexactly(length - 1)
+                # 每个请求单独处理，响应顺序可以和请求顺序不同（客户端按事务号配对）
+                asyncio.ensure_future(self._reply(writer, tid, unit, pdu))
+        except (asyncio.IncompleteReadError, OSError):
+            pass
+        finally:
+            self._conns.discard(writer)
+            self._tasks.discard(task)
+            writer.close()
+
+    async def _reply(self, writer, tid, unit, pdu):
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        self.requests += 1
+        resp = self._handle(pdu)
+        if not writer.is_closing():
+            writer.write(_MBAP.pack(tid, 0, len(resp) + 1, unit) + resp)
+
+    def _handle(self, pdu: bytes) -> bytes:
+        fc = pdu[0]
+        regs = self.registers
+        if fc in (FC_READ_HOLDING, FC_READ_INPUT):
+            addr, count = struct.unpack(">HH", pdu[1:5])
+            if not 1 <= count <= MAX_READ_COUNT:
+                return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+            if addr + count > len(regs):
+                return bytes([fc | 0x80, EXC_ILLEGAL_ADDRESS])
+            return struct.pack(f">BB{count}H", fc, 2 * count, *regs[addr : addr + count])
+        if fc == FC_WRITE_SINGLE:
+            addr, value = struct.unpack(">HH", pdu[1:5])
+            regs[addr] = value
+            return pdu[:5]
+        if fc == FC_WRITE_MULTIPLE:
+            addr, count, _nbytes = struct.unpack(">HHB", pdu[1:6])
+            if not 1 <= count <= MAX_WRITE_COUNT:
+                return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+            if addr + count > len(regs):
+                return bytes([fc | 0x80, EXC_ILLEGAL_ADDRESS])
+            regs[addr : addr + count] = struct.unpack(f">{count}H", pdu[6 : 6 + 2 * count])
+            return pdu[:5]
+        return bytes([fc | 0x80, EXC_ILLEGAL_FUNCTION])
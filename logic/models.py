@@ -1,23 +1,130 @@
+import threading
+import time
 from dataclasses import dataclass, field
 
+# 通知调度：fn(callback) 负责让 callback 在 UI 线程里尽快跑一次。
+# App 启动时设成 Clock.schedule_once；None 时（无界面脚本）改了就在当前线程同步通知。
+_scheduler = None
+
+
+def set_scheduler(fn):
+    global _scheduler
+    _scheduler = fn
+
+
+def _same(a, b) -> bool:
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):  # 比如 numpy 数组，按“变了”处理
+        return False
+
+
+class Observable:
+    """
+    可订阅的状态对象：公开字段被赋成不同的值时记为 dirty，
+    同一轮里的多次修改合并成一次通知，回调拿到的是这一轮变过的字段名集合。
+    可以在任意线程里改（采集 / PLC 线程），回调总是在调度器安排的线程里跑。
+    """
+
+    def __post_init__(self):
+        object.__setattr__(self, "_obs_lock", threading.Lock())
+        object.__setattr__(self, "_dirty", set())
+        object.__setattr__(self, "_pending", False)
+        object.__setattr__(self, "_listeners", [])
+
+    def __setattr__(self, name, value):
+        d = self.__dict__
+        if name[0] == "_" or "_obs_lock" not in d:
+            object.__setattr__(self, name, value)
+            return
+        old = d.get(name, _MISSING)
+        object.__setattr__(self, name, value)
+        if not _same(old, value):
+            self._mark(name)
+
+    def _mark(self, name: str):
+        with self._obs_lock:
+            self._dirty.add(name)
+            if self._pending:
+                return
+            self._pending = True
+        if _scheduler is None:
+            self.flush()
+        else:
+            _scheduler(self.flush)
+
+    def flush(self):
+        """把攒下的修改一次通知出去（一般由调度器调用）"""
+        with self._obs_lock:
+            changed = self._dirty
+            self._dirty = set()
+            self._pending = False
+        if not changed:
+            return
+        for fields, callback in list(self._listeners):
+            if fields is None or not fields.isdisjoint(changed):
+                callback(changed)
+
+    def subscribe(self, callback, fields=None):
+        """callback(changed: set)；fields 给了的话只关心这些字段"""
+        self.unsubscribe(callback)
+        self._listeners.append((None if fields is None else frozenset(fields), callback))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._listeners[:] = [(f, cb) for f, cb in self._listeners if cb != callback]
+
+
+_MISSING = object()
+
 
 @dataclass
-class LiveData:
+class LiveData(Observable):
     outer_diameter: float = 0.0
     inner_diameter: float = 0.0
     angle_deg: float = 0.0
     slide_pos_mm: float = 0.0
     status_text: str = "READY"
+    # 自动测量当前步骤号（1~7），Auto 页的步骤高亮跟着它走
+    current_step: int = 0
+    # 各轴位置（PLC 状态表 / Manual 页 Jog），名字和 logic.plc.STATUS_FIELDS 一致
+    od_slide_mm: float = 0.0  # 外径滑台
+    id_slide_mm: float = 0.0  # 内径滑台（共轨）
+    id_head_mm: float = 0.0  # 内径测头伸缩
+    pipe_angle_deg: float = 0.0  # 主旋转
+    aux_angle_deg: float = 0.0  # 从旋转
 
 
 @dataclass
-class SystemState:
+class SystemState(Observable):
     live: LiveData = field(default_factory=LiveData)
     current_step: str = "Idle"
     servo_x_on: bool = False
     servo_y_on: bool = False
     servo_r_on: bool = False
     alarm: bool = False
+    # 报警记录 (时间戳, 来源, 内容)，新的在后面；整个换成新元组才会触发通知
+    alarms: tuple = ()
+    # 当前这根管的 MeasurementSession（logic.session），没在测时为 None
+    session: object = None
+
+    def raise_alarm(self, message: str, source: str = ""):
+        """记一条报警并置 alarm（任意线程可调）；只保留最近 MAX_ALARMS 条"""
+        entry = (time.time(), source, message)
+        with _alarm_lock:
+            self.alarms = (self.alarms + (entry,))[-MAX_ALARMS:]
+        self.alarm = True
+
+    def clear_alarms(self):
+        with _alarm_lock:
+            self.alarms = ()
+        self.alarm = False
+
+
+MAX_ALARMS = 200
+_alarm_lock = threading.Lock()
 
 
 global_state = SystemState()
@@ -0,0 +1,156 @@
+"""
+HMI 用到的 PLC 寄存器表 + 周期轮询。
+
+地址 / 类型要和 PLC 程序保持一致；所有状态字段挨得很近，
+一次合并读（30 来个寄存器）就能拿全，不用每个量单独发请求。
+"""
+
+import asyncio
+import threading
+
+from logic.measurement_flow import STEP_LABELS, MeasureStep
+from logic.modbus import ModbusConnectionError, ModbusError, ModbusPool, RegisterMap
+
+# name -> (地址, 类型)
+STATUS_FIELDS = {
+    "od_slide_mm": (100, "f32"),
+    "id_slide_mm": (102, "f32"),
+    "id_head_mm": (104, "f32"),
+    "pipe_angle_deg": (106, "f32"),
+    "aux_angle_deg": (108, "f32"),
+    "servo_bits": (120, "u16"),
+    "step": (130, "u16"),
+    "alarm_code": (131, "u16"),
+}
+
+# servo_bits 里各伺服的位
+SERVO_BITS = {"servo_x_on": 0, "servo_y_on": 1, "servo_r_on": 2}
+
+STATUS_MAP = RegisterMap(STATUS_FIELDS, max_gap=16)
+
+# 各轴的命令块：base = 目标值 f32，base + 2 = 命令字 u16（PLC 执行后自己清零）
+AXIS_COMMAND_BASE = {
+    "od_slide": 200,
+    "id_slide": 210,
+    "id_head": 220,
+    "pipe_rot": 230,
+    "aux_rot": 240,
+}
+# 各轴当前位置在状态表里的字段名
+AXIS_POSITION_FIELD = {
+    "od_slide": "od_slide_mm",
+    "id_slide": "id_slide_mm",
+    "id_head": "id_head_mm",
+    "pipe_rot": "pipe_angle_deg",
+    "aux_rot": "aux_angle_deg",
+}
+CMD_MOVE_ABS = 1
+CMD_HOME = 2
+CMD_STOP = 3
+
+
+def apply_status(state, status: dict):
+    """把一次轮询结果写进 SystemState"""
+    live = state.live
+    for name in ("od_slide_mm", "id_slide_mm", "id_head_mm", "pipe_angle_deg", "aux_angle_deg"):
+        setattr(live, name, status[name])
+    live.slide_pos_mm = status["od_slide_mm"]
+
+    bits = status["servo_bits"]
+    for name, bit in SERVO_BITS.items():
+        setattr(state, name, bool(bits >> bit & 1))
+
+    try:
+        state.current_step = STEP_LABELS[MeasureStep(status["step"])]
+    except ValueError:
+        state.current_step = f"Step {status['step']}"
+    state.alarm = status["alarm_code"] != 0
+
+
+class PlcLink:
+    """
+    后台线程里跑一个 asyncio 事件循环，周期轮询 PLC 状态并写进 state。
+    UI 线程只读 state / stats，不会被网络阻塞；写命令用 submit()。
+    """
+
+    def __init__(self, host: str, port: int = 502, state=None, period_s=0.05, pool_size=2):
+        self.host = host
+        self.port = int(port)
+        self.state = state
+        self.period_s = float(period_s)
+        self.pool_size = int(pool_size)
+        self.status = None
+        self.errors = 0
+        self.last_error = ""
+        self.pool = None
+        self._loop = None
+        self._thread = None
+        self._stop = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._stop = asyncio.Event()
+            self.pool = ModbusPool(self.host, self.port, size=self.pool_size)
+            ready.set()
+            try:
+                self._loop.run_until_complete(self._poll_loop())
+            finally:
+                self._loop.run_until_complete(self.pool.close())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="frp-plc", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout=2.0):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, coro_fn):
+        """
+        在 PLC 线程里执行 coro_fn(pool)，返回 concurrent.futures.Future。
+        例：link.submit(lambda p: p.write_register(200, 1))
+        """
+        return asyncio.run_coroutine_threadsafe(coro_fn(self.pool), self._loop)
+
+    async def _poll_loop(self):
+        loop = asyncio.get_running_loop()
+        next_t = loop.time()
+        while not self._stop.is_set():
+            try:
+                status = await STATUS_MAP.read_all(self.pool)
+            except (ModbusConnectionError, ModbusError) as exc:
+                self.errors += 1
+                self.last_error = str(exc)
+            else:
+                self.status = status
+                if self.state is not None:
+                    apply_status(self.state, status)
+
+            # 固定节拍轮询；落后了就从现在重新对齐，不补发
+            next_t += self.period_s
+            delay = next_t - loop.time()
+            if delay < 0:
+                next_t = loop.time()
+                delay = 0
+            try:
+                await asyncio.wait_for(self._stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "reconnects": sum(c.reconnects for c in self.pool.clients) if self.pool else 0,
+            "latency": self.pool.latency_report() if self.pool else {},
+        }
@@ -0,0 +1,99 @@
+"""
+曲线控件用的纯 NumPy 计算（不依赖 Kivy，方便在无界面环境下复用 / 压测）。
+
+顶点格式和 Kivy Mesh 默认格式一致：每个点 4 个 float32 (x, y, u, v)，
+u / v 不用，保持 0。
+"""
+
+import numpy as np
+
+VERTEX_SIZE = 4
+
+
+def new_vertex_buffer(capacity: int) -> np.ndarray:
+    """预分配 (capacity, 4) 的 float32 顶点缓冲，给 Mesh 原地使用"""
+    return np.zeros((int(capacity), VERTEX_SIZE), dtype=np.float32)
+
+
+def autoscale(v_min: float, v_max: float, margin: float = 0.3):
+    """按数据范围留出上下余量；完全不变时给一点假的跨度，避免全挤在中间"""
+    span = v_max - v_min
+    if span == 0:
+        span = 0.01
+    return v_min - margin * span, v_max + margin * span
+
+
+def minmax_decimate(values, n_buckets: int):
+    """
+    min-max（包络）抽稀：把序列等分成不超过 n_buckets 个桶，每桶只留最小值和最大值
+    两个点（按原先后顺序），峰谷不会被抽掉。
+    返回 (index, values)：保留点在原序列里的下标和对应的值。
+    点数本来就不多于 2 × n_buckets 时原样返回。
+    """
+    v = np.asarray(values, dtype=np.float64).reshape(-1)
+    n = v.shape[0]
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n), v
+
+    size = -(-n // n_buckets)  # 每桶点数，向上取整
+    m = n // size
+    body = v[: m * size].reshape(m, size)
+    i_min = body.argmin(axis=1)
+    i_max = body.argmax(axis=1)
+    base = np.arange(m) * size
+
+    if m * size < n:
+        # 最后不满一桶的尾巴单独算
+        tail = v[m * size :]
+        i_min = np.append(i_min, tail.argmin())
+        i_max = np.append(i_max, tail.argmax())
+        base = np.append(base, m * size)
+
+    idx = np.empty(2 * base.shape[0], dtype=np.intp)
+    idx[0::2] = base + np.minimum(i_min, i_max)
+    idx[1::2] = base + np.maximum(i_min, i_max)
+    return idx, v[idx]
+
+
+def map_to_vertices(values, vmin, vmax, x0, y0, w, h, out, index=None, span=None) -> int:
+    """
+    一次向量化把数据映射到屏幕坐标，结果写进 out 的前 n 行：
+    - X：按索引线性铺满整个宽度；抽稀过的数据传 index（原下标）和 span（原点数）
+    - Y：映射到高度的 10%~90%，超出范围的截掉
+    返回写入的点数 n（不超过 out 的容量，多的只保留最新的部分）。
+    """
+    v = np.asarray(values, dtype=np.float64).reshape(-1)
+    n = min(v.shape[0], out.shape[0])
+    if n == 0:
+        return 0
+    v = v[-n:]
+
+    xs = out[:n, 0]
+    if index is None:
+        denom = n - 1 if n > 1 else 1
+        np.multiply(np.arange(n, dtype=np.float32), np.float32(w / denom), out=xs)
+    else:
+        if span is None:
+            span = int(index[-1]) + 1
+        denom = span - 1 if span > 1 else 1
+        np.multiply(np.asarray(index)[-n:], w / denom, out=xs, casting="same_kind")
+    xs += np.float32(x0)
+
+    ys = out[:n, 1]
+    if vmax == vmin:
+        ys.fill(0.5)
+    else:
+        np.clip((v - vmin) * (1.0 / (vmax - vmin)), 0.0, 1.0, out=ys, casting="same_kind")
+    ys *= np.float32(0.8 * h)
+    ys += np.float32(y0 + 0.1 * h)
+    return n
+
+
+def series_to_vertices(values, vmin, vmax, x0, y0, w, h, out) -> int:
+    """
+    一条曲线从数据到顶点的完整流程：按宽度做 min-max 抽稀（每像素最多 2 个点），
+    再映射到屏幕坐标写进 out。返回顶点数。
+    """
+    v = np.asarray(values, dtype=np.float64).reshape(-1)
+    idx, dec = minmax_decimate(v, max(int(w), 1))
+    return map_to_vertices(dec, vmin, vmax, x0, y0, w, h, out, idx, v.shape[0])
@@ -0,0 +1,273 @@
+"""
+热点耗时统计：每个回调的耗时直方图、定时器节拍抖动、计数器（原生库 ctypes 调用次数等）。
+
+    @profiling.timed("live_plot.update_data")
+    def update_data(...): ...
+
+    with profiling.span("session.compute_section"):
+        ...
+
+    Clock.schedule_interval(profiling.interval("auto.ui_refresh", period, cb), period)
+
+默认关闭，关闭时 timed / span 只多一次全局变量判断。打开方式：
+    FRP_PROFILE=1 python main.py        或 配置里 "profiling": true
+界面上按 F12 显示 / 隐藏统计浮层（ui/widgets/perf_overlay.py）；
+配置 "profile_dump" 给了路径时后台线程定期写文件：.prom / .txt 为 Prometheus 文本格式，其他为 JSON。
+
+不依赖 Kivy。
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from functools import wraps
+
+ENV_VAR = "FRP_PROFILE"
+
+# 总开关；模块级变量，热路径里只读它
+enabled = os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes")
+
+# 直方图桶的上界（ms），最后还有一个 +Inf 桶
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 16.7, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+_T0 = time.perf_counter()
+_timers = {}  # 名字 -> Histogram
+_counters = {}  # 名字 -> int
+_lock = threading.Lock()
+_NULL = nullcontext()
+
+
+class Histogram:
+    """固定桶的耗时直方图（ms），另外记总数 / 总和 / 最大值"""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float):
+        self.buckets[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数：返回落到的那个桶的上界（不超过最大值）"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.buckets):
+            seen += c
+            if seen >= rank and c:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 4),
+            "mean_ms": round(self.mean, 4),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "max_ms": round(self.max, 4),
+            "buckets": dict(zip([*map(str, BUCKETS_MS), "+Inf"], self.buckets)),
+        }
+
+
+def enable(on: bool = True):
+    global enabled
+    enabled = bool(on)
+    # 原生库的调用计数由 frp_core 自己记，开关同步过去（没 import 过就等它 import 时读环境变量）
+    core = sys.modules.get("core.frp_core")
+    if core is not None:
+        core.count_calls(enabled)
+
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+    core = sys.modules.get("core.frp_core")
+    if core is not None:
+        core.reset_call_counts()
+
+
+def _timer(name: str) -> Histogram:
+    h = _timers.get(name)
+    if h is None:
+        with _lock:
+            h = _timers.setdefault(name, Histogram())
+    return h
+
+
+def record(name: str, ms: float):
+    """记一次耗时（ms）"""
+    if enabled:
+        _timer(name).add(ms)
+
+
+def count(name: str, n: int = 1):
+    if enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def timed(name: str = None):
+    """装饰器：记录每次调用的耗时；关闭时直接调原函数"""
+
+    def deco(fn):
+        key = name or fn.__qualname__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return fn(*args, **kwargs)
+            t = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _timer(key).add((time.perf_counter() - t) * 1000.0)
+
+        return wrapper
+
+    return deco
+
+
+class _Span:
+    __slots__ = ("name", "t")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _timer(self.name).add((time.perf_counter() - self.t) * 1000.0)
+        return False
+
+
+def span(name: str):
+    """with profiling.span("xxx"): ...；关闭时返回一个共享的空上下文"""
+    return _Span(name) if enabled else _NULL
+
+
+def interval(name: str, period_s: float, fn):
+    """
+    包一层 Clock.schedule_interval 的回调：
+    name 记回调本身的耗时，name + ".jitter" 记实际间隔 dt 和设定周期之差的绝对值。
+    """
+
+    @wraps(fn)
+    def wrapper(dt):
+        if not enabled:
+            return fn(dt)
+        _timer(name + ".jitter").add(abs(dt - period_s) * 1000.0)
+        t = time.perf_counter()
+        try:
+            return fn(dt)
+        finally:
+            _timer(name).add((time.perf_counter() - t) * 1000.0)
+
+    return wrapper
+
+
+# ---------- 导出 ----------
+
+
+def snapshot() -> dict:
+    with _lock:
+        timers = {name: h.to_dict() for name, h in sorted(_timers.items())}
+    counters = dict(sorted(_counters.items()))
+    core = sys.modules.get("core.frp_core")
+    if core is not None:
+        for fn, n in core.call_counts().items():
+            counters[f"ctypes.{fn}"] = n
+    return {
+        "enabled": enabled,
+        "time": time.time(),
+        "uptime_s": round(time.perf_counter() - _T0, 3),
+        "timers": timers,
+        "counters": counters,
+    }
+
+
+def _metric_name(name: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in name)
+
+
+def to_prometheus(snap: dict = None) -> str:
+    """Prometheus 文本格式：每个计时器一组 histogram（单位秒），计数器为 counter"""
+    snap = snap or snapshot()
+    lines = [
+        "# HELP frp_callback_seconds Callback latency.",
+        "# TYPE frp_callback_seconds histogram",
+    ]
+    for name, h in snap["timers"].items():
+        label = f'name="{name}"'
+        cum = 0
+        for le, c in h["buckets"].items():
+            cum += c
+            le_s = le if le == "+Inf" else repr(float(le) / 1000.0)
+            lines.append(f'frp_callback_seconds_bucket{{{label},le="{le_s}"}} {cum}')
+        lines.append(f"frp_callback_seconds_sum{{{label}}} {h['total_ms'] / 1000.0}")
+        lines.append(f"frp_callback_seconds_count{{{label}}} {h['count']}")
+    for name, n in snap["counters"].items():
+        metric = f"frp_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {n}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path):
+    """写一次快照；先写临时文件再替换，读的一方不会看到半个文件"""
+    path = str(path)
+    snap = snapshot()
+    if path.endswith((".prom", ".txt")):
+        text = to_prometheus(snap)
+    else:
+        text = json.dumps(snap, indent=2)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class DumpThread(threading.Thread):
+    """后台定期 dump()，UI 线程不碰文件"""
+
+    def __init__(self, path, period_s: float = 5.0):
+        super().__init__(name="frp-profile-dump", daemon=True)
+        self.path = path
+        self.period_s = period_s
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.period_s):
+            self._dump()
+        self._dump()  # 退出前再写一次
+
+    def _dump(self):
+        try:
+            dump(self.path)
+        except OSError:
+            pass  # 磁盘满 / 没权限：统计而已，不影响测量
+
+    def stop(self, timeout: float = 2.0):
+        self._stop_event.set()
+        self.join(timeout)
@@ -0,0 +1,215 @@
+"""
+把编码器给的不等间距角度采样整理到固定的 samples_per_rev 点角度网格上。
+
+原始 angle_deg 什么样都有：转过 360° 回绕到 0、同一个角度重复好几次（停转 / 多转重叠）、
+中间缺一段（丢包 / 探头掉点写成 NaN）。这里整块用 NumPy 处理，没有逐点的 Python 循环：
+
+1. 回绕：数回绕次数得到展开后的角度跨度（实际转了几圈）；unwrap_deg() 给需要整段连续角度的地方用
+2. 分桶：角度取模后按网格分桶，所有通道用同一次 bincount 求和 / 计数，
+   重复角度、多转重叠的点自然在桶里取平均（去重）
+3. 点不比格子密多少时改用插值：按角度排序、相同角度先合并，再周期线性插值到网格
+4. 空桶按周期线性插值补上，并标记出来（filled=False）；NaN / inf 的点记为掉点
+   （角度是 NaN / inf 的点各通道都算掉点，不进任何格子）
+
+GridAccumulator 可以一块一块地喂（采集线程里用），resample() 是一次性的便捷写法。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+def grid_angles(samples_per_rev: int) -> np.ndarray:
+    """网格中心角度（度）：第 k 格覆盖 [k, k+1) × 360 / n"""
+    n = int(samples_per_rev)
+    return (np.arange(n) + 0.5) * (360.0 / n)
+
+
+def unwrap_deg(angle_deg, prev: float = None) -> np.ndarray:
+    """把回绕的角度展开成连续角度；prev 是上一块最后一个展开后的角度（分块时接上）"""
+    a = np.asarray(angle_deg, dtype=np.float64).reshape(-1)
+    if a.shape[0] == 0:
+        return a
+    if prev is not None:
+        a = np.concatenate(([prev], a))
+    u = np.unwrap(a, period=360.0)  # 第一个值保持不变，所以接上 prev 后直接去掉它
+    return u[1:] if prev is not None else u
+
+
+def fill_gaps(values: np.ndarray, filled: np.ndarray, samples_per_rev: int) -> np.ndarray:
+    """(c, n) 里没数据的格子按周期线性插值补上（原地），整行都没数据的保持 NaN"""
+    if filled.all():
+        return values
+    centers = grid_angles(samples_per_rev)
+    for row, ok in zip(values, filled):
+        if ok.all():
+            continue
+        if not ok.any():
+            row[:] = np.nan
+            continue
+        row[~ok] = np.interp(centers[~ok], centers[ok], row[ok], period=360.0)
+    return values
+
+
+def gap_runs(filled: np.ndarray):
+    """一行 filled 里连续空格子的 (起始格, 长度)，首尾相接的空段算一段"""
+    empty = ~np.asarray(filled, dtype=bool)
+    n = empty.shape[0]
+    if not empty.any():
+        return []
+    if empty.all():
+        return [(0, n)]
+    # 从一个有数据的格子之后开始数，回绕的空段就不会被拆成两段
+    shift = int(np.flatnonzero(~empty)[-1]) + 1
+    e = np.roll(empty, -shift).astype(np.int8)
+    edges = np.diff(np.concatenate(([0], e, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return [(int((s + shift) % n), int(t - s)) for s, t in zip(starts, ends)]
+
+
+@dataclass
+class Resampled:
+    """重采样结果；values / count / filled 的形状都是 (通道数, samples_per_rev)"""
+
+    values: np.ndarray
+    count: np.ndarray
+    filled: np.ndarray
+    dropouts: np.ndarray  # 每个通道的 NaN / inf 点数
+    n_samples: int
+    revs: float  # 展开后的角度跨度 / 360
+
+    @property
+    def samples_per_rev(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def coverage(self) -> np.ndarray:
+        """每个通道有实测数据的格子占比"""
+        return self.filled.mean(axis=1)
+
+    def max_gap_deg(self) -> np.ndarray:
+        """每个通道最长的连续空段（度）"""
+        step = 360.0 / self.samples_per_rev
+        return np.array([max((l for _, l in gap_runs(f)), default=0) * step for f in self.filled])
+
+
+class GridAccumulator:
+    """
+    按块累加的角度网格：update() 每块做一次分桶 + 一次 bincount，
+    result() 时才除计数、补空格子。多个通道（如 OD / ID）共用同一套角度。
+    """
+
+    def __init__(self, samples_per_rev: int, channels: int = 2):
+        self.samples_per_rev = int(samples_per_rev)
+        self.channels = int(channels)
+        size = self.channels * self.samples_per_rev
+        self._sum = np.zeros(size)
+        self._count = np.zeros(size, dtype=np.int64)
+        self.dropouts = np.zeros(self.channels, dtype=np.int64)
+        self.n_samples = 0
+        self._first = None  # 展开后的第一个 / 最后一个角度
+        self._last = None
+        self._raw_last = None
+        self._turns = 0
+
+    def bins(self, angle_deg) -> np.ndarray:
+        """每个点落在哪一格；先取整再对整数取模，比浮点 np.mod 快一倍多，负角度也对"""
+        x = np.asarray(angle_deg, dtype=np.float64) * (self.samples_per_rev / 360.0)
+        idx = np.floor(x).astype(np.intp)
+        idx %= self.samples_per_rev
+        return idx
+
+    def update(self, angle_deg, *channels):
+        a = np.asarray(angle_deg, dtype=np.float64).reshape(-1)
+        m = a.shape[0]
+        if m == 0:
+            return
+        if len(channels) != self.channels:
+            raise ValueError(f"expected {self.channels} channels, got {len(channels)}")
+        a_ok = np.isfinite(a)
+        all_a_ok = a_ok.all()
+        if all_a_ok:
+            self._track_turns(a)
+        elif a_ok.any():
+            self._track_turns(a[a_ok])
+
+        n = self.samples_per_rev
+        size = self.channels * n
+        v = np.empty((self.channels, m))
+        for k, ch in enumerate(channels):
+            v[k] = np.asarray(ch, dtype=np.float64).reshape(-1)
+        # 所有通道拼成一条索引：通道 k 的第 b 格 -> k * n + b，一次 bincount 搞定
+        # 角度无效的点先放到第 0 格（取整不报警），下面用 ok 排除掉、记成掉点
+        b = self.bins(a if all_a_ok else np.where(a_ok, a, 0.0))
+        idx = b[None, :] + (np.arange(self.channels) * n)[:, None]
+        ok = np.isfinite(v)
+        if not all_a_ok:
+            ok &= a_ok
+        if ok.all():
+            # 常见情况：没有掉点，各通道计数相同，只数一次
+            self._sum += np.bincount(idx.reshape(-1), weights=v.reshape(-1), minlength=size)
+            self._count += np.tile(np.bincount(b, minlength=n), self.channels)
+        else:
+            self.dropouts += m - ok.sum(axis=1)
+            self._sum += np.bincount(idx[ok], weights=v[ok], minlength=size)
+            self._count += np.bincount(idx[ok], minlength=size)
+        self.n_samples += m
+
+    def _track_turns(self, a):
+        """只数回绕次数来得到转过的角度（和 unwrap 结果一致），不用把整块展开"""
+        if self._first is None:
+            self._first = self._raw_last = float(a[0])
+        d = np.diff(a, prepend=self._raw_last)
+        self._turns += int(np.count_nonzero(d < -180.0)) - int(np.count_nonzero(d > 180.0))
+        self._raw_last = float(a[-1])
+        self._last = self._raw_last + 360.0 * self._turns
+
+    def result(self) -> Resampled:
+        n = self.samples_per_rev
+        count = self._count.reshape(self.channels, n)
+        filled = count > 0
+        values = np.full((self.channels, n), np.nan)
+        np.divide(self._sum.reshape(self.channels, n), count, out=values, where=filled)
+        revs = 0.0 if self._first is None else abs(self._last - self._first) / 360.0
+        return Resampled(
+            values=fill_gaps(values, filled, n),
+            count=count.copy(),
+            filled=filled,
+            dropouts=self.dropouts.copy(),
+            n_samples=self.n_samples,
+            revs=revs,
+        )
+
+
+def _interp_sparse(a, v, samples_per_rev: int):
+    """点比格子稀时：按角度排序、相同角度取平均，再周期线性插值到网格中心"""
+    ok = np.isfinite(v) & np.isfinite(a)
+    a, v = np.mod(a[ok], 360.0), v[ok]
+    if a.shape[0] == 0:
+        return np.full(samples_per_rev, np.nan)
+    ua, inv = np.unique(a, return_inverse=True)  # 排好序、去重
+    uv = np.bincount(inv, weights=v) / np.bincount(inv)
+    return np.interp(grid_angles(samples_per_rev), ua, uv, period=360.0)
+
+
+def resample(angle_deg, *channels, samples_per_rev: int, method: str = "auto") -> Resampled:
+    """
+    一次性把一段采样整理到网格上。
+    method: "bin" 分桶平均；"interp" 排序后插值；
+    "auto" 平均每格不到 2 个点时用插值（每格正好 1 个点时浮点取整会让部分格子空着），否则分桶。
+    插值时 filled 标的是“格子里有没有原始点”，count 同理。
+    """
+    n = int(samples_per_rev)
+    acc = GridAccumulator(n, len(channels))
+    acc.update(angle_deg, *channels)
+    res = acc.result()
+    if method == "auto":
+        method = "interp" if acc.n_samples < 2 * n else "bin"
+    if method == "interp":
+        a = np.asarray(angle_deg, dtype=np.float64).reshape(-1)
+        for k, ch in enumerate(channels):
+            res.values[k] = _interp_sparse(a, np.asarray(ch, dtype=np.float64).reshape(-1), n)
+    elif method != "bin":
+        raise ValueError(f"unknown method {method!r}")
+    return res
@@ -0,0 +1,298 @@
+"""
+测量结果库：本地 SQLite（WAL 模式），每根管一行，给历史查询 / 趋势图 / SPC 用。
+
+- 写：put() 只是把一行放进队列，马上返回；后台写线程攒一批（或等一小会儿）后
+  一个事务 executemany 写进去，UI 线程不碰磁盘
+- 读：query() / last() 按列返回 NumPy 数组，趋势图直接拿去画；
+  每个线程用自己的只读连接，WAL 下读写互不阻塞
+- 索引：时间、批次（batch）+ 时间、炉号 / 料号（lot）+ 时间、OK/NG + 时间
+
+不依赖 Kivy。路径用 ":memory:" 不行（读写是不同连接），测试时用临时文件。
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from core.frp_core import FrpResult
+
+RESULT_FIELDS = [name for name, _ in FrpResult._fields_]
+
+# 列名 -> (SQL 类型, NumPy dtype)；顺序就是表的列顺序
+COLUMNS = {
+    "id": ("INTEGER PRIMARY KEY", np.int64),
+    "ts": ("REAL NOT NULL", np.float64),
+    "batch": ("TEXT NOT NULL DEFAULT ''", object),
+    "lot": ("TEXT NOT NULL DEFAULT ''", object),
+    **{name: ("REAL", np.float64) for name in RESULT_FIELDS},
+    "ok_flag": ("INTEGER NOT NULL DEFAULT 0", np.int64),
+    "rejected": ("TEXT NOT NULL DEFAULT ''", object),
+    "cycle_s": ("REAL", np.float64),
+    "capture": ("TEXT NOT NULL DEFAULT ''", object),
+}
+INSERT_COLUMNS = [c for c in COLUMNS if c != "id"]
+
+INDEXES = {
+    "idx_results_ts": "ts",
+    "idx_results_batch": "batch, ts",
+    "idx_results_lot": "lot, ts",
+    "idx_results_ok": "ok_flag, ts",
+}
+
+_STOP = object()
+
+
+def _connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL 下断电最多丢最后几个事务，不会损坏
+    return conn
+
+
+def init_db(path):
+    """建表 / 建索引（已存在就跳过）"""
+    conn = _connect(path)
+    try:
+        cols = ", ".join(f"{name} {sql}" for name, (sql, _) in COLUMNS.items())
+        conn.execute(f"CREATE TABLE IF NOT EXISTS results ({cols})")
+        for name, cols in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON results ({cols})")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def result_row(result, ts=None, **meta) -> tuple:
+    """FrpResult（或同名字段的 dict）+ 附加信息 -> 按 INSERT_COLUMNS 排好的一行"""
+    if isinstance(result, dict):
+        values = dict(result)
+    else:
+        values = {name: getattr(result, name) for name in RESULT_FIELDS}
+    unknown = set(meta) - set(INSERT_COLUMNS)
+    if unknown:
+        raise KeyError(f"unknown result columns: {sorted(unknown)}")
+    values.update(meta)
+    values["ts"] = time.time() if ts is None else float(ts)
+    defaults = {"batch": "", "lot": "", "rejected": "", "capture": "", "cycle_s": None}
+    return tuple(values.get(c, defaults.get(c)) for c in INSERT_COLUMNS)
+
+
+class _FlushNotify(threading.Event):
+    """flush_async 的标记：写线程照常 set()，顺带调回调"""
+
+    def __init__(self, callback):
+        super().__init__()
+        self._callback = callback
+
+    def set(self):
+        super().set()
+        try:
+            self._callback()
+        except Exception:  # 回调出错不能把写线程带崩
+            pass
+
+
+class ResultsStore:
+    """
+    结果库。写线程在构造时启动，close() 时把队列里剩下的写完再退出。
+
+        store = ResultsStore("results/results.db")
+        store.put(session.result, batch="B01", lot="L7", rejected=session.rejected)
+        trend = store.last(10_000, ["ts", "outer_diameter_avg", "ok_flag"])
+    """
+
+    def __init__(self, path, batch_size=256, max_delay_s=0.5):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        init_db(self.path)
+        self.batch_size = int(batch_size)
+        self.max_delay_s = float(max_delay_s)
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self.rows_written = 0
+        self.write_errors = 0
+        self.last_error = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="frp-results-db", daemon=True)
+        self._writer.start()
+
+    # ---------- 写 ----------
+
+    def put(self, result, ts=None, **meta):
+        """排队写一行，不阻塞；meta 可以是 batch / lot / rejected / cycle_s / capture"""
+        if self._closed:
+            raise RuntimeError("results store is closed")
+        self._queue.put(result_row(result, ts, **meta))
+
+    def put_many(self, rows):
+        """已经用 result_row() 排好的多行一起排队（导入历史数据用）"""
+        for row in rows:
+            self._queue.put(tuple(row))
+
+    def flush(self, timeout=5.0) -> bool:
+        """等队列里已有的行都落盘；超时返回 False"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def flush_async(self, callback):
+        """不等：队列里已有的行都落盘后在写线程里调 callback()（UI 里再转回主线程）"""
+        self._queue.put(_FlushNotify(callback))
+
+    def close(self, timeout=5.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        sql = (
+            f"INSERT INTO results ({', '.join(INSERT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})"
+        )
+        stop = False
+        try:
+            while not stop:
+                item = self._queue.get()
+                rows, events = [], []
+                deadline = time.monotonic() + self.max_delay_s
+                # 攒一批：攒够 batch_size、等到 max_delay_s、或者有人在等 flush 就写
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        events.append(item)
+                    else:
+                        rows.append(item)
+                    if stop or events or len(rows) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                    except queue.Empty:
+                        break
+                if stop:
+                    rows.extend(self._drain(events))
+                if rows:
+                    try:
+                        with conn:
+                            conn.executemany(sql, rows)
+                        self.rows_written += len(rows)
+                    except sqlite3.Error as e:
+                        self.write_errors += 1
+                        self.last_error = e
+                for ev in events:
+                    ev.set()
+        finally:
+            conn.close()
+
+    def _drain(self, events) -> list:
+        """关闭时把队列里剩下的行全取出来"""
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if isinstance(item, threading.Event):
+                events.append(item)
+            elif item is not _STOP:
+                rows.append(item)
+
+    # ---------- 读 ----------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            uri = self.path.resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=5.0)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _where(since=None, until=None, batch=None, lot=None, ok=None):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(float(since))
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(float(until))
+        if batch is not None:
+            clauses.append("batch = ?")
+            params.append(batch)
+        if lot is not None:
+            clauses.append("lot = ?")
+            params.append(lot)
+        if ok is not None:
+            clauses.append("ok_flag = ?")
+            params.append(1 if ok else 0)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _check_columns(columns):
+        columns = list(COLUMNS) if columns is None else list(columns)
+        unknown = [c for c in columns if c not in COLUMNS]
+        if unknown:
+            raise KeyError(f"unknown result columns: {unknown}")
+        return columns
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self._conn().execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def query(
+        self, columns=None, order_by="ts", descending=False, limit=None, offset=0, **filters
+    ) -> dict:
+        """
+        按条件查，返回 {列名: NumPy 数组}。filters：since / until（时间戳）、batch、lot、ok。
+        数值列是 float64 / int64（NULL -> NaN），文本列是 object 数组。
+        """
+        columns = self._check_columns(columns)
+        if order_by not in COLUMNS:
+            raise KeyError(f"unknown result column: {order_by}")
+        where, params = self._where(**filters)
+        sql = f"SELECT {', '.join(columns)} FROM results{where} ORDER BY {order_by}"
+        sql += " DESC" if descending else ""
+        if order_by != "id":
+            sql += ", id DESC" if descending else ", id"  # 同值时顺序稳定（翻页不跳行）
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        rows = self._conn().execute(sql, params).fetchall()
+        return self._to_columns(rows, columns)
+
+    def last(self, n: int, columns=None, **filters) -> dict:
+        """最近 n 根管（按时间从早到晚排好，趋势图直接用）"""
+        data = self.query(columns, order_by="ts", descending=True, limit=n, **filters)
+        return {name: arr[::-1] for name, arr in data.items()}
+
+    @staticmethod
+    def _to_columns(rows, columns) -> dict:
+        dtypes = [COLUMNS[c][1] for c in columns]
+        if not rows:
+            return {c: np.empty(0, dtype=dt) for c, dt in zip(columns, dtypes)}
+        if all(dt is not object for dt in dtypes):
+            # 全是数值列：一次转成二维浮点数组再按列切，比结构化数组快
+            table = np.array(rows, dtype=np.float64)
+            return {c: table[:, k].astype(dt) for k, (c, dt) in enumerate(zip(columns, dtypes))}
+        out = {}
+        for c, dt, values in zip(columns, dtypes, zip(*rows)):
+            # None 在 float64 里会变成 NaN
+            out[c] = np.array(values, dtype=object if dt is object else np.float64).astype(dt)
+        return out
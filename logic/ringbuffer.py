@@ -0,0 +1,110 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    定长 float64 环形缓冲（滚动曲线用）。
+
+    底层数组长度是 2 × capacity，每个值写两份（p 和 p + capacity），
+    这样任何时刻按时间顺序的窗口都是一段连续内存，view() 不需要拷贝。
+    min() / max() 增量维护：只有被挤掉的旧值正好是极值时才重新扫一遍窗口。
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._buf = np.zeros(2 * self.capacity)
+        self._head = 0  # 下一个写入位置，0 ~ capacity-1
+        self._n = 0
+        self.total = 0  # 累计写入的点数（含已被挤掉的）
+        self._min = np.inf
+        self._max = -np.inf
+        self._extrema_dirty = False
+
+    def __len__(self):
+        return self._n
+
+    def clear(self):
+        self._head = 0
+        self._n = 0
+        self.total = 0
+        self._min = np.inf
+        self._max = -np.inf
+        self._extrema_dirty = False
+
+    def append(self, value: float):
+        value = float(value)
+        cap = self.capacity
+        if self._n == cap:
+            old = self._buf[self._head]
+            if old <= self._min or old >= self._max:
+                self._extrema_dirty = True
+        else:
+            self._n += 1
+        self._buf[self._head] = value
+        self._buf[self._head + cap] = value
+        self._head = (self._head + 1) % cap
+        self.total += 1
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def extend(self, values):
+        v = np.asarray(values, dtype=np.float64).reshape(-1)
+        k = v.shape[0]
+        if k == 0:
+            return
+        cap = self.capacity
+        self.total += k
+        if k >= cap:
+            # 整个窗口都被换掉
+            v = v[-cap:]
+            self._buf[:cap] = v
+            self._buf[cap:] = v
+            self._head = 0
+            self._n = cap
+            self._min = float(v.min())
+            self._max = float(v.max())
+            self._extrema_dirty = False
+            return
+
+        overflow = self._n + k - cap
+        if overflow > 0 and not self._extrema_dirty:
+            old = self.view()[:overflow]
+            if old.min() <= self._min or old.max() >= self._max:
+                self._extrema_dirty = True
+
+        h = self._head
+        first = min(k, cap - h)
+        self._buf[h : h + first] = v[:first]
+        self._buf[h + cap : h + cap + first] = v[:first]
+        rest = k - first
+        if rest:
+            self._buf[:rest] = v[first:]
+            self._buf[cap : cap + rest] = v[first:]
+        self._head = (h + k) % cap
+        self._n = min(self._n + k, cap)
+        self._min = min(self._min, float(v.min()))
+        self._max = max(self._max, float(v.max()))
+
+    def view(self) -> np.ndarray:
+        """按时间顺序（旧 -> 新）的窗口，连续内存，只读使用"""
+        start = (self._head - self._n) % self.capacity
+        return self._buf[start : start + self._n]
+
+    def _refresh_extrema(self):
+        if self._extrema_dirty:
+            w = self.view()
+            self._min = float(w.min()) if self._n else np.inf
+            self._max = float(w.max()) if self._n else -np.inf
+            self._extrema_dirty = False
+
+    def min(self) -> float:
+        self._refresh_extrema()
+        return self._min
+
+    def max(self) -> float:
+        self._refresh_extrema()
+        return self._max
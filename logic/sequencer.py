@@ -0,0 +1,439 @@
+"""
+自动测量的流程控制：按 MeasureStep 一步步驱动轴 / PLC，全部是 asyncio，不阻塞 UI。
+
+    ZERO_PROBE -> LOCATE_EDGE1 -> LOCATE_EDGE2
+      -> [MOVE_TO_SECTION -> ROTATE_MEASURE -> NEXT_SECTION] × 截面数
+      -> FINISHED        （任何一步出错 / 超时 -> ERROR）
+
+流水线：一个截面转完后只把它从 session 上摘下来，计算丢给工作线程，
+滑台马上去下一个截面；算的同时在走，一根管的节拍基本只剩运动时间。
+采样本身不经过这里，由采集线程直接写进 session 的当前截面。
+"""
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from logic.measurement_flow import MeasureStep
+from logic.modbus import encode_value
+from logic.plc import (
+    AXIS_COMMAND_BASE,
+    AXIS_POSITION_FIELD,
+    CMD_HOME,
+    CMD_MOVE_ABS,
+    CMD_STOP,
+    STATUS_MAP,
+)
+
+if TYPE_CHECKING:
+    from logic.edges import EdgeScanner  # 只用在注解里：logic.edges 要 numpy
+
+
+class SequenceError(Exception):
+    """流程里某一步失败（超时 / 轴报错 / 数据不对）"""
+
+
+class PipeRejected(Exception):
+    """旋转途中增量统计已判明显 NG，不用再测剩下的截面"""
+
+
+# ---------- 轴 ----------
+
+
+class Axis(ABC):
+    """一个运动轴的最小接口；直线轴单位 mm，旋转轴单位度（累计值，不回绕）"""
+
+    position = 0.0
+
+    @abstractmethod
+    async def move_to(self, target: float):
+        ...
+
+    async def move_by(self, delta: float):
+        await self.move_to(self.position + delta)
+
+    async def home(self):
+        await self.move_to(0.0)
+
+    async def stop(self):
+        pass
+
+
+class SimAxis(Axis):
+    """
+    仿真轴：按 speed 匀速走，每 tick_s 更新一次位置。
+    on_move(position) 在每次位置变化时调用（比如同步给仿真信号源 / 界面）。
+    """
+
+    def __init__(self, speed: float, position=0.0, on_move=None, tick_s=0.02):
+        self.speed = float(speed)
+        self.position = float(position)
+        self.on_move = on_move
+        self.tick_s = float(tick_s)
+        self._stopped = False
+
+    def _set(self, pos):
+        self.position = pos
+        if self.on_move is not None:
+            self.on_move(pos)
+
+    async def move_to(self, target: float):
+        self._stopped = False
+        target = float(target)
+        loop = asyncio.get_running_loop()
+        start, t0 = self.position, loop.time()
+        duration = abs(target - start) / self.speed
+        while not self._stopped:
+            frac = (loop.time() - t0) / duration if duration > 0 else 1.0
+            if frac >= 1.0:
+                self._set(target)
+                return
+            self._set(start + (target - start) * frac)
+            await asyncio.sleep(min(self.tick_s, duration * (1.0 - frac)))
+        raise SequenceError("axis stopped")
+
+    async def stop(self):
+        self._stopped = True
+
+
+class PlcAxis(Axis):
+    """
+    PLC 上的轴：写目标值 + 命令字（见 plc.AXIS_COMMAND_BASE），
+    然后轮询状态表，位置进了 in_position 窗口就算到位。client 是 ModbusTcpClient / ModbusPool。
+    """
+
+    def __init__(self, client, name: str, in_position=0.05, poll_s=0.02):
+        self.client = client
+        self.name = name
+        self.base = AXIS_COMMAND_BASE[name]
+        self.field = AXIS_POSITION_FIELD[name]
+        self.in_position = float(in_position)
+        self.poll_s = float(poll_s)
+        self.position = 0.0
+
+    async def _read_position(self) -> float:
+        status = await STATUS_MAP.read_all(self.client)
+        self.position = float(status[self.field])
+        return self.position
+
+    async def _command(self, cmd: int, target: float = 0.0):
+        await self.client.write_registers(self.base, [*encode_value("f32", target), cmd])
+
+    async def _wait_at(self, target: float):
+        while abs(await self._read_position() - target) > self.in_position:
+            await asyncio.sleep(self.poll_s)
+
+    async def move_to(self, target: float):
+        await self._command(CMD_MOVE_ABS, target)
+        await self._wait_at(float(target))
+
+    async def home(self):
+        await self._command(CMD_HOME)
+        await self._wait_at(0.0)
+
+    async def stop(self):
+        await self._command(CMD_STOP)
+
+
+# ---------- 工位 ----------
+
+
+class Station:
+    """
+    一个测量工位：滑台（mm）+ 管子旋转（度），外加测头清零 / 找边两个动作。
+    找边默认是走到标称的管端位置（edge_positions），有边缘检测时子类覆盖 locate_edge。
+    """
+
+    def __init__(self, slide: Axis, rotary: Axis, edge_positions=(0.0, 6000.0)):
+        self.slide = slide
+        self.rotary = rotary
+        self.edge_positions = tuple(edge_positions)
+
+    async def zero_probe(self):
+        await asyncio.gather(self.slide.home(), self.rotary.home())
+
+    async def locate_edge(self, which: int) -> float:
+        await self.slide.move_to(self.edge_positions[which - 1])
+        return self.slide.position
+
+    async def rotate(self, revs: float):
+        await self.rotary.move_by(360.0 * revs)
+
+    async def stop(self):
+        await asyncio.gather(self.slide.stop(), self.rotary.stop(), return_exceptions=True)
+
+
+class SweepStation(Station):
+    """
+    找边用连续扫描：滑台不停地扫过标称管端 ± search_mm，测头信号经 EdgeScanner
+    （要挂在采集线程的 sinks 上）找跳变，边的位置从采样里插值出来，看到边就停。
+    1 号端先退到管外、确认测头读到“没管”，再往管里扫（信号上升）；
+    2 号端从管上一路往外扫（信号下降）。
+    """
+
+    def __init__(self, slide: Axis, rotary: Axis, scanner: "EdgeScanner",
+                 edge_positions=(0.0, 6000.0), search_mm=50.0, poll_s=0.01, settle_s=0.2):
+        super().__init__(slide, rotary, edge_positions)
+        self.scanner = scanner
+        self.search_mm = float(search_mm)
+        self.poll_s = float(poll_s)
+        self.settle_s = float(settle_s)  # 扫到头后再等多久（最后几块采样还在路上）
+
+    async def locate_edge(self, which: int) -> float:
+        nominal = self.edge_positions[which - 1]
+        other = self.edge_positions[2 - which]
+        outward = 1.0 if nominal >= other else -1.0  # 从管上往这一端外面走的方向
+        outside = nominal + outward * self.search_mm
+        lo, hi = sorted((nominal - self.search_mm, nominal + self.search_mm))
+        scanner = self.scanner
+        loop = asyncio.get_running_loop()
+        if which == 1:
+            scanner.arm(True)
+            try:
+                await self.slide.move_to(outside)
+                # 没见过“没管”的状态就扫不出上升沿（轴走得比采样快、管子没放到位、测头坏了）
+                deadline = loop.time() + self.settle_s
+                while scanner.state != -1:
+                    if loop.time() >= deadline:
+                        raise SequenceError(f"edge {which}: probe still sees a pipe at {outside:.1f} mm")
+                    await asyncio.sleep(self.poll_s)
+            except BaseException:
+                scanner.disarm()
+                raise
+            return await self._sweep(nominal - outward * self.search_mm, lo, hi, which)
+        scanner.arm(False)
+        return await self._sweep(outside, lo, hi, which)
+
+    async def _sweep(self, target, lo, hi, which) -> float:
+        """扫到 target，边在 [lo, hi] 里就返回（scanner 已经 arm 好）"""
+        scanner = self.scanner
+        loop = asyncio.get_running_loop()
+        move = asyncio.ensure_future(self.slide.move_to(target))
+        deadline = None
+        try:
+            while True:
+                done, _ = await asyncio.wait({move}, timeout=self.poll_s)
+                for edge in scanner.take():
+                    if lo <= edge.position_mm <= hi:
+                        return edge.position_mm
+                if done:
+                    move.result()  # 轴报错直接抛出去
+                    if deadline is None:
+                        deadline = loop.time() + self.settle_s
+                    elif loop.time() >= deadline:
+                        raise SequenceError(f"edge {which} not found in [{lo:.1f}, {hi:.1f}] mm")
+                    await asyncio.sleep(self.poll_s)
+        finally:
+            scanner.disarm()
+            if not move.done():
+                move.cancel()
+                await asyncio.gather(move, return_exceptions=True)
+                await self.slide.stop()
+
+
+# ---------- 流程 ----------
+
+DEFAULT_TIMEOUTS = {
+    MeasureStep.ZERO_PROBE: 30.0,
+    MeasureStep.LOCATE_EDGE1: 60.0,
+    MeasureStep.LOCATE_EDGE2: 60.0,
+    MeasureStep.MOVE_TO_SECTION: 30.0,
+    MeasureStep.ROTATE_MEASURE: 30.0,
+    MeasureStep.NEXT_SECTION: 10.0,
+}
+
+
+@dataclass
+class SequencePlan:
+    sections: int = 3
+    margin_mm: float = 200.0  # 首末截面离管端的距离
+    revs_per_section: float = 1.0
+    pipeline: bool = True  # False：每个截面算完再走（对比节拍用）
+    early_abort: bool = True  # 旋转途中明显 NG 就停，不测剩下的截面
+    abort_margin: float = 1.5  # 超出公差多少倍才算“明显”
+    abort_check_s: float = 0.1
+    timeouts: dict = field(default_factory=lambda: dict(DEFAULT_TIMEOUTS))
+
+    def section_positions(self, edge1: float, edge2: float, start: float) -> list:
+        """在两个管端之间均匀排截面，从离 start 近的一头开始"""
+        lo, hi = sorted((edge1, edge2))
+        lo, hi = lo + self.margin_mm, hi - self.margin_mm
+        if self.sections <= 1 or hi <= lo:
+            positions = [0.5 * (lo + hi)]
+        else:
+            step = (hi - lo) / (self.sections - 1)
+            positions = [lo + k * step for k in range(self.sections)]
+        if abs(positions[-1] - start) < abs(positions[0] - start):
+            positions.reverse()
+        return positions
+
+
+class Sequencer:
+    """
+    跑一根管的完整流程。on_step(step, section) 在每次换步骤时调用
+    （在流程所在的线程里；写 global_state 是安全的，界面由它的通知去刷新）。
+    """
+
+    def __init__(self, station: Station, plan: SequencePlan = None, on_step=None):
+        self.station = station
+        self.plan = plan or SequencePlan()
+        self.on_step = on_step
+        self.step = MeasureStep.IDLE
+        self.section = -1
+        self.error = ""
+        self.rejected = ""  # 提前判 NG 的原因
+        self.timings = []  # (step, section, 耗时 s)
+        self.cycle_time_s = 0.0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="frp-compute")
+        self._loop = None
+        self._task = None
+        self._thread = None
+
+    def _enter(self, step: MeasureStep, section: int = -1):
+        self.step = step
+        self.section = section
+        if self.on_step is not None:
+            self.on_step(step, section)
+
+    async def _run_step(self, step: MeasureStep, aw, section: int = -1):
+        """执行一步并计时；超时 / 失败转成 SequenceError"""
+        self._enter(step, section)
+        t0 = time.perf_counter()
+        try:
+            return await asyncio.wait_for(aw, self.plan.timeouts.get(step))
+        except asyncio.TimeoutError:
+            raise SequenceError(f"{step.name} timed out") from None
+        finally:
+            self.timings.append((step, section, time.perf_counter() - t0))
+
+    async def _rotate_watching(self, session):
+        """旋转采集；途中定期看当前截面的增量统计，明显 NG 就抛 PipeRejected"""
+        plan = self.plan
+        rot = asyncio.ensure_future(self.station.rotate(plan.revs_per_section))
+        try:
+            while True:
+                done, _ = await asyncio.wait({rot}, timeout=plan.abort_check_s)
+                if done:
+                    return rot.result()
+                if plan.early_abort:
+                    reason = session.early_reject(plan.abort_margin)
+                    if reason:
+                        raise PipeRejected(reason)
+        finally:
+            if not rot.done():
+                rot.cancel()
+                await asyncio.gather(rot, return_exceptions=True)
+
+    async def run(self, session):
+        """跑完整根管，返回 FrpResult；出错返回 None（self.step = ERROR，原因在 self.error）"""
+        loop = asyncio.get_running_loop()
+        st, plan = self.station, self.plan
+        self.error = ""
+        self.rejected = ""
+        self.timings = []
+        t0 = time.perf_counter()
+        pending = None
+        try:
+            await self._run_step(MeasureStep.ZERO_PROBE, st.zero_probe())
+            e1 = await self._run_step(MeasureStep.LOCATE_EDGE1, st.locate_edge(1))
+            e2 = await self._run_step(MeasureStep.LOCATE_EDGE2, st.locate_edge(2))
+            session.set_length(abs(e2 - e1))
+
+            positions = plan.section_positions(e1, e2, st.slide.position)
+            for k, pos in enumerate(positions):
+                # 这里的移动和上一个截面的计算是同时进行的
+                await self._run_step(MeasureStep.MOVE_TO_SECTION, st.slide.move_to(pos), k)
+                session.open_section(pos)
+                await self._run_step(MeasureStep.ROTATE_MEASURE, self._rotate_watching(session), k)
+                sec = session.detach_section()
+                if pending is not None:
+                    await self._run_step(MeasureStep.NEXT_SECTION, pending, k - 1)
+                self._enter(MeasureStep.NEXT_SECTION, k)
+                pending = loop.run_in_executor(self._executor, session.compute_section, sec)
+                if not plan.pipeline:
+                    await self._run_step(MeasureStep.NEXT_SECTION, pending, k)
+                    pending = None
+            if pending is not None:
+                await self._run_step(MeasureStep.NEXT_SECTION, pending, len(positions) - 1)
+                pending = None
+
+            result = session.finish()
+            self.cycle_time_s = time.perf_counter() - t0
+            self._enter(MeasureStep.FINISHED)
+            return result
+        except asyncio.CancelledError:
+            await st.stop()
+            self._enter(MeasureStep.IDLE)
+            raise
+        except PipeRejected as exc:
+            # 停转，把已经采到的截面算完，整根管记 NG
+            self.rejected = str(exc)
+            await st.stop()
+            sec = session.detach_section()
+            if pending is not None:
+                await pending
+                pending = None
+            if sec is not None:
+                await loop.run_in_executor(self._executor, session.compute_section, sec)
+            session.reject(self.rejected)
+            result = session.finish()
+            self.cycle_time_s = time.perf_counter() - t0
+            self._enter(MeasureStep.FINISHED)
+            return result
+        except Exception as exc:
+            self.error = str(exc) or type(exc).__name__
+            await st.stop()
+            self._enter(MeasureStep.ERROR, self.section)
+            return None
+        finally:
+            if pending is not None:
+                # 出错时别丢下还在算的截面不管，等它自己结束
+                await asyncio.gather(pending, return_exceptions=True)
+
+    # ---------- 在后台线程里跑（给 Kivy 用）----------
+
+    def start(self, session, done=None):
+        """
+        开一个后台线程跑 run(session)，不阻塞调用方。
+        done(result) 在后台线程里调用；result 为 None 表示出错或被取消。
+        """
+        if self._thread is not None and self._thread.is_alive():
+            raise RuntimeError("sequencer already running")
+
+        ready = threading.Event()
+
+        def thread_main():
+            self._loop = asyncio.new_event_loop()
+            self._task = self._loop.create_task(self.run(session))
+            ready.set()
+            result = None
+            try:
+                result = self._loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                pass
+            finally:
+                self._loop.close()
+                self._loop = None
+                self._task = None
+            if done is not None:
+                done(result)
+
+        self._thread = threading.Thread(target=thread_main, name="frp-sequencer", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def cancel(self, timeout=2.0):
+        """停掉后台流程（轴会先停下），等线程退出"""
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                pass  # 事件循环刚好已经关了
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
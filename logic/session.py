@@ -0,0 +1,297 @@
+"""
+一根管的多截面测量数据。
+
+流程和 MeasureStep 对应：
+    MOVE_TO_SECTION -> open_section(pos)
+    ROTATE_MEASURE  -> add_sample / add_samples
+    NEXT_SECTION    -> close_section()，这一截面的结果当场算掉
+    FINISHED        -> finish()，只合并各截面的中间结果，几乎不花时间
+
+所有截面的列存储在构造时一次性分配好，内存大小固定；
+截面写满后多出来的点丢弃并计数，不会扩容。
+
+采集线程写点、UI 线程开关截面可以同时进行，内部用一把锁保护 current。
+
+传入 recorder（logic.capture.CaptureWriter）时，原始采样会同步录进文件，
+finish() 时把管长和结果一起写在文件末尾。
+
+streaming=True（默认）时每个截面边采边更新增量统计（logic.streaming），
+旋转途中就能用 live_stats() 看当前截面的直径 / 圆度 / 同心度估计。
+"""
+
+import threading
+from dataclasses import replace
+
+import numpy as np
+
+from core.frp_core import FrpResult, result_to_dict
+from core.frp_numpy import SectionResult, combine_sections, compute_sections
+from logic import profiling
+from logic.streaming import LiveStats, StreamingSection, early_reject
+
+# 列顺序
+COL_ANGLE, COL_OUTER, COL_INNER, COL_SLIDE = range(4)
+
+
+class SectionBuffer:
+    """单个截面的 angle / OD / ID / slide 位置四列，底层是 session 大数组的一个切片"""
+
+    def __init__(self, index: int, pos_mm: float, storage: np.ndarray, streaming=True):
+        self.index = index
+        self.pos_mm = float(pos_mm)
+        self._data = storage  # (4, capacity) 视图
+        self.n = 0
+        self.dropped = 0
+        self.result = None  # close 后为 SectionResult
+        self.stats = StreamingSection() if streaming else None
+
+    @property
+    def capacity(self) -> int:
+        return self._data.shape[1]
+
+    @property
+    def closed(self) -> bool:
+        return self.result is not None
+
+    @property
+    def angle(self) -> np.ndarray:
+        return self._data[COL_ANGLE, : self.n]
+
+    @property
+    def outer(self) -> np.ndarray:
+        return self._data[COL_OUTER, : self.n]
+
+    @property
+    def inner(self) -> np.ndarray:
+        return self._data[COL_INNER, : self.n]
+
+    @property
+    def slide(self) -> np.ndarray:
+        return self._data[COL_SLIDE, : self.n]
+
+    def columns(self):
+        """
+        angle / OD / ID / slide 四列，按同一个 n 截取（视图，不拷贝）。
+        采集线程还在写的时候分开取 .outer / .inner 两列可能长度不一样，要成对用的列从这里取。
+        """
+        n = self.n
+        data = self._data
+        return data[COL_ANGLE, :n], data[COL_OUTER, :n], data[COL_INNER, :n], data[COL_SLIDE, :n]
+
+    def add_sample(self, angle_deg, outer_d, inner_d, slide_mm=None) -> int:
+        if self.n >= self.capacity:
+            self.dropped += 1
+            return 0
+        if slide_mm is None:
+            slide_mm = self.pos_mm
+        self._data[:, self.n] = (angle_deg, outer_d, inner_d, slide_mm)
+        if self.stats is not None:
+            col = self._data[:, self.n : self.n + 1]
+            self.stats.update(col[COL_ANGLE], col[COL_OUTER], col[COL_INNER])
+        self.n += 1
+        return 1
+
+    def add_samples(self, angles, outer_d, inner_d, slide_mm=None) -> int:
+        a = np.asarray(angles, dtype=np.float64).reshape(-1)
+        count = a.shape[0]
+        take = min(count, self.capacity - self.n)
+        self.dropped += count - take
+        if take <= 0:
+            return 0
+        s, e = self.n, self.n + take
+        self._data[COL_ANGLE, s:e] = a[:take]
+        self._data[COL_OUTER, s:e] = np.asarray(outer_d, dtype=np.float64).reshape(-1)[:take]
+        self._data[COL_INNER, s:e] = np.asarray(inner_d, dtype=np.float64).reshape(-1)[:take]
+        if slide_mm is None:
+            self._data[COL_SLIDE, s:e] = self.pos_mm
+        else:
+            self._data[COL_SLIDE, s:e] = np.broadcast_to(
+                np.asarray(slide_mm, dtype=np.float64).reshape(-1), (count,)
+            )[:take]
+        if self.stats is not None:
+            self.stats.update(
+                self._data[COL_ANGLE, s:e], self._data[COL_OUTER, s:e], self._data[COL_INNER, s:e]
+            )
+        self.n = e
+        return take
+
+    def compute(self) -> SectionResult:
+        sections = compute_sections(self.angle, self.outer, self.inner)
+        if not sections:
+            return SectionResult(self.pos_mm, 0, 0.0, 0.0, (0.0, 0.0), (0.0, 0.0), 0.0, 0.0)
+        return replace(sections[0], pos_mm=self.pos_mm)
+
+
+class MeasurementSession:
+    """一根管的测量：最多 max_sections 个截面，每个截面最多 section_capacity 个点"""
+
+    def __init__(
+        self,
+        max_sections: int = 5,
+        samples_per_rev: int = 180,
+        revs_per_section: float = 1.0,
+        section_capacity: int = None,
+        tolerances: dict = None,
+        recorder=None,
+        streaming: bool = True,
+    ):
+        if section_capacity is None:
+            # 留 50% 余量给转速波动 / 多转的一点点重叠
+            section_capacity = int(np.ceil(samples_per_rev * revs_per_section * 1.5))
+        self.max_sections = int(max_sections)
+        self.section_capacity = int(section_capacity)
+        self.tolerances = tolerances
+        self._storage = np.empty((self.max_sections, 4, self.section_capacity))
+        self.sections = []
+        self.current = None
+        self.result = FrpResult()
+        self.length_mm = None
+        self.rejected = ""  # 提前判 NG 的原因（见 reject()）
+        self.recorder = recorder
+        self.streaming = bool(streaming)
+        self._lock = threading.RLock()
+
+    # ---------- 截面开关 ----------
+
+    def open_section(self, pos_mm: float) -> SectionBuffer:
+        """MOVE_TO_SECTION：到位后开一个新截面；上一个没关的先关掉"""
+        if self.current is not None:
+            self.close_section()
+        with self._lock:
+            idx = len(self.sections)
+            if idx >= self.max_sections:
+                raise ValueError(f"session already has {self.max_sections} sections")
+            sec = SectionBuffer(idx, pos_mm, self._storage[idx], self.streaming)
+            self.sections.append(sec)
+            self.current = sec
+            if self.recorder is not None:
+                self.recorder.open_section(pos_mm)
+        return sec
+
+    def close_section(self):
+        """NEXT_SECTION：关掉当前截面，顺手把截面结果和整管结果都更新掉"""
+        sec = self.detach_section()
+        if sec is None:
+            return None
+        return self.compute_section(sec)
+
+    def detach_section(self):
+        """
+        只把当前截面摘下来（之后采集线程不会再往里写），不计算。
+        流水线用：摘下后可以在别的线程 compute_section()，同时滑台去下一个截面。
+        """
+        with self._lock:
+            sec = self.current
+            self.current = None
+        return sec
+
+    def compute_section(self, sec: SectionBuffer):
+        """算一个已摘下的截面并更新整管结果；不占锁，可以在工作线程里跑"""
+        with profiling.span("session.compute_section"):
+            sec.result = sec.compute()
+            self._update_result()
+        return sec.result
+
+    def _update_result(self):
+        with self._lock:
+            sections = list(self.sections)
+        done = [s.result for s in sections if s.result is not None and s.result.n]
+        result = combine_sections(done, length_mm=self.length_mm, tolerances=self.tolerances)
+        if self.rejected:
+            result.ok_flag = 0
+        self.result = result
+
+    # ---------- 采样 ----------
+
+    def add_sample(self, angle_deg, outer_d, inner_d, slide_mm=None) -> int:
+        with self._lock:
+            if self.current is None:
+                return 0
+            took = self.current.add_sample(angle_deg, outer_d, inner_d, slide_mm)
+            if took and self.recorder is not None:
+                self.recorder.add_sample(angle_deg, outer_d, inner_d, slide_mm)
+            return took
+
+    def add_samples(self, angles, outer_d, inner_d, slide_mm=None) -> int:
+        with self._lock:
+            if self.current is None:
+                return 0
+            took = self.current.add_samples(angles, outer_d, inner_d, slide_mm)
+            if took and self.recorder is not None:
+                # 录制文件里只记截面缓冲真正收下的前 took 个点（满了被丢的不记），
+                # 离线重算才能和实时结果一致
+                if slide_mm is not None and np.ndim(slide_mm) > 0:
+                    slide_mm = np.asarray(slide_mm).reshape(-1)[:took]
+                self.recorder.add_samples(
+                    np.asarray(angles).reshape(-1)[:took],
+                    np.asarray(outer_d).reshape(-1)[:took],
+                    np.asarray(inner_d).reshape(-1)[:took],
+                    slide_mm,
+                )
+            return took
+
+    # ---------- 收尾 ----------
+
+    def set_length(self, length_mm: float):
+        """LOCATE_EDGE1/2 测出来的管长；不设时按首末截面间距估计"""
+        self.length_mm = float(length_mm)
+        self._update_result()
+
+    def reject(self, reason: str):
+        """旋转途中已判明显 NG，提前收工：结果一律记 NG"""
+        self.rejected = reason or "rejected"
+        self._update_result()
+
+    def finish(self) -> FrpResult:
+        """FINISHED：各截面早已算完，这里只剩合并"""
+        if self.current is not None:
+            self.close_section()
+        if self.recorder is not None and not self.recorder.closed:
+            meta = {"length_mm": self.length_mm, "result": result_to_dict(self.result)}
+            if self.rejected:
+                meta["rejected"] = self.rejected
+            self.recorder.close(meta)
+        return self.result
+
+    # ---------- 旋转途中的估计 ----------
+
+    def live_stats(self) -> LiveStats:
+        """当前（或刚关掉的最后一个）截面的增量统计；没开 streaming 时返回全 0"""
+        with self._lock:
+            sec = self.last_section
+            if sec is None or sec.stats is None:
+                return LiveStats()
+            return sec.stats.snapshot()
+
+    def early_reject(self, margin=1.5) -> str:
+        """当前截面是否已经“明显 NG”（见 logic.streaming.early_reject），返回原因或空字符串"""
+        return early_reject(self.live_stats(), self.tolerances, margin=margin)
+
+    @property
+    def n_samples(self) -> int:
+        return sum(s.n for s in self.sections)
+
+    @property
+    def dropped(self) -> int:
+        return sum(s.dropped for s in self.sections)
+
+    def column(self, col: int) -> np.ndarray:
+        """整根管某一列（COL_*）按截面顺序拼起来（会拷贝，只拷这一列）"""
+        if not self.sections:
+            return np.empty(0)
+        return np.concatenate([s._data[col, : s.n] for s in self.sections])
+
+    @property
+    def last_section(self):
+        """正在采的截面；没有的话取最后一个已关闭的"""
+        if self.current is not None:
+            return self.current
+        return self.sections[-1] if self.sections else None
+
+    def columns(self):
+        """整根管所有截面拼起来的 angle / OD / ID / slide（会拷贝）"""
+        if not self.sections:
+            empty = np.empty(0)
+            return empty, empty, empty, empty
+        data = np.concatenate([s._data[:, : s.n] for s in self.sections], axis=1)
+        return data[COL_ANGLE], data[COL_OUTER], data[COL_INNER], data[COL_SLIDE]
@@ -0,0 +1,221 @@
+"""
+跨进程的采样环形缓冲：采集进程写，HMI 进程零拷贝地读最近一段。
+
+布局和 logic.ringbuffer.RingBuffer 一样：每列底层长度 2 × capacity，每个值写两份
+（p 和 p + capacity），任何不超过 capacity 的窗口都是一段连续内存，读的一方直接拿 NumPy 视图。
+
+    header（uint64 × 8）：magic / capacity / 列数 / head / guard / writer pid / closed / 保留
+    schema：列名（JSON，UTF-8），默认列和 LiveData 字段同名
+    data：float64，(列数, 2 × capacity)
+
+head 是累计写入的点数（单调递增，兼作序号）：写的一方先写数据、再更新 head，
+读的一方按 head 取窗口，用完之后 valid(start) 检查这段有没有在读的过程中被覆盖。
+写的一方从不等读的一方：读慢了就直接跳到最新，被跳过的点由读的一方自己计数。
+（依赖 8 字节对齐写入的原子性和 x86 的写入顺序，工控机上没问题。）
+"""
+
+import json
+import multiprocessing
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# 一个采样点的各列，和 logic.models.LiveData 的字段同名
+SAMPLE_FIELDS = ("angle_deg", "outer_diameter", "inner_diameter", "slide_pos_mm")
+
+_MAGIC = 0x31474E4952505246  # b"FRPRING1"
+_HEADER_WORDS = 8
+_SCHEMA_BYTES = 448
+_DATA_OFFSET = _HEADER_WORDS * 8 + _SCHEMA_BYTES  # 512，数据区 64 字节对齐
+
+# header 里各字段的下标
+_H_MAGIC, _H_CAPACITY, _H_FIELDS, _H_HEAD, _H_GUARD, _H_PID, _H_CLOSED = range(7)
+
+# 本进程建的共享内存名（attach 时判断要不要撤销 resource_tracker 登记）
+_created = set()
+
+
+class ShmRing:
+    """
+    用 ShmRing.create(capacity) 建（建的一方负责 unlink），
+    其他进程用 ShmRing.attach(name) 接上。写只能有一个进程。
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        self._header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        if int(self._header[_H_MAGIC]) != _MAGIC:
+            shm.close()
+            raise ValueError(f"shared memory {shm.name!r} is not an FRP sample ring")
+        self.capacity = int(self._header[_H_CAPACITY])
+        raw = bytes(shm.buf[_HEADER_WORDS * 8 : _DATA_OFFSET]).rstrip(b"\0")
+        self.fields = tuple(json.loads(raw.decode("utf-8")))
+        self._data = np.ndarray(
+            (len(self.fields), 2 * self.capacity),
+            dtype=np.float64,
+            buffer=shm.buf,
+            offset=_DATA_OFFSET,
+        )
+
+    @classmethod
+    def create(cls, capacity: int, fields=SAMPLE_FIELDS, name: str = None) -> "ShmRing":
+        capacity = int(capacity)
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        schema = json.dumps(list(fields)).encode("utf-8")
+        if len(schema) > _SCHEMA_BYTES:
+            raise ValueError("too many / too long field names")
+        size = _DATA_OFFSET + len(fields) * 2 * capacity * 8
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(shm.name)
+        header = np.ndarray((_HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        header[:] = 0
+        shm.buf[_HEADER_WORDS * 8 : _HEADER_WORDS * 8 + len(schema)] = schema
+        header[_H_CAPACITY] = capacity
+        header[_H_FIELDS] = len(fields)
+        header[_H_MAGIC] = _MAGIC  # 最后写 magic：attach 看到它时其余字段都已就绪
+        del header
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmRing":
+        shm = shared_memory.SharedMemory(name=name)
+        # 3.13 之前 attach 也会登记到 resource_tracker。multiprocessing 起的子进程和父进程共用一个
+        # tracker，登记两次没关系；不相干的进程有自己的 tracker，退出时会把别人建的共享内存删掉，要撤销登记
+        if shm.name not in _created and multiprocessing.parent_process() is None:
+            try:
+                resource_tracker.unregister(shm._name, "shared_memory")
+            except Exception:
+                pass
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def head(self) -> int:
+        """累计写入的点数"""
+        return int(self._header[_H_HEAD])
+
+    @property
+    def closed(self) -> bool:
+        """写的一方已经标记结束"""
+        return bool(self._header[_H_CLOSED])
+
+    def __len__(self):
+        return min(self.head, self.capacity)
+
+    # ---------- 写（只在一个进程里）----------
+
+    def write(self, *columns) -> int:
+        """
+        追加一块：按 fields 顺序给等长的列，签名和 AcquisitionWorker 的 sink 一致，
+        可以直接挂成 sink。大块按 capacity / 4 切开分几次发布，
+        这样正在写的部分最多盖掉最旧的 1/4，读的一方总有 3/4 的窗口可用。
+        """
+        if len(columns) != len(self.fields):
+            raise ValueError(f"expected {len(self.fields)} columns, got {len(columns)}")
+        cols = [np.asarray(c, dtype=np.float64).reshape(-1) for c in columns]
+        k = cols[0].shape[0]
+        if any(c.shape[0] != k for c in cols):
+            raise ValueError("column length mismatch")
+        if k == 0:
+            return 0
+        cap = self.capacity
+        header = self._header
+        chunk = max(1, cap // 4)
+        if min(k, chunk) > int(header[_H_GUARD]):
+            header[_H_GUARD] = min(k, chunk)
+        if header[_H_PID] == 0:
+            header[_H_PID] = os.getpid()
+
+        data = self._data
+        head = self.head
+        for s in range(0, k, chunk):
+            n = min(chunk, k - s)
+            p = head % cap
+            first = min(n, cap - p)
+            for row, c in enumerate(cols):
+                v = c[s : s + n]
+                data[row, p : p + first] = v[:first]
+                data[row, p + cap : p + cap + first] = v[:first]
+                if first < n:
+                    data[row, : n - first] = v[first:]
+                    data[row, cap : cap + n - first] = v[first:]
+            head += n
+            header[_H_HEAD] = head  # 数据写完再发布
+        return k
+
+    def mark_closed(self):
+        self._header[_H_CLOSED] = 1
+
+    # ---------- 读（任意进程，不加锁）----------
+
+    def window(self, n: int):
+        """
+        最近 n 个点（不足 n 个时有多少给多少）：返回 (各列视图的元组, start)。
+        视图直接指向共享内存，用完之后用 valid(start) 确认没被覆盖。
+        """
+        cap = self.capacity
+        head = self.head
+        guard = int(self._header[_H_GUARD])
+        n = max(0, min(int(n), head, cap - guard))
+        start = head - n
+        p = start % cap
+        return tuple(self._data[row, p : p + n] for row in range(len(self.fields))), start
+
+    def valid(self, start: int) -> bool:
+        """
+        从 start 开始的数据还没有被写的一方覆盖。
+        正在写的那一段最多 guard 个点（≤ capacity / 4），会先盖掉最旧的 guard 个位置，所以留出这个余量。
+        """
+        return self.head + int(self._header[_H_GUARD]) - start <= self.capacity
+
+    def latest(self):
+        """最后一个点（各列的 float 元组）；还没有数据时返回 None"""
+        head = self.head
+        if head == 0:
+            return None
+        p = (head - 1) % self.capacity
+        return tuple(float(v) for v in self._data[:, p])
+
+    def read_new(self, cursor: int, max_n: int = None):
+        """
+        增量读：返回 (各列拷贝, 新 cursor, 跳过的点数)。
+        读的一方落后超过缓冲能保证的范围时直接跳到还有效的最旧位置，不阻塞写的一方。
+        """
+        cap = self.capacity
+        skipped = 0
+        while True:
+            head = self.head
+            guard = int(self._header[_H_GUARD])
+            oldest = head - (cap - guard)
+            if cursor < oldest:
+                skipped += oldest - cursor
+                cursor = oldest
+            n = head - cursor
+            if max_n is not None:
+                n = min(n, int(max_n))
+            p = cursor % cap
+            out = tuple(np.array(self._data[row, p : p + n]) for row in range(len(self.fields)))
+            if self.valid(cursor):
+                return out, cursor + n, skipped
+            # 拷贝的过程中被追上了：丢掉这次，从新的有效位置重读
+
+    # ---------- 收尾 ----------
+
+    def close(self):
+        # 视图要先放掉，否则 SharedMemory.close() 会报 BufferError
+        self._header = None
+        self._data = None
+        self._shm.close()
+
+    def unlink(self):
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
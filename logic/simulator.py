@@ -0,0 +1,230 @@
+"""
+可复现的测量信号仿真：按给定的管子几何（椭圆度、偏心、弯曲、噪声、探头掉点）
+整块生成 angle / OD / ID 采样，GUI 演示和无界面压测共用。
+
+信号模型和 core.frp_numpy 的几何约定一致：点 (θ, d) 看成半径 d / 2 的轮廓点，
+圆心偏移 (cx, cy) 在直径上表现为一阶起伏 2 (cx cosθ + cy sinθ)，
+椭圆度是二阶起伏。同一个 seed、同样的采样序号，不论分几块取，结果都一样。
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from logic.acquisition import SampleBlock, SampleSource
+
+
+@dataclass
+class PipeGeometry:
+    """仿真用的管子几何，单位 mm / 度"""
+
+    od_mm: float = 152.0
+    id_mm: float = 76.0
+    length_mm: float = 6000.0
+    start_mm: float = 0.0  # 管子 1 号端在滑台上的位置（实际上料不一定正好在标称位置）
+    # 是否模拟管端：打开后测头在管外读数为 0，扫过管端时在光斑直径内从 0 过渡到实际值（找边用）
+    ends: bool = False
+    probe_spot_mm: float = 1.0
+    ovality_mm: float = 0.04  # 外圆径向二阶起伏的峰峰值（≈ 外圆圆度）
+    ovality_phase_deg: float = 0.0
+    id_ovality_mm: float = 0.02
+    eccentricity_mm: float = 0.05  # 内圆心相对外圆心的偏移（同心度 = 2 × 偏移）
+    eccentricity_phase_deg: float = 90.0
+    bow_mm: float = 0.2  # 管子中间相对两端连线的弯曲量（抛物线）
+    bow_phase_deg: float = 0.0
+    od_noise_mm: float = 0.005  # 高斯噪声的标准差
+    id_noise_mm: float = 0.003
+    dropout_rate: float = 0.0  # 探头掉点的比例，掉点处填 dropout_value
+    dropout_value: float = math.nan
+
+    def bow_offset(self, pos_mm):
+        """某轴向位置上管子轴线的偏移量 (x, y)"""
+        z = np.asarray(pos_mm, dtype=np.float64) - self.start_mm
+        z = np.clip(z / self.length_mm, 0.0, 1.0)
+        b = 4.0 * self.bow_mm * z * (1.0 - z)
+        phi = math.radians(self.bow_phase_deg)
+        return b * math.cos(phi), b * math.sin(phi)
+
+    def coverage(self, pos_mm):
+        """测头光斑落在管子上的比例：管外 0，管上 1，管端光斑宽度内线性过渡"""
+        z = np.asarray(pos_mm, dtype=np.float64) - self.start_mm
+        spot = max(self.probe_spot_mm, 1e-9)
+        c1 = np.clip(z / spot + 0.5, 0.0, 1.0)
+        c2 = np.clip((self.length_mm - z) / spot + 0.5, 0.0, 1.0)
+        return c1 * c2
+
+
+def profile(geom: PipeGeometry, angle_deg, pos_mm=0.0):
+    """无噪声的理想信号：给定角度 / 轴向位置，返回 (OD, ID)"""
+    rad = np.radians(angle_deg)
+    c, s = np.cos(rad), np.sin(rad)
+    bx, by = geom.bow_offset(pos_mm)
+    phi_e = math.radians(geom.eccentricity_phase_deg)
+    ex = bx + geom.eccentricity_mm * math.cos(phi_e)
+    ey = by + geom.eccentricity_mm * math.sin(phi_e)
+
+    # cos 2(θ - φ)，用已算好的 cos / sin 展开，少算一次三角函数
+    phi_o = math.radians(geom.ovality_phase_deg)
+    c2 = (c * c - s * s) * math.cos(2 * phi_o) + 2 * c * s * math.sin(2 * phi_o)
+
+    od = geom.od_mm + 2.0 * (bx * c + by * s) + geom.ovality_mm * c2
+    id_ = geom.id_mm + 2.0 * (ex * c + ey * s) + geom.id_ovality_mm * c2
+    return od, id_
+
+
+class PipeSimulator:
+    """
+    按采样序号生成信号：第 i 个点的角度 = i × deg_per_s / rate_hz。
+    噪声 / 掉点各用一个独立的随机流，所以结果只和 seed 与序号有关，和分块方式无关。
+    轴向位置由外面设 slide_mm（和真实滑台一样，换截面时改）。
+    interpolate_slide=True 时认为滑台在两块之间是连续走的：块内每个点的位置
+    从上一块末尾线性过渡到当前的 slide_mm（实时出点时用，扫管端要靠每个点的位置插值）。
+    """
+
+    def __init__(self, geometry: PipeGeometry = None, rate_hz=10_000.0, deg_per_s=180.0, seed=0):
+        self.geometry = geometry or PipeGeometry()
+        self.rate_hz = float(rate_hz)
+        self.deg_per_s = float(deg_per_s)
+        self.seed = seed
+        self.slide_mm = 0.0
+        self.interpolate_slide = False
+        self._last_slide = None
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seed = seed
+        od_ss, id_ss, drop_ss = np.random.SeedSequence(self.seed).spawn(3)
+        self._od_rng = np.random.default_rng(od_ss)
+        self._id_rng = np.random.default_rng(id_ss)
+        self._drop_rng = np.random.default_rng(drop_ss)
+        self.index = 0
+
+    @property
+    def samples_per_rev(self) -> float:
+        return self.rate_hz * 360.0 / self.deg_per_s
+
+    def block(self, n: int) -> SampleBlock:
+        """接着上次的位置生成 n 个点；t 是仿真时间（秒）"""
+        g = self.geometry
+        i = np.arange(self.index, self.index + n, dtype=np.float64)
+        self.index += n
+        angle = (i * (self.deg_per_s / self.rate_hz)) % 360.0
+        pos = float(self.slide_mm)
+        if self.interpolate_slide and self._last_slide is not None and self._last_slide != pos:
+            slide = np.linspace(self._last_slide, pos, n + 1)[1:]
+            where = slide
+        else:
+            slide = np.full(n, pos)
+            where = pos  # 位置不变时按标量算，省掉逐点的弯曲项
+        self._last_slide = pos
+        od, id_ = profile(g, angle, where)
+        if g.ends:
+            cover = g.coverage(where)
+            if np.min(cover) < 1.0:
+                # 光斑有一部分（或全部）落在管外：读数按挡住的比例下降
+                od = od * cover
+                id_ = id_ * cover
+
+        if g.od_noise_mm:
+            od += self._od_rng.standard_normal(n) * g.od_noise_mm
+        if g.id_noise_mm:
+            id_ += self._id_rng.standard_normal(n) * g.id_noise_mm
+        if g.dropout_rate:
+            # OD / ID 探头各自掉点
+            drop = self._drop_rng.random((2, n)) < g.dropout_rate
+            od[drop[0]] = g.dropout_value
+            id_[drop[1]] = g.dropout_value
+
+        return SampleBlock(angle, od, id_, slide, t=self.index / self.rate_hz)
+
+
+class SimulatedSource(SampleSource):
+    """
+    把 PipeSimulator 包成采集线程的数据源。
+    realtime=True：按墙钟时间出点（GUI 演示），每 block_period 秒交一块，滑台位置块内插值；
+    realtime=False：不等待，每次直接给 block_size 个点（压测用），
+    出满 max_samples 后返回 None 结束。
+    """
+
+    def __init__(
+        self,
+        simulator: PipeSimulator,
+        realtime=True,
+        block_period=0.01,
+        block_size=4096,
+        max_samples=None,
+    ):
+        self.sim = simulator
+        self.realtime = bool(realtime)
+        simulator.interpolate_slide = self.realtime
+        self.block_period = float(block_period)
+        self.block_size = int(block_size)
+        self.max_samples = max_samples
+        self._t0 = None
+        self._start_index = 0
+
+    @property
+    def slide_mm(self) -> float:
+        return self.sim.slide_mm
+
+    @slide_mm.setter
+    def slide_mm(self, value):
+        self.sim.slide_mm = float(value)
+
+    def open(self):
+        self._t0 = time.perf_counter()
+        self._start_index = self.sim.index
+
+    def read_block(self):
+        if self._t0 is None:
+            self.open()
+        emitted = self.sim.index - self._start_index
+        if self.realtime:
+            time.sleep(self.block_period)
+            now = time.perf_counter()
+            k = int((now - self._t0) * self.sim.rate_hz) - emitted
+        else:
+            now = time.perf_counter()
+            k = self.block_size
+        if self.max_samples is not None:
+            if emitted >= self.max_samples:
+                return None
+            k = min(k, self.max_samples - emitted)
+        if k <= 0:
+            return SampleBlock(*(np.empty(0),) * 4, t=now)
+        blk = self.sim.block(k)
+        blk.t = now
+        return blk
+
+
+def generate_pipe(
+    geometry: PipeGeometry = None,
+    positions_mm=(0.0,),
+    samples_per_rev=180,
+    revs=1.0,
+    seed=0,
+):
+    """
+    一次生成整根管的数据：每个截面位置转 revs 圈。
+    返回 (angle, od, id, slide) 四个等长数组，截面按 positions_mm 顺序首尾相接。
+    """
+    sim = PipeSimulator(geometry, rate_hz=float(samples_per_rev), deg_per_s=360.0, seed=seed)
+    n = int(round(samples_per_rev * revs))
+    blocks = []
+    for pos in positions_mm:
+        sim.slide_mm = float(pos)
+        blocks.append(sim.block(n))
+    return tuple(
+        np.concatenate([getattr(b, col) for b in blocks])
+        for col in ("angle", "outer", "inner", "slide")
+    )
+
+
+def simulated_source(geometry: PipeGeometry = None, rate_hz=10_000.0, deg_per_s=180.0, seed=0,
+                     **kwargs) -> SimulatedSource:
+    """建一个实时仿真源；给 AcquisitionProcess 在子进程里调用（用 functools.partial 绑参数）"""
+    sim = PipeSimulator(geometry, rate_hz=rate_hz, deg_per_s=deg_per_s, seed=seed)
+    return SimulatedSource(sim, **kwargs)
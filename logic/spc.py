@@ -0,0 +1,381 @@
+"""
+SPC：对最近一段时间的管子做 X̄-R / X̄-S 控制图和 Cpk / Ppk，按 Western Electric 规则报警。
+
+每来一根管只做常数量的工作，和窗口多大（哪怕 10 万根）无关：
+- 每个特性按 subgroup_size 根一组，组满了算一次组均值 / 极差 / 标准差
+- 最近 window 根管的组统计放在定长环形缓冲里，维护滚动和；
+  挤出去的旧值从和里减掉，不重算整个窗口
+- 单根管的值另有一个窗口，维护 Σ(x - ref) / Σ(x - ref)²，给 Ppk 用（ref 取第一个值，避免相减抵消）；
+  每绕一圈按缓冲重算一次和，消掉累积的舍入误差（摊下来还是 O(1)）
+
+控制限用加入新组之前的窗口算（新点和已有的过程比），窗口里的组数不到 min_subgroups 时不判规则。
+子组不到 10 根时用 X̄-R 图，10 根及以上用 X̄-S 图（两套限都会算，报警只看用的那套）。
+
+Western Electric 规则（组均值，σ = X̄ 图控制限宽度的 1/3）：
+    1: 1 点超出 3σ
+    2: 连续 3 点中有 2 点在同一侧 2σ 以外
+    3: 连续 5 点中有 4 点在同一侧 1σ 以外
+    4: 连续 8 点在中心线同一侧
+另外组内离散超出 R 图 / S 图上限也报（rule "R" / "S"）。
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.frp_numpy import DEFAULT_TOLERANCES
+
+# 控制图系数用的 d2 / d3（子组大小 2..25）
+_D2 = {
+    2: 1.128, 3: 1.693, 4: 2.059, 5: 2.326, 6: 2.534, 7: 2.704, 8: 2.847, 9: 2.970,
+    10: 3.078, 11: 3.173, 12: 3.258, 13: 3.336, 14: 3.407, 15: 3.472, 16: 3.532,
+    17: 3.588, 18: 3.640, 19: 3.689, 20: 3.735, 21: 3.778, 22: 3.819, 23: 3.858,
+    24: 3.895, 25: 3.931,
+}
+_D3 = {
+    2: 0.853, 3: 0.888, 4: 0.880, 5: 0.864, 6: 0.848, 7: 0.833, 8: 0.820, 9: 0.808,
+    10: 0.797, 11: 0.787, 12: 0.778, 13: 0.770, 14: 0.763, 15: 0.756, 16: 0.750,
+    17: 0.744, 18: 0.739, 19: 0.734, 20: 0.729, 21: 0.724, 22: 0.720, 23: 0.716,
+    24: 0.712, 25: 0.708,
+}
+
+
+def c4(n: int) -> float:
+    """样本标准差的无偏修正系数"""
+    return math.sqrt(2.0 / (n - 1)) * math.exp(math.lgamma(n / 2.0) - math.lgamma((n - 1) / 2.0))
+
+
+# 特性名 -> FrpResult 的字段；给了多个字段时取最大的那个（圆度看内外圆里差的一个）
+CHARACTERISTICS = {
+    "od": ("outer_diameter_avg",),
+    "id": ("inner_diameter_avg",),
+    "roundness": ("roundness_outer", "roundness_inner"),
+    "concentricity": ("concentricity",),
+}
+
+
+def spec_limits(tolerances=None) -> dict:
+    """各特性的 (LSL, USL)，没有的一侧为 None；公差键和 core.frp_numpy 一致"""
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    limits = {
+        "roundness": (None, tol["roundness_max_mm"]),
+        "concentricity": (None, tol["concentricity_max_mm"]),
+    }
+    for key in ("od", "id"):
+        nominal = tol.get(f"{key}_nominal_mm")
+        t = tol[f"{key}_tol_mm"]
+        limits[key] = (None, None) if nominal is None else (nominal - t, nominal + t)
+    return limits
+
+
+class RollingWindow:
+    """定长窗口上的 n / 均值 / 方差，加一个值、挤掉一个最旧的值都是 O(1)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self._buf = np.empty(self.capacity)
+        self._head = 0  # 下一个写入位置
+        self.n = 0
+        self._ref = None
+        self._s1 = 0.0
+        self._s2 = 0.0
+        self._adds = 0
+
+    def add(self, x: float):
+        x = float(x)
+        if self._ref is None:
+            self._ref = x
+        if self.n == self.capacity:
+            old = self._buf[self._head] - self._ref
+            self._s1 -= old
+            self._s2 -= old * old
+        else:
+            self.n += 1
+        self._buf[self._head] = x
+        self._head = (self._head + 1) % self.capacity
+        d = x - self._ref
+        self._s1 += d
+        self._s2 += d * d
+        self._adds += 1
+        if self._adds % self.capacity == 0:
+            self._resum()
+
+    def extend(self, values):
+        """一次放进很多值（启动时从结果库预热用），只保留最后 capacity 个"""
+        v = np.asarray(values, dtype=np.float64).reshape(-1)
+        if v.shape[0] == 0:
+            return
+        if self._ref is None:
+            self._ref = float(v[0])
+        v = v[-self.capacity :]
+        for part in (v[: self.capacity - self._head], v[self.capacity - self._head :]):
+            k = part.shape[0]
+            if k:
+                self._buf[self._head : self._head + k] = part
+                self._head = (self._head + k) % self.capacity
+        self.n = min(self.n + v.shape[0], self.capacity)
+        self._resum()
+
+    def _resum(self):
+        d = self.values() - self._ref
+        self._s1 = float(d.sum())
+        self._s2 = float(d @ d)
+
+    def values(self) -> np.ndarray:
+        """窗口里的值，从旧到新（会拷贝）"""
+        if self.n < self.capacity:
+            return self._buf[: self.n].copy()
+        return np.concatenate((self._buf[self._head :], self._buf[: self._head]))
+
+    @property
+    def mean(self) -> float:
+        return self._ref + self._s1 / self.n if self.n else math.nan
+
+    @property
+    def var(self) -> float:
+        if self.n < 2:
+            return math.nan
+        return max(self._s2 - self._s1 * self._s1 / self.n, 0.0) / (self.n - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+
+@dataclass
+class ControlLimits:
+    center: float
+    xbar_lcl: float
+    xbar_ucl: float
+    r_center: float
+    r_lcl: float
+    r_ucl: float
+    s_center: float
+    s_lcl: float
+    s_ucl: float
+
+    @property
+    def sigma_xbar(self) -> float:
+        return (self.xbar_ucl - self.center) / 3.0
+
+
+@dataclass
+class Violation:
+    characteristic: str
+    rule: str  # "1".."4"（Western Electric）或 "R" / "S"
+    message: str
+    value: float
+    subgroup: int  # 第几组（从 1 开始，累计）
+    ts: float
+
+
+class SpcChart:
+    """一个特性的 X̄-R / X̄-S 图 + 能力指数"""
+
+    def __init__(self, name, subgroup_size=5, window=10_000, lsl=None, usl=None, min_subgroups=20):
+        n = int(subgroup_size)
+        if n not in _D2:
+            raise ValueError(f"subgroup_size must be 2..25, got {n}")
+        self.name = name
+        self.n = n
+        self.lsl, self.usl = lsl, usl
+        self.min_subgroups = int(min_subgroups)
+        groups = max(int(window) // n, 1)
+        self.values = RollingWindow(groups * n)  # 单根管的值（Ppk）
+        self.xbar = RollingWindow(groups)
+        self.ranges = RollingWindow(groups)
+        self.stds = RollingWindow(groups)
+        self.subgroups = 0
+        self._pending = []
+        self._zones = deque(maxlen=8)  # 最近几组的 (x̄ - 中心线) / σ
+
+        d2, d3 = _D2[n], _D3[n]
+        cn = c4(n)
+        self._d2, self._c4 = d2, cn
+        self.use_s = n >= 10
+        self._a2 = 3.0 / (d2 * math.sqrt(n))
+        self._d3_lo, self._d4 = max(0.0, 1.0 - 3.0 * d3 / d2), 1.0 + 3.0 * d3 / d2
+        self._a3 = 3.0 / (cn * math.sqrt(n))
+        k = 3.0 * math.sqrt(1.0 - cn * cn) / cn
+        self._b3, self._b4 = max(0.0, 1.0 - k), 1.0 + k
+
+    # ---------- 控制限 / 能力 ----------
+
+    def limits(self) -> ControlLimits:
+        xbb, rb, sb = self.xbar.mean, self.ranges.mean, self.stds.mean
+        half = self._a3 * sb if self.use_s else self._a2 * rb
+        return ControlLimits(
+            center=xbb,
+            xbar_lcl=xbb - half,
+            xbar_ucl=xbb + half,
+            r_center=rb,
+            r_lcl=self._d3_lo * rb,
+            r_ucl=self._d4 * rb,
+            s_center=sb,
+            s_lcl=self._b3 * sb,
+            s_ucl=self._b4 * sb,
+        )
+
+    @property
+    def sigma_within(self) -> float:
+        """组内 σ 估计：R̄ / d2（X̄-R）或 S̄ / c4（X̄-S）"""
+        return self.stds.mean / self._c4 if self.use_s else self.ranges.mean / self._d2
+
+    def _capability(self, sigma):
+        mu = self.values.mean
+        if not sigma > 0 or math.isnan(mu):
+            return math.nan
+        sides = []
+        if self.usl is not None:
+            sides.append((self.usl - mu) / (3.0 * sigma))
+        if self.lsl is not None:
+            sides.append((mu - self.lsl) / (3.0 * sigma))
+        return min(sides) if sides else math.nan
+
+    def cpk(self) -> float:
+        return self._capability(self.sigma_within)
+
+    def ppk(self) -> float:
+        return self._capability(self.values.std)
+
+    # ---------- 加数据 ----------
+
+    def add(self, x: float, ts: float = None) -> list:
+        """加一根管的值；凑满一组时判规则，返回这次触发的 Violation 列表"""
+        x = float(x)
+        if not math.isfinite(x):
+            return []
+        self.values.add(x)
+        self._pending.append(x)
+        if len(self._pending) < self.n:
+            return []
+        group = self._pending
+        self._pending = []
+        mean = sum(group) / self.n
+        rng = max(group) - min(group)
+        std = math.sqrt(sum((g - mean) ** 2 for g in group) / (self.n - 1))
+
+        violations = []
+        if self.xbar.n >= self.min_subgroups:
+            violations = self._check(mean, rng, std, ts if ts is not None else time.time())
+        self.xbar.add(mean)
+        self.ranges.add(rng)
+        self.stds.add(std)
+        self.subgroups += 1
+        return violations
+
+    def extend(self, values):
+        """批量预热（不判规则）：整组整组地算完直接放进窗口"""
+        v = np.asarray(values, dtype=np.float64).reshape(-1)
+        v = v[np.isfinite(v)]
+        if self._pending:
+            v = np.concatenate((self._pending, v))
+            self._pending = []
+        k = v.shape[0] // self.n
+        groups = v[: k * self.n].reshape(k, self.n)
+        self.values.extend(groups.reshape(-1))
+        self._pending = v[k * self.n :].tolist()
+        if k == 0:
+            return
+        means = groups.mean(axis=1)
+        self.xbar.extend(means)
+        self.ranges.extend(np.ptp(groups, axis=1))
+        self.stds.extend(groups.std(axis=1, ddof=1))
+        self.subgroups += k
+        lim = self.limits()
+        sigma = lim.sigma_xbar
+        for m in means[-self._zones.maxlen :]:
+            self._zones.append((m - lim.center) / sigma if sigma > 0 else 0.0)
+
+    # ---------- 规则 ----------
+
+    def _check(self, mean, rng, std, ts) -> list:
+        lim = self.limits()
+        sigma = lim.sigma_xbar
+        z = (mean - lim.center) / sigma if sigma > 0 else 0.0
+        self._zones.append(z)
+        zones = list(self._zones)
+        k = self.subgroups + 1
+        out = []
+
+        def hit(rule, text):
+            out.append(Violation(self.name, rule, f"{self.name}: {text}", mean, k, ts))
+
+        if abs(z) > 3.0:
+            hit("1", f"subgroup mean {mean:.4f} outside [{lim.xbar_lcl:.4f}, {lim.xbar_ucl:.4f}]")
+        for side in (1.0, -1.0):
+            if sum(1 for q in zones[-3:] if q * side > 2.0) >= 2 and z * side > 2.0:
+                hit("2", "2 of 3 subgroup means beyond 2 sigma on one side")
+            if sum(1 for q in zones[-5:] if q * side > 1.0) >= 4 and z * side > 1.0:
+                hit("3", "4 of 5 subgroup means beyond 1 sigma on one side")
+            if len(zones) == 8 and all(q * side > 0 for q in zones):
+                hit("4", "8 subgroup means in a row on one side of center")
+        if self.use_s:
+            if std > lim.s_ucl > 0:
+                hit("S", f"std {std:.4f} above S chart UCL {lim.s_ucl:.4f}")
+        elif rng > lim.r_ucl > 0:
+            hit("R", f"range {rng:.4f} above R chart UCL {lim.r_ucl:.4f}")
+        if any(v.rule == "4" for v in out):
+            self._zones.clear()  # 同一段连续偏移只报一次
+        return out
+
+
+class SpcMonitor:
+    """每个特性一张图；add_result() 每根管调一次，违规时记进 global_state 的报警"""
+
+    def __init__(
+        self,
+        tolerances=None,
+        subgroup_size=5,
+        window=10_000,
+        min_subgroups=20,
+        state=None,
+        characteristics=CHARACTERISTICS,
+    ):
+        spec = spec_limits(tolerances)
+        self.fields = dict(characteristics)
+        self.charts = {
+            name: SpcChart(name, subgroup_size, window, *spec.get(name, (None, None)), min_subgroups)
+            for name in self.fields
+        }
+        self.state = state
+        self.violations = deque(maxlen=1000)
+
+    def add_result(self, result, ts=None) -> list:
+        found = []
+        for name, fields in self.fields.items():
+            value = max(getattr(result, f) for f in fields)
+            found.extend(self.charts[name].add(value, ts))
+        if found:
+            self.violations.extend(found)
+            if self.state is not None:
+                for v in found:
+                    self.state.raise_alarm(f"rule {v.rule}: {v.message}", source="SPC")
+        return found
+
+    def prime(self, columns: dict):
+        """
+        用历史结果预热（不报警）。columns 是 logic.results_db 查出来的列，
+        至少要有 CHARACTERISTICS 用到的那几列，按时间从早到晚。
+        """
+        for name, fields in self.fields.items():
+            if all(f in columns for f in fields):
+                self.charts[name].extend(np.maximum.reduce([columns[f] for f in fields]))
+
+    def summary(self) -> dict:
+        """各特性当前的控制限和能力指数"""
+        out = {}
+        for name, chart in self.charts.items():
+            if chart.xbar.n == 0:
+                continue
+            out[name] = {
+                "limits": chart.limits(),
+                "cpk": chart.cpk(),
+                "ppk": chart.ppk(),
+                "n": chart.values.n,
+            }
+        return out
+
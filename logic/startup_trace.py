@@ -0,0 +1,65 @@
+"""
+启动耗时记录：从 main.py 第一行 import 本模块开始计时，
+mark() 记一个时间点，span() 记一段耗时，最后 report() 打出一张表。
+
+    FRP_STARTUP_TRACE=1 python main.py              # 首帧画出来后把表打印到 stdout
+    FRP_STARTUP_TRACE=startup.json python main.py   # 同时写成 JSON
+
+不依赖 Kivy。
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+_T0 = time.perf_counter()
+_events = []  # (名字, 开始时刻, 耗时)；mark 的耗时为 None
+
+
+def elapsed_ms() -> float:
+    return (time.perf_counter() - _T0) * 1000.0
+
+
+def mark(name: str):
+    _events.append((name, time.perf_counter(), None))
+
+
+@contextmanager
+def span(name: str):
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        _events.append((name, t, time.perf_counter() - t))
+
+
+def report() -> list:
+    """[{"name", "at_ms"（相对计时起点）, "ms"（span 的耗时，mark 为 None）}, ...]，按时间排好"""
+    return [
+        {
+            "name": name,
+            "at_ms": round((t - _T0) * 1000.0, 2),
+            "ms": None if dt is None else round(dt * 1000.0, 2),
+        }
+        for name, t, dt in sorted(_events, key=lambda e: e[1])
+    ]
+
+
+def format_report() -> str:
+    lines = ["  at (ms)   took (ms)  step"]
+    for e in report():
+        took = "" if e["ms"] is None else f"{e['ms']:9.1f}"
+        lines.append(f"{e['at_ms']:9.1f}   {took:>9}  {e['name']}")
+    return "\n".join(lines)
+
+
+def emit_if_requested(env_var="FRP_STARTUP_TRACE"):
+    """按环境变量输出：1 / true 打印；其他非空值当作 JSON 文件路径，同时打印"""
+    target = os.environ.get(env_var, "")
+    if not target:
+        return
+    print(format_report())
+    if target.lower() not in ("1", "true", "yes"):
+        with open(target, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=2)
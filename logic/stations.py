@@ -0,0 +1,249 @@
+"""
+多工位：一个 HMI 带 N 个测量头。
+
+每个工位一个独立进程，采集线程、MeasurementSession、Sequencer、截面计算都在自己的进程里，
+不和别的工位抢 GIL，也不共用任何模块级状态（原生库那份全局数据、global_state 都是各进程一份）。
+原始采样不出工位进程；主进程只收很少量的消息：
+
+    ("step", 工位名, MeasureStep 名, 截面号)
+    ("live", 工位名, (angle, od, id, slide))          每 live_period_s 一条
+    ("result", 工位名, result_to_dict(res), meta)     meta: pipe / cycle_s / rejected
+    ("error", 工位名, 出错原因)
+    ("exit", 工位名, None)
+
+主进程里每个工位有自己的 SystemState（StationPool.states[name]），poll() 把消息写进去，
+界面按工位订阅，和单工位时订阅 global_state 一样。
+
+不依赖 Kivy。
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import time
+from dataclasses import dataclass, field
+
+from logic.measurement_flow import STEP_LABELS, MeasureStep
+from logic.models import SystemState
+
+
+@dataclass
+class StationConfig:
+    name: str
+    samples_per_rev: int = 180
+    sections: int = 3
+    deg_per_s: float = 180.0
+    slide_mm_s: float = 1500.0
+    seed: int = 0
+    # PipeGeometry 的参数（仿真管子），空 = 默认
+    geometry: dict = field(default_factory=dict)
+    # 在标称管端 ± 多少 mm 内扫描找边；0 = 直接走到标称位置
+    edge_search_mm: float = 50.0
+    # 测几根管后退出；0 = 一直测到 stop()
+    pipes: int = 0
+    # 两根管之间的间隔（上下料）
+    pause_s: float = 0.5
+    # 实时值（角度 / 内外径）上报周期
+    live_period_s: float = 0.1
+
+
+# ---------- 工位进程 ----------
+
+
+class _SimRig:
+    """仿真工位的硬件：滑台 + 旋转轴 + 信号源；轴跨管保留位置，信号源每根管换一个"""
+
+    def __init__(self, cfg: StationConfig):
+        from logic.edges import EdgeScanner
+        from logic.sequencer import SimAxis, Station, SweepStation
+        from logic.simulator import PipeGeometry
+
+        self.cfg = cfg
+        geometry = dict(cfg.geometry)
+        geometry.setdefault("ends", cfg.edge_search_mm > 0)
+        self.geometry = PipeGeometry(**geometry)
+        self.sim = None
+        slide = SimAxis(cfg.slide_mm_s, on_move=self._on_slide)
+        edges = (0.0, self.geometry.length_mm)
+        # 找边的 scanner 要挂在每根管的采集线程上（见 sinks）
+        self.scanner = None
+        if cfg.edge_search_mm > 0:
+            od = self.geometry.od_mm
+            self.scanner = EdgeScanner(od / 2, od / 4)
+            self.station = SweepStation(
+                slide, SimAxis(cfg.deg_per_s), self.scanner,
+                edge_positions=edges, search_mm=cfg.edge_search_mm,
+            )
+        else:
+            self.station = Station(slide, SimAxis(cfg.deg_per_s), edge_positions=edges)
+
+    @property
+    def sinks(self) -> list:
+        return [self.scanner.add_samples] if self.scanner is not None else []
+
+    def _on_slide(self, pos):
+        if self.sim is not None:
+            self.sim.slide_mm = pos
+
+    def new_source(self, pipe: int):
+        from logic.simulator import PipeSimulator, SimulatedSource
+
+        cfg = self.cfg
+        self.sim = PipeSimulator(
+            self.geometry,
+            rate_hz=cfg.samples_per_rev * cfg.deg_per_s / 360.0,
+            deg_per_s=cfg.deg_per_s,
+            seed=cfg.seed + pipe,
+        )
+        self.sim.slide_mm = self.station.slide.position
+        return SimulatedSource(self.sim)
+
+
+async def _run_pipe(cfg, seq, session, worker, events, stop):
+    """跑一根管；顺便定期上报实时值，stop 置位时取消流程"""
+    task = asyncio.ensure_future(seq.run(session))
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=cfg.live_period_s)
+        if done:
+            return task.result()
+        if worker.latest is not None:
+            events.put(("live", cfg.name, worker.latest))
+        if stop.is_set():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            return None
+
+
+def station_main(cfg: StationConfig, events, stop):
+    """
+    工位进程入口：一根接一根地测，直到测满 cfg.pipes 根或 stop 置位。
+    events 只用 put()，stop 只用 is_set() / wait()，所以在线程里跑（queue.Queue + threading.Event）也行。
+    """
+    from core.frp_core import result_to_dict
+    from logic.acquisition import AcquisitionWorker
+    from logic.sequencer import SequencePlan, Sequencer
+    from logic.session import MeasurementSession
+
+    rig = _SimRig(cfg)
+    pipe = 0
+    try:
+        while not stop.is_set() and (cfg.pipes <= 0 or pipe < cfg.pipes):
+            session = MeasurementSession(
+                max_sections=cfg.sections, samples_per_rev=cfg.samples_per_rev
+            )
+            worker = AcquisitionWorker(
+                rig.new_source(pipe), sinks=[session.add_samples, *rig.sinks]
+            )
+            seq = Sequencer(
+                rig.station,
+                SequencePlan(sections=cfg.sections),
+                on_step=lambda step, sec: events.put(("step", cfg.name, step.name, sec)),
+            )
+            worker.start()
+            try:
+                result = asyncio.run(_run_pipe(cfg, seq, session, worker, events, stop))
+            finally:
+                worker.stop()
+            if result is not None:
+                meta = {"pipe": pipe, "cycle_s": seq.cycle_time_s, "rejected": session.rejected}
+                events.put(("result", cfg.name, result_to_dict(result), meta))
+            elif seq.error:
+                events.put(("error", cfg.name, seq.error))
+            pipe += 1
+            if stop.wait(cfg.pause_s):
+                break
+    except Exception as exc:  # 工位进程自己兜底，主进程只看消息
+        events.put(("error", cfg.name, f"{type(exc).__name__}: {exc}"))
+    finally:
+        events.put(("exit", cfg.name, None))
+
+
+# ---------- 主进程 ----------
+
+
+class StationPool:
+    """
+    N 个工位进程。start() 起进程，poll() 在主线程（Kivy 里用 Clock 定时调）取消息
+    并更新各工位的 SystemState，返回这一轮新出的结果 [(工位名, 结果 dict, meta)]。
+    """
+
+    def __init__(self, configs, mp_context="spawn"):
+        self.configs = {c.name: c for c in configs}
+        if len(self.configs) != len(configs):
+            raise ValueError("station names must be unique")
+        self.states = {name: SystemState() for name in self.configs}
+        self._mp = multiprocessing.get_context(mp_context)
+        self._events = self._mp.Queue()
+        self._stop = self._mp.Event()
+        self._procs = {}
+        self._running = set()
+
+    def start(self):
+        self._stop.clear()
+        for name, cfg in self.configs.items():
+            proc = self._mp.Process(
+                target=station_main,
+                args=(cfg, self._events, self._stop),
+                name=f"frp-station-{name}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs[name] = proc
+            self._running.add(name)
+
+    @property
+    def running(self) -> set:
+        """还没报 exit 的工位"""
+        return set(self._running)
+
+    def poll(self, max_events: int = 1000) -> list:
+        results = []
+        for _ in range(max_events):
+            try:
+                kind, name, *payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            state = self.states[name]
+            if kind == "step":
+                step, section = payload
+                state.current_step = STEP_LABELS[MeasureStep[step]]
+            elif kind == "live":
+                angle, od, id_, slide = payload[0]
+                live = state.live
+                live.angle_deg = angle
+                live.outer_diameter = od
+                live.inner_diameter = id_
+                live.slide_pos_mm = slide
+            elif kind == "result":
+                res, meta = payload
+                state.live.status_text = "OK" if res["ok_flag"] else f"NG {meta['rejected']}".strip()
+                results.append((name, res, meta))
+            elif kind == "error":
+                state.live.status_text = f"ERROR: {payload[0]}"
+                state.raise_alarm(payload[0], source=name)
+            elif kind == "exit":
+                self._running.discard(name)
+        return results
+
+    def stop(self, timeout: float = 5.0) -> list:
+        """
+        通知所有工位停下并等进程退出；返回停的过程中还收到的结果。
+        等的时候一直在取消息：队列里有没取走的数据时子进程退不掉。
+        """
+        self._stop.set()
+        results = []
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(p.is_alive() for p in self._procs.values()):
+            results.extend(self.poll())
+            time.sleep(0.05)
+        for proc in self._procs.values():
+            if proc.is_alive():
+                proc.terminate()
+            proc.join(1.0)
+        results.extend(self.poll())
+        self._procs.clear()
+        self._running.clear()
+        return results
@@ -0,0 +1,193 @@
+"""
+旋转过程中的增量统计：每来一块采样就更新，随时可以取当前截面的估计值，
+不用等截面关掉再整段重算。每个点的开销是常数，和已经采了多少点无关。
+
+- 直径均值 / 方差：Welford（按块合并，数值稳定）
+- 圆心 / 半径：累加 Kasa 拟合的各阶矩，取值时解一次 3×3 方程（和 core.frp_numpy 同一套解法）
+- 圆度：按角度分桶记每桶半径的 min / max，取值时减去当前拟合圆，
+  桶宽带来的误差不超过 偏心 × π / 桶数（默认 360 桶时可以忽略）
+
+NaN / inf（探头掉点）直接跳过，不进统计。
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.frp_numpy import DEFAULT_TOLERANCES, solve_circles
+
+
+class Welford:
+    """均值 / 方差 / 极值的流式统计"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        v = np.asarray(values, dtype=np.float64).reshape(-1)
+        nb = v.shape[0]
+        if nb == 0:
+            return
+        mb = float(v.mean())
+        m2b = float(np.square(v - mb).sum())
+        n = self.n + nb
+        d = mb - self.mean
+        self.mean += d * nb / n
+        self.m2 += m2b + d * d * self.n * nb / n
+        self.n = n
+        self.min = min(self.min, float(v.min()))
+        self.max = max(self.max, float(v.max()))
+
+    @property
+    def var(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.var)
+
+
+class CircleMoments:
+    """Kasa 圆拟合的 9 个矩：n, Σx, Σy, Σxx, Σyy, Σxy, Σxz, Σyz, Σz（z = x² + y²）"""
+
+    def __init__(self):
+        self.m = np.zeros(9)
+
+    def update(self, x, y):
+        z = x * x + y * y
+        self.m += np.array(
+            [x.shape[0], x.sum(), y.sum(), x @ x, y @ y, x @ y, x @ z, y @ z, z.sum()]
+        )
+
+    def fit(self):
+        """返回 (xc, yc, r)"""
+        xc, yc, r = solve_circles(self.m[None, :])
+        return float(xc[0]), float(yc[0]), float(r[0])
+
+
+class AngleBins:
+    """按角度分桶的半径 min / max"""
+
+    def __init__(self, n_bins=360):
+        self.n_bins = int(n_bins)
+        self.lo = np.full(self.n_bins, np.inf)
+        self.hi = np.full(self.n_bins, -np.inf)
+        mid = np.radians((np.arange(self.n_bins) + 0.5) * (360.0 / self.n_bins))
+        self._cos, self._sin = np.cos(mid), np.sin(mid)
+
+    def bins(self, angle_deg):
+        return (np.asarray(angle_deg) * (self.n_bins / 360.0)).astype(np.intp) % self.n_bins
+
+    def update(self, bins, radius):
+        np.minimum.at(self.lo, bins, radius)
+        np.maximum.at(self.hi, bins, radius)
+
+    @property
+    def coverage(self) -> float:
+        """有数据的桶占比（1.0 = 整圈都扫到了）"""
+        return float(np.isfinite(self.lo).mean())
+
+    def roundness(self, xc, yc, r) -> float:
+        filled = np.isfinite(self.lo)
+        if not filled.any():
+            return 0.0
+        model = r + xc * self._cos[filled] + yc * self._sin[filled]
+        return float((self.hi[filled] - model).max() - (self.lo[filled] - model).min())
+
+
+@dataclass
+class LiveStats:
+    """某个时刻对当前截面的估计"""
+
+    n: int = 0
+    od_mean: float = 0.0
+    od_std: float = 0.0
+    id_mean: float = 0.0
+    id_std: float = 0.0
+    roundness_outer: float = 0.0
+    roundness_inner: float = 0.0
+    concentricity: float = 0.0
+    coverage: float = 0.0
+
+
+class StreamingSection:
+    """一个截面的全部增量统计；采集线程里 update()，任意时刻 snapshot()"""
+
+    def __init__(self, n_bins=360):
+        self.od = Welford()
+        self.id = Welford()
+        self.outer = CircleMoments()
+        self.inner = CircleMoments()
+        self.outer_bins = AngleBins(n_bins)
+        self.inner_bins = AngleBins(n_bins)
+
+    def update(self, angle_deg, outer_d, inner_d):
+        a = np.asarray(angle_deg, dtype=np.float64).reshape(-1)
+        if a.shape[0] == 0:
+            return
+        od = np.asarray(outer_d, dtype=np.float64).reshape(-1)
+        id_ = np.asarray(inner_d, dtype=np.float64).reshape(-1)
+        rad = np.radians(a)
+        c, s = np.cos(rad), np.sin(rad)
+        bins = self.outer_bins.bins(a)
+        for d, stats, moments, abins in (
+            (od, self.od, self.outer, self.outer_bins),
+            (id_, self.id, self.inner, self.inner_bins),
+        ):
+            ok = np.isfinite(d)
+            if not ok.all():
+                d, cc, ss, bb = d[ok], c[ok], s[ok], bins[ok]
+            else:
+                cc, ss, bb = c, s, bins
+            r = 0.5 * d
+            stats.update(d)
+            moments.update(r * cc, r * ss)
+            abins.update(bb, r)
+
+    def snapshot(self) -> LiveStats:
+        if self.od.n == 0:
+            return LiveStats()
+        oxc, oyc, ro = self.outer.fit()
+        ixc, iyc, ri = self.inner.fit() if self.id.n else (oxc, oyc, 0.0)
+        return LiveStats(
+            n=self.od.n,
+            od_mean=self.od.mean,
+            od_std=self.od.std,
+            id_mean=self.id.mean,
+            id_std=self.id.std,
+            roundness_outer=self.outer_bins.roundness(oxc, oyc, ro),
+            roundness_inner=self.inner_bins.roundness(ixc, iyc, ri) if self.id.n else 0.0,
+            concentricity=2.0 * math.hypot(oxc - ixc, oyc - iyc),
+            coverage=self.outer_bins.coverage,
+        )
+
+
+def early_reject(stats: LiveStats, tolerances=None, margin=1.5, min_coverage=0.9) -> str:
+    """
+    旋转途中判断是不是“明显 NG”：超出公差 margin 倍才算，避免把临界件提前判死。
+    圆度 / 同心度只在扫过 min_coverage 圈以后才看（只扫了半圈时，椭圆会被拟合成偏心圆）。
+    返回 NG 原因，没问题返回空字符串。
+    """
+    tol = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    if stats.n == 0:
+        return ""
+    if stats.coverage >= min_coverage:
+        limit = tol["roundness_max_mm"] * margin
+        worst = max(stats.roundness_outer, stats.roundness_inner)
+        if worst > limit:
+            return f"roundness {worst:.3f} > {limit:.3f} mm"
+        limit = tol["concentricity_max_mm"] * margin
+        if stats.concentricity > limit:
+            return f"concentricity {stats.concentricity:.3f} > {limit:.3f} mm"
+    for key, mean in (("od", stats.od_mean), ("id", stats.id_mean)):
+        nominal = tol.get(f"{key}_nominal_mm")
+        if nominal is not None:
+            limit = tol[f"{key}_tol_mm"] * margin
+            if abs(mean - nominal) > limit:
+                return f"{key.upper()} {mean:.3f} off nominal {nominal:.3f} by > {limit:.3f} mm"
+    return ""
@@ -0,0 +1,98 @@
+"""
+检查核心包 frp 能不能脱离界面用：在干净的子进程里 import，
+不能带进 Kivy / KivyMD / matplotlib，并打印 import 耗时。
+
+用法（在项目根目录）：
+    python -m tools.check_headless
+    python -m tools.check_headless --budget-ms 100 --full
+
+预算算的是 import frp 再把核心的名字（配置 / 状态模型 / 测量流程，见 CORE_NAMES）真正取一遍的耗时，
+这几个模块也不能带进 numpy。--full 时再把其余导出的名字全部取一遍：计算后端、session 都离不开 numpy，
+单 import numpy 就要几十毫秒，这部分和 numpy 本身的耗时一起打印出来，不计入预算。
+有 GUI 模块被带进来、核心部分带进了 numpy，或者核心部分超过预算时返回 1。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+GUI_MODULES = ("kivy", "kivymd", "matplotlib")
+
+# 工作进程 / 命令行工具最常用、要求快的部分：配置、状态模型、测量流程
+CORE_NAMES = ("load_config", "SystemState", "global_state", "Sequencer", "SequencePlan", "Station")
+
+# 子进程里跑的脚本：结果以一行 JSON 打出来
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import frp
+for name in {core!r}:
+    getattr(frp, name)
+core_ms = (time.perf_counter() - t) * 1000.0
+core_numpy = "numpy" in sys.modules
+full_ms = None
+if {full}:
+    for name in frp.__all__:
+        getattr(frp, name)
+    full_ms = (time.perf_counter() - t) * 1000.0
+gui = sorted({{m.split(".")[0] for m in sys.modules}} & set({gui!r}))
+print(json.dumps({{"core_ms": core_ms, "core_numpy": core_numpy, "full_ms": full_ms, "gui": gui}}))
+"""
+
+_NUMPY_PROBE = """
+import time
+t = time.perf_counter()
+import numpy
+print((time.perf_counter() - t) * 1000.0)
+"""
+
+
+def _run(code: str) -> str:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+def probe(full: bool = False) -> dict:
+    return json.loads(_run(_PROBE.format(core=CORE_NAMES, full=full, gui=GUI_MODULES)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="核心部分的耗时上限")
+    parser.add_argument("--full", action="store_true", help="同时加载全部导出的名字")
+    parser.add_argument("--runs", type=int, default=3, help="跑几次取最快的一次")
+    args = parser.parse_args(argv)
+
+    runs = max(1, args.runs)
+    results = [probe(args.full) for _ in range(runs)]
+    core_ms = min(r["core_ms"] for r in results)
+    gui = sorted({m for r in results for m in r["gui"]})
+
+    print(f"frp core ({', '.join(CORE_NAMES)}): {core_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if args.full:
+        numpy_ms = min(float(_run(_NUMPY_PROBE)) for _ in range(runs))
+        full_ms = min(r["full_ms"] for r in results)
+        print(f"all exports: {full_ms:.1f} ms (not budgeted; import numpy alone: {numpy_ms:.1f} ms)")
+    failed = False
+    if gui:
+        print(f"GUI modules imported: {', '.join(gui)}")
+        failed = True
+    if any(r["core_numpy"] for r in results):
+        print("numpy imported by the core exports")
+        failed = True
+    if core_ms > args.budget_ms:
+        print("over budget")
+        failed = True
+    if failed:
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
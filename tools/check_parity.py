@@ -0,0 +1,87 @@
+"""
+原生核心库 vs NumPy 后端的一致性检查。
+
+用法（在项目根目录）：
+    python -m tools.check_parity
+    python -m tools.check_parity --samples 50000 --strict
+
+原生库目前只真正计算了内外径平均值，其余字段还是联调用的占位值，
+所以默认只比较平均值，其余字段只打印差值；--strict 时全部字段都要一致。
+找不到原生库时跳过并返回 0。
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from core import frp_core
+from core.frp_numpy import compute_arrays
+
+# 原生库里真正算出来的字段
+REAL_FIELDS = ("outer_diameter_avg", "inner_diameter_avg")
+ALL_FIELDS = [name for name, _ in frp_core.FrpResult._fields_]
+
+
+def make_samples(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0.0, 360.0, n)
+    rad = np.radians(angles)
+    od = 152.0 + 0.2 * np.sin(rad) + 0.03 * np.cos(2 * rad) + rng.normal(0, 0.005, n)
+    id_ = 76.0 + 0.05 * np.cos(rad) + rng.normal(0, 0.003, n)
+    return angles, od, id_
+
+
+def run_native(angles, od, id_):
+    frp_core.set_backend("native")
+    frp_core.reset()
+    frp_core.add_samples(angles, od, id_)
+    res = frp_core.compute()
+    frp_core.reset()
+    return res
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--rtol", type=float, default=1e-9)
+    parser.add_argument("--strict", action="store_true")
+    args = parser.parse_args(argv)
+
+    try:
+        frp_core.get_lib()
+    except OSError as exc:
+        print(f"native library not available, parity check skipped ({exc})")
+        return 0
+
+    checked = ALL_FIELDS if args.strict else REAL_FIELDS
+    failures = 0
+    for seed in range(args.seeds):
+        angles, od, id_ = make_samples(args.samples, seed)
+        nat = run_native(angles, od, id_)
+
+        t0 = time.perf_counter()
+        ref = compute_arrays(angles, od, id_)
+        dt = time.perf_counter() - t0
+
+        print(f"seed={seed} samples={args.samples} numpy compute {dt * 1e3:.2f} ms")
+        for name in ALL_FIELDS:
+            a, b = getattr(nat, name), getattr(ref, name)
+            ok = bool(np.isclose(a, b, rtol=args.rtol, atol=0.0))
+            mark = "ok" if ok else ("FAIL" if name in checked else "diff")
+            if not ok and name in checked:
+                failures += 1
+            print(f"  {name:>20}: native={a:<14.6f} numpy={b:<14.6f} {mark}")
+
+    frp_core.set_backend("auto")
+    if failures:
+        print(f"{failures} mismatches")
+        return 1
+    print("parity ok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
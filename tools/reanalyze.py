@@ -0,0 +1,178 @@
+"""
+离线批量重算：对一批 .frpcap 录制文件重新计算 FrpResult（公差改了之后用）。
+
+用法（在项目根目录）：
+    python -m tools.reanalyze captures/ -o results.csv
+    python -m tools.reanalyze a.frpcap b.frpcap -o results.npz --workers 8
+    python -m tools.reanalyze captures/ -o out.csv --tol roundness_max_mm=0.08
+
+不依赖 Kivy。每个进程各自加载自己的计算后端，原生库走 frp_core.CoreContext（每个文件一个上下文）。
+公差规则、管长、直线度只有 numpy 后端按截面算（combine_sections），
+原生库把整根管的点当成一个截面，所以 --tol 只能和 --backend numpy 一起用。
+CSV 按输入顺序边算边写（前面的文件没算完时，后面已经算完的结果先攒着），
+.npz 是按列存的结果表，最后一次写出。
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from core import frp_core
+from core.frp_core import FrpResult, result_to_dict
+from core.frp_numpy import DEFAULT_TOLERANCES
+from logic.capture import CaptureReader
+
+RESULT_FIELDS = [name for name, _ in FrpResult._fields_]
+OUT_FIELDS = ["path", "sections", "samples", *RESULT_FIELDS, "error"]
+
+_backend = "numpy"
+_tolerances = None
+
+
+def _init_worker(backend: str, tolerances: dict):
+    """进程池初始化：每个 worker 进程选好自己的后端"""
+    global _backend, _tolerances
+    frp_core.set_backend(backend)
+    _backend = frp_core.get_backend()
+    _tolerances = tolerances
+
+
+def analyze_file(path: str) -> dict:
+    """重算一个文件，返回一行结果；出错时只填 error，不让整批中断"""
+    row = {"path": path, "sections": 0, "samples": 0, "error": ""}
+    try:
+        with CaptureReader(path) as reader:
+            row["sections"] = len(reader.sections)
+            row["samples"] = reader.n_samples
+            if _backend == "numpy":
+                res = reader.compute(tolerances=_tolerances)
+            else:
+                # 原生库不分截面，整根管的点一次灌进去：没有截面位置，不套公差规则
+                with frp_core.CoreContext(_backend) as ctx:
+                    for sec in reader.sections:
+                        rec = reader.section(sec)
+                        ctx.add_samples(rec["angle_deg"], rec["outer_d_mm"], rec["inner_d_mm"])
+                    res = ctx.compute()
+        row.update(result_to_dict(res))
+    except Exception as exc:  # 坏文件只记一笔
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    return row
+
+
+def iter_inputs(paths) -> list:
+    files = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            files.extend(sorted(p.rglob("*.frpcap")))
+        else:
+            files.append(p)
+    return [str(f) for f in files]
+
+
+def parse_tolerances(items) -> dict:
+    tol = {}
+    for item in items or ():
+        key, _, value = item.partition("=")
+        if not value:
+            raise SystemExit(f"bad --tol {item!r}, expected name=value")
+        key = key.strip()
+        if key not in DEFAULT_TOLERANCES:
+            # combine_sections 不认识的名字会被静默忽略，等于没改公差
+            raise SystemExit(
+                f"unknown tolerance {key!r}, expected one of {', '.join(sorted(DEFAULT_TOLERANCES))}"
+            )
+        tol[key] = float(value)
+    return tol
+
+
+class CsvSink:
+    def __init__(self, path):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w = csv.DictWriter(self._f, fieldnames=OUT_FIELDS, extrasaction="ignore")
+        self._w.writeheader()
+
+    def write(self, row: dict):
+        self._w.writerow(row)
+
+    def close(self):
+        self._f.close()
+
+
+class NpzSink:
+    """按列收集，最后存成一个 .npz（每列一个数组）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.cols = {name: [] for name in OUT_FIELDS}
+
+    def write(self, row: dict):
+        for name in OUT_FIELDS:
+            self.cols[name].append(row.get(name, np.nan))
+
+    def close(self):
+        arrays = {}
+        for name, values in self.cols.items():
+            if name in ("path", "error"):
+                arrays[name] = np.array(values, dtype=str)
+            elif name in ("sections", "samples", "ok_flag"):
+                arrays[name] = np.array([-1 if v is np.nan else v for v in values], np.int64)
+            else:
+                arrays[name] = np.array(values, dtype=np.float64)
+        np.savez(self.path, **arrays)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help=".frpcap 文件或目录")
+    parser.add_argument("-o", "--output", required=True, help="结果文件（.csv 或 .npz）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", default="numpy", choices=frp_core.BACKENDS)
+    parser.add_argument("--chunksize", type=int, default=8, help="每次派给 worker 的文件数")
+    parser.add_argument("--tol", action="append", help="覆盖公差，例如 roundness_max_mm=0.08")
+    args = parser.parse_args(argv)
+
+    files = iter_inputs(args.inputs)
+    if not files:
+        print("no capture files found", file=sys.stderr)
+        return 1
+    tolerances = parse_tolerances(args.tol)
+    if tolerances:
+        # 看实际生效的后端：auto 在加载不了原生库时就是 numpy，可以用公差
+        frp_core.set_backend(args.backend)
+        if frp_core.get_backend() != "numpy":
+            raise SystemExit(
+                "--tol needs the numpy backend (the native core does not apply tolerance rules)"
+            )
+    sink = NpzSink(args.output) if args.output.endswith(".npz") else CsvSink(args.output)
+
+    t0 = time.perf_counter()
+    done = errors = 0
+    try:
+        with ProcessPoolExecutor(
+            max_workers=args.workers,
+            initializer=_init_worker,
+            initargs=(args.backend, tolerances),
+        ) as pool:
+            for row in pool.map(analyze_file, files, chunksize=args.chunksize):
+                sink.write(row)
+                done += 1
+                errors += bool(row["error"])
+    finally:
+        sink.close()
+
+    dt = time.perf_counter() - t0
+    print(
+        f"{done} pipes in {dt:.2f} s ({done / dt:.1f} pipes/s, "
+        f"{args.workers} workers, {errors} errors) -> {args.output}"
+    )
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
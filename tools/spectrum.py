@@ -0,0 +1,62 @@
+"""
+打印 .frpcap 录制文件各截面的谐波谱（1 阶偏心、2 阶椭圆、3 阶以上多棱），用于工艺诊断。
+
+用法（在项目根目录）：
+    python -m tools.spectrum pipe.frpcap
+    python -m tools.spectrum pipe.frpcap --harmonics 12 --upr 50
+
+网格点数默认取录制时配置里的 samples_per_rev，没有的话用本机配置（frp/config.py）。
+分析到第 harmonics_max 阶（配置，--max-harmonic 可改），表里只打前 --harmonics 阶，
+peak 一列是整个分析范围里幅值最大的那一阶（高阶多棱也看得到）。
+"""
+
+import argparse
+
+import numpy as np
+
+from frp.config import load_config
+from logic.capture import CaptureReader
+from logic.harmonics import analyze_capture, gaussian_filter
+
+
+def main(argv=None):
+    cfg = load_config()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help=".frpcap 文件")
+    parser.add_argument("--samples-per-rev", type=int, default=None, help="重采样网格点数")
+    parser.add_argument("--harmonics", type=int, default=8, help="打印到第几阶")
+    parser.add_argument(
+        "--max-harmonic", type=int, default=cfg["harmonics_max"], help="分析到第几阶"
+    )
+    parser.add_argument(
+        "--upr", type=float, default=cfg["roundness_filter_upr"], help="高斯滤波截止 UPR，0 = 不滤波"
+    )
+    args = parser.parse_args(argv)
+
+    with CaptureReader(args.path) as reader:
+        spr = args.samples_per_rev or reader.header.get("config", {}).get(
+            "samples_per_rev", cfg["samples_per_rev"]
+        )
+        flt = gaussian_filter(args.upr) if args.upr > 0 else None
+        max_h = max(args.max_harmonic, args.harmonics, 1)
+        res = analyze_capture(reader, spr, max_h, flt)
+
+    print(f"{args.path}: {len(res.positions)} sections, grid {spr}/rev, upr {args.upr or '-'}")
+    shown = min(args.harmonics, res.max_harmonic)
+    head = " ".join(f"{'h' + str(h):>8}" for h in range(1, shown + 1))
+    for name, amp, rnd in (
+        ("OD", res.outer_amp, res.roundness_outer),
+        ("ID", res.inner_amp, res.roundness_inner),
+    ):
+        print(
+            f"\n{name} radial amplitude (mm), h1-h{res.max_harmonic}\n"
+            f"{'pos':>8} {head} {'peak':>8} {'round':>8} {'cov':>6}"
+        )
+        for pos, row, r, cov in zip(res.positions, amp, rnd, res.coverage):
+            cells = " ".join(f"{v:8.4f}" for v in row[1 : shown + 1])
+            peak = f"h{int(np.argmax(row[1:])) + 1}" if row.shape[0] > 1 else "-"
+            print(f"{pos:8.1f} {cells} {peak:>8} {r:8.4f} {cov:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
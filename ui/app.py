@@ -0,0 +1,123 @@
+from logic import startup_trace
+
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.lang import Builder
+
+from kivymd.app import MDApp
+
+# KivyMD 的控件（MDTopAppBar / MDCard / MDTextField …）不在这里 import：
+# kivymd 自己在 Factory 里登记了模块名，kv 第一次用到时才加载。
+# 打包时 kivymd.tools.packaging.pyinstaller.hooks_path 会把它们都收进去。
+
+from frp.config import load_config, resolve_path, resource_path
+from logic import profiling
+from logic.models import global_state, set_scheduler
+from ui.screen_manager import LazyScreenManager  # noqa: F401  main.kv 的根控件
+import ui.widgets  # noqa: F401  自定义控件登记进 Factory（也是用到时才加载）
+
+startup_trace.mark("imports done")
+
+
+class FRPHMIDemo(MDApp):
+    # 测量结果库；配置里 results_db 为空时是 None
+    results_store = None
+    # SPC 控制图（logic.spc），每根管的结果都喂进去
+    spc = None
+    # 定期写性能统计文件的后台线程（logic.profiling.DumpThread）
+    profile_dumper = None
+    # F12 性能浮层；Window 只弱引用按键回调，这里要留着引用
+    perf_overlay = None
+    # PLC 状态轮询（logic.plc.PlcLink）；配置里 plc_enabled 为 False 时是 None
+    plc_link = None
+
+    def build(self):
+        # 深色主题 + 蓝灰
+        self.theme_cls.theme_style = "Dark"
+        self.theme_cls.primary_palette = "BlueGray"
+        self.theme_cls.primary_hue = "700"
+
+        Window.size = (1280, 720)
+
+        # 状态变化的通知合并到下一帧、在 UI 线程里发（采集 / PLC 线程也能放心改 global_state）
+        set_scheduler(lambda flush: Clock.schedule_once(lambda dt: flush()))
+
+        cfg = load_config()
+        if cfg.get("profiling"):
+            profiling.enable()
+
+        # 只建首页；其他页面第一次切过去时才建（见 ui/screen_manager.py）
+        with startup_trace.span("build root"):
+            root = Builder.load_file(resource_path("kv/main.kv"))
+            root.current = "home"
+        Window.bind(on_flip=self._on_first_frame)
+        return root
+
+    def _on_first_frame(self, *args):
+        """首页画出来之后：输出启动耗时，再开结果库 / SPC，空闲时把其余页面建好"""
+        Window.unbind(on_flip=self._on_first_frame)
+        startup_trace.mark("first frame")
+        startup_trace.emit_if_requested()
+        Clock.schedule_once(lambda dt: self._start_services())
+        Clock.schedule_once(lambda dt: self._start_profiling())
+        Clock.schedule_once(lambda dt: self._start_plc())
+        Clock.schedule_once(self._prebuild_next, 0.5)
+
+    def _start_services(self):
+        with startup_trace.span("results store + SPC"):
+            # 结果库：写在后台线程里，UI 只管往里放
+            from logic.results_db import ResultsStore
+            from logic.spc import CHARACTERISTICS, SpcMonitor
+
+            cfg = load_config()
+            db = cfg.get("results_db")
+            if db:
+                self.results_store = ResultsStore(resolve_path(db))
+
+            # SPC：用结果库里最近的历史预热，重启后控制限不用从头攒
+            self.spc = SpcMonitor(
+                subgroup_size=cfg.get("spc_subgroup", 5),
+                window=cfg.get("spc_window", 10000),
+                min_subgroups=cfg.get("spc_min_subgroups", 20),
+                state=global_state,
+            )
+            if self.results_store is not None:
+                fields = sorted({f for names in CHARACTERISTICS.values() for f in names})
+                self.spc.prime(self.results_store.last(cfg.get("spc_window", 10000), fields))
+
+    def _start_profiling(self):
+        from ui.widgets.perf_overlay import PerfOverlay
+
+        self.perf_overlay = PerfOverlay.install(Window)
+        cfg = load_config()
+        if cfg.get("profile_dump"):
+            self.profile_dumper = profiling.DumpThread(
+                resolve_path(cfg["profile_dump"]), cfg.get("profile_dump_s", 5.0)
+            )
+            self.profile_dumper.start()
+
+    def _start_plc(self):
+        """PLC 轮询在自己的线程里跑，连不上只记错误次数（PlcLink.stats），不影响界面"""
+        cfg = load_config()
+        if not cfg.get("plc_enabled"):
+            return
+        from logic.plc import PlcLink
+
+        self.plc_link = PlcLink(cfg.get("plc_ip", ""), cfg.get("plc_port", 502), state=global_state)
+        self.plc_link.start()
+
+    def _prebuild_next(self, dt):
+        """空闲时每帧建一个页面，第一次切页面就不用等"""
+        if self.root.prebuild():
+            Clock.schedule_once(self._prebuild_next, 0)
+
+    def on_stop(self):
+        if self.results_store is not None:
+            self.results_store.close()
+        if self.profile_dumper is not None:
+            self.profile_dumper.stop()
+        if self.plc_link is not None:
+            self.plc_link.stop()
+
+    def go_home(self, *args):
+        self.root.current = "home"
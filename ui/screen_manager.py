@@ -0,0 +1,70 @@
+import importlib
+
+from kivy.lang import Builder
+from kivy.uix.screenmanager import ScreenManager
+
+from frp.config import resource_path
+from logic import startup_trace
+
+# 页面名 -> (模块, 类名, 要先加载的 kv 文件)。第一次切到该页时才 import / 加载 kv / 建控件
+SCREENS = {
+    "home": ("ui.screens.home", "HomeScreen", ("kv/home.kv",)),
+    "auto": ("ui.screens.auto", "AutoMeasureScreen", ("kv/widgets/live_plot.kv", "kv/auto.kv")),
+    "manual": ("ui.screens.manual", "ManualScreen", ("kv/manual.kv",)),
+    "settings": ("ui.screens.settings", "SettingsScreen", ("kv/settings.kv",)),
+    "result": ("ui.screens.result", "ResultScreen", ("kv/result.kv",)),
+    "alarm": ("ui.screens.alarm", "AlarmScreen", ("kv/alarm.kv",)),
+    "history": (
+        "ui.screens.history",
+        "HistoryScreen",
+        ("kv/widgets/history_table.kv", "kv/history.kv"),
+    ),
+}
+
+
+class LazyScreenManager(ScreenManager):
+    """
+    按需建页面的 ScreenManager：启动时一个页面都不建，
+    get_screen()（切页面时 ScreenManager 自己也调它）发现还没建就当场建出来。
+    首页显示之后可以用 prebuild() 在空闲帧里一帧一个地把其余页面建好。
+    """
+
+    _loaded_kv = set()
+
+    def __init__(self, registry=SCREENS, **kwargs):
+        self.registry = dict(registry)
+        super().__init__(**kwargs)
+
+    def get_screen(self, name):
+        for screen in self.screens:
+            if screen.name == name:
+                return screen
+        if name in self.registry:
+            return self._build(name)
+        return super().get_screen(name)  # 抛 ScreenManagerException
+
+    def has_screen(self, name):
+        return name in self.registry or super().has_screen(name)
+
+    def is_built(self, name) -> bool:
+        return any(s.name == name for s in self.screens)
+
+    def _build(self, name):
+        module, cls_name, kv_files = self.registry[name]
+        with startup_trace.span(f"screen {name}"):
+            cls = getattr(importlib.import_module(module), cls_name)
+            for kv in kv_files:
+                if kv not in self._loaded_kv:
+                    Builder.load_file(resource_path(kv))
+                    self._loaded_kv.add(kv)
+            screen = cls(name=name)
+            self.add_widget(screen)
+        return screen
+
+    def prebuild(self, names=None):
+        """把还没建的页面建掉（每次调用建一个）；返回是否还有没建的"""
+        for name in names or self.registry:
+            if not self.is_built(name):
+                self._build(name)
+                break
+        return any(not self.is_built(n) for n in (names or self.registry))
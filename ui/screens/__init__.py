@@ -1,17 +1,21 @@
-from .alarm import AlarmScreen
-from .auto import AutoMeasureScreen
-from .home import HomeScreen
-from .manual import ManualScreen
-from .result import ResultScreen
-from .settings import SettingsScreen
-from ui.widgets.live_plot import LivePlotWidget
+import importlib
 
-__all__ = [
-    "AlarmScreen",
-    "AutoMeasureScreen",
-    "HomeScreen",
-    "ManualScreen",
-    "ResultScreen",
-    "SettingsScreen",
-    "LivePlotWidget",
-]
+# 页面类按需 import：from ui.screens import AutoMeasureScreen 时才加载对应模块
+SCREEN_MODULES = {
+    "AlarmScreen": ".alarm",
+    "AutoMeasureScreen": ".auto",
+    "HistoryScreen": ".history",
+    "HomeScreen": ".home",
+    "ManualScreen": ".manual",
+    "ResultScreen": ".result",
+    "SettingsScreen": ".settings",
+}
+
+__all__ = list(SCREEN_MODULES)
+
+
+def __getattr__(name):
+    module = SCREEN_MODULES.get(name)
+    if module is None:
+        raise AttributeError(name)
+    return getattr(importlib.import_module(module, __name__), name)
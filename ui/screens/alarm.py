@@ -1,5 +1,30 @@
+import time
+
 from kivymd.uix.screen import MDScreen
 
+from logic.models import global_state
+
 
 class AlarmScreen(MDScreen):
-    pass
+    """报警列表：global_state.alarms 变了就重填（只在本页可见时订阅），新的在上面"""
+
+    def on_pre_enter(self, *args):
+        self._refresh()
+        global_state.subscribe(self._refresh, ("alarms",))
+
+    def on_leave(self, *args):
+        global_state.unsubscribe(self._refresh)
+
+    def _refresh(self, changed=None):
+        alarms = global_state.alarms
+        self.ids.alarm_rv.data = [
+            {
+                "text": f"{time.strftime('%m-%d %H:%M:%S', time.localtime(ts))}   "
+                f"[{source or '-'}]   {message}"
+            }
+            for ts, source, message in reversed(alarms)
+        ]
+        self.ids.alarm_count.text = f"{len(alarms)} alarm(s)" if alarms else "No alarms"
+
+    def on_clear(self):
+        global_state.clear_alarms()
@@ -1,101 +1,233 @@
-import math
-import random
+import time
+from functools import partial
+from pathlib import Path
 
 from kivy.clock import Clock
 from kivymd.uix.screen import MDScreen
 
-from core import frp_core
+from frp.config import load_config
+from logic import profiling
+from logic.acquisition import AcquisitionProcess, AcquisitionWorker
+from logic.capture import CaptureWriter
+from logic.edges import EdgeScanner
+from logic.measurement_flow import STEP_LABELS, MeasureStep
 from logic.models import global_state
+from logic.ringbuffer import RingBuffer
+from logic.sequencer import SequencePlan, Sequencer, SimAxis, Station, SweepStation
+from logic.session import MeasurementSession
+from logic.simulator import PipeGeometry, PipeSimulator, SimulatedSource, simulated_source
+
+# 流程步骤 -> 左边步骤列表的第几行（kv 里的 step_lbl_1~7）
+STEP_INDEX = {
+    MeasureStep.ZERO_PROBE: 1,
+    MeasureStep.LOCATE_EDGE1: 2,
+    MeasureStep.LOCATE_EDGE2: 3,
+    MeasureStep.MOVE_TO_SECTION: 4,
+    MeasureStep.ROTATE_MEASURE: 5,
+    MeasureStep.NEXT_SECTION: 6,
+    MeasureStep.FINISHED: 7,
+}
+
+# 曲线历史缓冲的点数；画的时候按控件宽度抽稀，不再限制显示点数
+HISTORY_CAPACITY = 100_000
+
+# 曲线可选的显示范围：一整圈 / 当前截面 / 整根管
+PLOT_RANGES = ("rev", "section", "pipe")
+
+# UI 刷新周期：只管显示，和采样节奏无关
+UI_REFRESH_S = 1 / 30
+
+# demo：旋转 + 采集那一步大约 2 秒，正好转一圈
+DEMO_DEG_PER_S = 180.0
+# demo：仿真滑台速度
+DEMO_SLIDE_MM_S = 1500.0
 
 
 class AutoMeasureScreen(MDScreen):
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        # 属性都在 super().__init__ 之前设好：kv 规则在里面应用，on_kv_post 会用到
         # 曲线 / 信号
-        self._t = 0.0
-        self._ods = []
-        self._ids = []
+        self._ods = RingBuffer(HISTORY_CAPACITY)
+        self._ids = RingBuffer(HISTORY_CAPACITY)
+        self._plot_range = "rev"
+        self._samples_per_rev = 180
         self._auto_ev = None
+        self._session = None
+        self._worker = None
+        # 采集进程模式（acquisition_process）：曲线 / 数值直接读它的共享内存环
+        self._acq = None
+        self._ring_source = None
+        self._seq_pending = False
+        self._sink_alarmed = False
+
+        # 步骤显示 & 测量流程
+        self._painted_step = None  # 当前已经高亮的步骤号
+        self._sequencer = None
+        super().__init__(**kwargs)
 
-        # 步骤显示 & demo 状态机
-        self._current_step = 1  # 1~7
-        self._step_ev = None  # 刷新高亮
-        self._step_demo_ev = None  # demo：每秒推进一步
+    def _stop_timers(self):
+        """把定时器、测量流程和采集线程都停掉，防止重复注册 / 后台空跑"""
+        if self._auto_ev is not None:
+            self._auto_ev.cancel()
+            self._auto_ev = None
+        if self._sequencer is not None:
+            self._sequencer.cancel()
+            self._sequencer = None
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+        # 读环的采集线程停了之后再停采集进程、释放共享内存
+        if self._acq is not None:
+            self._acq.stop()
+            self._acq = None
+            self._ring_source = None
 
     def _restart_demo(self):
-        """重置 demo 状态机 + 曲线，每次进入 Auto 页都要调用"""
-
-        # 先把旧定时器全部关掉，防止重复注册
-        for ev_name in ("_auto_ev", "_step_ev", "_step_demo_ev"):
-            ev = getattr(self, ev_name, None)
-            if ev is not None:
-                ev.cancel()
-                setattr(self, ev_name, None)
-
-        # 重置 C++ 核心 & 本地数据
-        frp_core.reset()
-        self._t = 0.0
+        """重新开始一根管（仿真轴 + 仿真信号），每次进入 Auto 页都要调用"""
+
+        # 先把旧定时器 / 采集线程全部关掉
+        self._stop_timers()
+
+        # 新开一根管的测量 & 重置本地数据
+        cfg = load_config()
+        self._samples_per_rev = int(cfg.get("samples_per_rev", 180))
+        recorder = None
+        if cfg.get("capture_dir"):
+            name = time.strftime("pipe_%Y%m%d_%H%M%S.frpcap")
+            recorder = CaptureWriter(Path(cfg["capture_dir"]) / name, config=cfg)
+        sections = int(cfg.get("sections_per_pipe", 3))
+        self._session = MeasurementSession(
+            max_sections=sections, samples_per_rev=self._samples_per_rev, recorder=recorder
+        )
+        global_state.session = self._session
         self._ods.clear()
         self._ids.clear()
 
         # 从第 1 步开始
-        self._current_step = 1
-        global_state.live.current_step = self._current_step
-
-        # 曲线 / 数值定时刷新
-        self._auto_ev = Clock.schedule_interval(self._demo_measure_loop, 0.05)
-
-        # 步骤高亮轮询（0.2s 改一次颜色）
-        self._step_ev = Clock.schedule_interval(self._update_step_indicator, 0.2)
+        live = global_state.live
+        live.current_step = 1
+
+        # 找边：仿真管子带管端，外径探头的读数过管端时从 0 跳到外径
+        search_mm = float(cfg.get("edge_search_mm", 0.0))
+        geometry = PipeGeometry(ends=search_mm > 0)
+        sinks = [self._session.add_samples]
+        scanner = None
+        if search_mm > 0:
+            scanner = EdgeScanner(geometry.od_mm / 2, geometry.od_mm / 4)
+            sinks.append(scanner.add_samples)
+
+        # 采集：按 samples_per_rev 点 / 圈出数，直接写进 session
+        rate_hz = self._samples_per_rev * DEMO_DEG_PER_S / 360.0
+        seed = cfg.get("sim_seed", 0)
+        if cfg.get("acquisition_process"):
+            # 采集进程写共享内存环，本进程的采集线程从环里读出来写 session；
+            # 界面不走队列（queue_len=0），直接读环里最新的窗口
+            self._acq = AcquisitionProcess(
+                partial(simulated_source, geometry, rate_hz, DEMO_DEG_PER_S, seed),
+                capacity=int(cfg.get("acquisition_ring", 1 << 18)),
+            )
+            self._acq.slide_mm = live.slide_pos_mm
+            self._acq.start()
+            self._ring_source = self._acq.source()
+            self._worker = AcquisitionWorker(self._ring_source, sinks=sinks, queue_len=0)
+            acq = self._acq
 
-        # demo 状态机：每 1 秒自动下一步
-        self._step_demo_ev = Clock.schedule_interval(self._demo_step_advance, 1.0)
+            def follow_slide(pos):
+                acq.slide_mm = pos
 
-        # 立刻高亮一次
-        self._update_step_indicator(0)
+        else:
+            sim = PipeSimulator(geometry, rate_hz=rate_hz, deg_per_s=DEMO_DEG_PER_S, seed=seed)
+            source = SimulatedSource(sim)
+            source.slide_mm = live.slide_pos_mm
+            self._worker = AcquisitionWorker(source, sinks=sinks)
+
+            def follow_slide(pos):
+                sim.slide_mm = pos
+
+        self._worker.start()
+
+        # 测量流程：仿真滑台的位置同步给仿真信号源和界面
+        def on_slide(pos):
+            follow_slide(pos)
+            live.slide_pos_mm = pos
+
+        slide = SimAxis(DEMO_SLIDE_MM_S, position=live.slide_pos_mm, on_move=on_slide)
+        edges = (0.0, geometry.length_mm)
+        if scanner is not None:
+            station = SweepStation(
+                slide, SimAxis(DEMO_DEG_PER_S), scanner, edge_positions=edges, search_mm=search_mm
+            )
+        else:
+            station = Station(slide, SimAxis(DEMO_DEG_PER_S), edge_positions=edges)
+        self._sequencer = Sequencer(
+            station, SequencePlan(sections=sections), on_step=self._on_sequencer_step
+        )
+        # 采集进程起来要几百毫秒（spawn 要重新 import），等环里有数据再开始流程，
+        # 否则第一个截面转完了还没采到点
+        self._seq_pending = self._acq is not None
+        self._sink_alarmed = False
+        if not self._seq_pending:
+            self._sequencer.start(self._session, done=self._on_sequencer_done)
+
+        # 曲线 / 数值按 UI 自己的节奏刷新
+        refresh = profiling.interval("auto.ui_refresh", UI_REFRESH_S, self._ui_refresh)
+        self._auto_ev = Clock.schedule_interval(refresh, UI_REFRESH_S)
+
+        # 立刻整排重画一次；之后只在步骤号变化时改两个 label
+        self._painted_step = None
+        self._update_step_indicator()
 
     def on_kv_post(self, base_widget):
-        """第一次 kv 构建完毕时跑一次"""
-        self._restart_demo()
+        """第一次 kv 构建完毕：只画一次步骤列表，流程等真正进入本页再开始"""
+        self._update_step_indicator()
 
     def on_pre_enter(self, *args):
         """每次切到 Auto 页时都从第 1 步重新开始"""
         self._restart_demo()
-
-    # ---------- demo 状态机：1 秒一步 ----------
-
-    def _demo_step_advance(self, dt):
-        """
-        demo 版：每秒把步骤 +1，到 7 时自动 compute 并跳到 Result
-        """
-        if self._current_step < 7:
-            self._current_step += 1
-            global_state.live.current_step = self._current_step
-        else:
-            # 已经在最后一步：执行一次计算并跳转
-            self._finish_auto_sequence()
-            # 取消自己的定时器
-            if self._step_demo_ev is not None:
-                self._step_demo_ev.cancel()
-                self._step_demo_ev = None
-            return False  # 不再重复调用
-
-        return True
+        global_state.live.subscribe(self._update_step_indicator, ("current_step",))
+
+    # ---------- 测量流程回调（在流程线程里调用）----------
+
+    def _on_sequencer_step(self, step, section):
+        live = global_state.live
+        idx = STEP_INDEX.get(step)
+        if idx is not None:
+            live.current_step = idx
+        global_state.current_step = STEP_LABELS[step]
+        if step is MeasureStep.FINISHED and self._sequencer and self._sequencer.rejected:
+            live.status_text = f"NG: {self._sequencer.rejected}"
+        if step is MeasureStep.ERROR:
+            seq = self._sequencer
+            reason = str(seq.error) if seq else "sequence error"
+            live.status_text = f"ERROR: {reason}"
+            global_state.raise_alarm(reason, source="Sequencer")
+
+    def _on_sequencer_done(self, result):
+        # 出错 / 被取消时 result 为 None，留在本页显示错误
+        if result is not None:
+            Clock.schedule_once(lambda dt: self._finish_auto_sequence(result))
 
     # ---------- 状态机步骤高亮 ----------
 
     def _get_current_step_index(self) -> int:
+        """步骤号从 global_state 读：测量流程（以后也可以是 PLC 状态机）写这里"""
+        return int(global_state.live.current_step)
+
+    def _update_step_indicator(self, changed=None):
         """
-        现在先用 demo 的 self._current_step。
-        以后接 PLC 状态机时，可以在这里改成从状态机读，比如：
-            return int(global_state.live.current_step)
+        步骤号变化时由 global_state.live 通知（只在本页可见时订阅）。
+        只改上一个和当前这两个 label；_painted_step 为 None 时整排重画。
         """
-        return int(self._current_step)
-
-    def _update_step_indicator(self, dt):
         current = self._get_current_step_index()
+        if current == self._painted_step:
+            return
+        if self._painted_step is None:
+            steps = range(1, 8)
+        else:
+            steps = (self._painted_step, current)
+        self._painted_step = current
 
-        for i in range(1, 8):
+        for i in steps:
             lbl = self.ids.get(f"step_lbl_{i}")
             if not lbl:
                 continue
@@ -108,30 +240,67 @@ class AutoMeasureScreen(MDScreen):
 
     # ---------- 自动测量 + 曲线刷新 ----------
 
-    def _demo_measure_loop(self, dt):
-        """模拟旋转采样 + 调用 C++ 核心 + 刷新 UI + 曲线"""
-
-        # 兜底：防止极端情况下属性没初始化
-        if not hasattr(self, "_ods"):
-            self._t = 0.0
-            self._ods = []
-            self._ids = []
-
-        self._t += 5.0
-        angle = self._t % 360
-
-        # 模拟外径 / 内径的一个小波动
-        od = 152.0 + 0.2 * math.sin(math.radians(angle)) + random.uniform(-0.02, 0.02)
-        id_ = 76.0 + 0.05 * math.cos(math.radians(angle)) + random.uniform(-0.01, 0.01)
+    def _ui_refresh(self, dt):
+        """取走采集线程攒下的数据，刷新数值 + 曲线（只在 UI 线程里跑）"""
+        worker = self._worker
+        if worker is None:
+            return
+        # 先看队列深度再取数据，drain 之后队列总是空的
+        stats = worker.stats()
+        if stats["sink_errors"] and not self._sink_alarmed:
+            # session 写不进去时结果会是空的 / NG，这里报一次警，原因写在报警里
+            self._sink_alarmed = True
+            global_state.raise_alarm(stats["last_sink_error"], source="Acquisition")
+        if self._acq is not None:
+            self._ui_refresh_ring()
+            return
+        data = worker.drain()
+        if data is None:
+            return
+        angles, ods, ids_, _ = data
+        angle, od, id_ = float(angles[-1]), float(ods[-1]), float(ids_[-1])
+        self._show_live_values(angle, od, id_)
 
+        ids = self.ids
+        if "acq_queue_value" in ids:
+            ids.acq_queue_value.text = f"{stats['queue_depth']} / {stats['queue_high_water']}"
+        if "acq_drop_value" in ids:
+            ids.acq_drop_value.text = str(stats["blocks_dropped"])
+        self._show_live_stats()
+
+        # ---- 曲线数据更新（环形缓冲，满了自动挤掉最旧的点）----
+        self._ods.extend(ods)
+        self._ids.extend(ids_)
+
+        self._refresh_plot()
+
+    def _ui_refresh_ring(self):
+        """采集进程模式：数值取环里最后一个点，曲线直接画环里的窗口，不再另存历史"""
+        latest = self._acq.ring.latest()
+        if latest is None:
+            return
+        if self._seq_pending:
+            self._seq_pending = False
+            self._sequencer.start(self._session, done=self._on_sequencer_done)
+        angle, od, id_, _ = latest
+        self._show_live_values(angle, od, id_)
+
+        # 队列一栏显示采集线程还没从环里读走的点数，丢弃一栏显示读慢了被跳过的点数
+        ids = self.ids
+        src = self._ring_source
+        if "acq_queue_value" in ids:
+            ids.acq_queue_value.text = f"{src.lag} pts"
+        if "acq_drop_value" in ids:
+            ids.acq_drop_value.text = str(src.skipped)
+        self._show_live_stats()
+        self._refresh_plot()
+
+    def _show_live_values(self, angle, od, id_):
         # 写入全局实时状态
         global_state.live.outer_diameter = od
         global_state.live.inner_diameter = id_
         global_state.live.angle_deg = angle
 
-        # 推给 C++ 核心
-        frp_core.add_sample(angle, od, id_)
-
         # 数值显示
         ids = self.ids
         if "auto_outer_value" in ids:
@@ -141,47 +310,92 @@ class AutoMeasureScreen(MDScreen):
         if "auto_angle" in ids:
             ids.auto_angle.text = f"{angle:0.1f} °"
 
-        # ---- 曲线数据更新（滚动窗口）----
-        self._ods.append(od)
-        self._ids.append(id_)
-
-        max_points = 200
-        if len(self._ods) > max_points:
-            self._ods.pop(0)
-            self._ids.pop(0)
-
-        plot = ids.get("live_plot")
-        if plot:
+    def _show_live_stats(self):
+        """当前截面的增量估计：平均直径 / 圆度 / 同心度，旋转途中就在变"""
+        ids = self.ids
+        if "live_avg_value" not in ids or self._session is None:
+            return
+        st = self._session.live_stats()
+        if not st.n:
+            return
+        ids.live_avg_value.text = f"{st.od_mean:0.3f} / {st.id_mean:0.3f} mm"
+        ids.live_round_value.text = (
+            f"{st.roundness_outer:0.3f} / {st.roundness_inner:0.3f} mm ({st.coverage:0.0%})"
+        )
+        ids.live_conc_value.text = f"{st.concentricity:0.3f} mm"
+
+    # ---------- 曲线显示范围 ----------
+
+    def set_plot_range(self, name: str):
+        """切换曲线显示范围："rev" / "section" / "pipe"（kv 里的按钮调用）"""
+        if name in PLOT_RANGES:
+            self._plot_range = name
+            self._refresh_plot()
+
+    def _plot_series(self):
+        """
+        按当前显示范围取 OD / ID 两条曲线的数据（长度不限，控件自己抽稀）。
+        返回 (od, id, start)：start 不是 None 时数据是共享内存环的视图，画完要用 ring.valid(start) 检查。
+        """
+        session = self._session
+        if self._plot_range == "section" and session is not None:
+            sec = session.last_section
+            if sec is not None and sec.n:
+                _, od, id_, _ = sec.columns()
+                return od, id_, None
+        elif self._plot_range == "pipe" and session is not None and session.n_samples:
+            _, od, id_, _ = session.columns()
+            return od, id_, None
+
+        # "rev"：历史里最近一整圈；截面 / 整管还没有数据时先显示全部历史
+        n = self._samples_per_rev if self._plot_range == "rev" else HISTORY_CAPACITY
+        if self._acq is not None:
+            (_, ods, ids_, _), start = self._acq.ring.window(n)
+            return ods, ids_, start
+        if self._plot_range == "rev":
+            return self._ods.view()[-n:], self._ids.view()[-n:], None
+        return self._ods, self._ids, None
+
+    def _refresh_plot(self):
+        plot = self.ids.get("live_plot")
+        if not plot:
+            return
+        # 环的视图可能在画的过程中被采集进程覆盖：重取一次最新窗口再画（一帧最多重画一次）
+        for _ in range(2):
+            od_series, id_series, start = self._plot_series()
             plot.update_data(
-                self._ods,
-                self._ids,
+                od_series,
+                id_series,
                 y_min=151.5,
                 y_max=152.5,
                 inner_y_min=75.8,
                 inner_y_max=76.2,
             )
+            if start is None or self._acq.ring.valid(start):
+                return
 
     # ---------- 结束时统一收尾 ----------
 
-    def _finish_auto_sequence(self):
-        """最后一步：计算结果 + 跳转 Result + 收掉定时器（demo 版）"""
-        res = frp_core.compute()
+    def _finish_auto_sequence(self, res):
+        """流程跑完：显示结果 + 跳转 Result + 收掉定时器 / 采集线程"""
+        if self.manager is None or self.manager.current != self.name:
+            return  # 结果出来前已经离开本页
+        meta = {}
+        session, seq = self._session, self._sequencer
+        if session is not None:
+            meta["rejected"] = session.rejected
+            if session.recorder is not None:
+                meta["capture"] = str(session.recorder.path)
+        if seq is not None:
+            meta["cycle_s"] = seq.cycle_time_s
         result_screen = self.manager.get_screen("result")
-        result_screen.show_result(res)
+        result_screen.show_result(res, **meta)
         self.manager.current = "result"
 
-        # demo：算完后把定时器都停掉，避免后台还在跑
-        if self._auto_ev is not None:
-            self._auto_ev.cancel()
-            self._auto_ev = None
-        if self._step_ev is not None:
-            self._step_ev.cancel()
-            self._step_ev = None
+        # 算完后把定时器 / 采集线程都停掉，避免后台还在跑
+        self._stop_timers()
 
     def on_leave(self, *args):
-        """如果从 Auto 手动跳走，也顺便把 demo 定时器停掉"""
-        for ev_name in ("_auto_ev", "_step_ev", "_step_demo_ev"):
-            ev = getattr(self, ev_name, None)
-            if ev is not None:
-                ev.cancel()
-                setattr(self, ev_name, None)
+        """如果从 Auto 手动跳走，也顺便把流程 / 定时器 / 采集线程停掉"""
+        global_state.live.unsubscribe(self._update_step_indicator)
+        self._stop_timers()
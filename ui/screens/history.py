@@ -0,0 +1,72 @@
+from kivy.clock import Clock
+from kivymd.app import MDApp
+from kivymd.uix.screen import MDScreen
+
+from logic.history import HistoryPager
+
+# OK/NG 筛选按钮依次切换的状态：(按钮文字, ok 条件)
+OK_FILTERS = (("All", None), ("OK only", True), ("NG only", False))
+
+
+class HistoryScreen(MDScreen):
+    """结果历史：数据在结果库里，按页取，排序 / 筛选都是 SQL 做"""
+
+    def __init__(self, **kwargs):
+        self.pager = None
+        self._ok_filter = 0
+        super().__init__(**kwargs)
+
+    def on_pre_enter(self, *args):
+        store = getattr(MDApp.get_running_app(), "results_store", None)
+        if store is None:
+            self.ids.page_label.text = "Results database disabled (see results_db in config)"
+            return
+        if self.pager is None or self.pager.store is not store:
+            self.pager = HistoryPager(store)
+            self.ids.table.pager = self.pager
+        # 离开期间可能又测了几根管：总数 / 页缓存作废，但保留排序和筛选。
+        # 先显示已经落盘的，写线程把队列里剩下的写完后再刷新一次（不在主线程里等）
+        self._reload()
+        store.flush_async(lambda: Clock.schedule_once(self._on_flushed))
+
+    def _on_flushed(self, dt):
+        if self.pager is not None and self.manager is not None and self.manager.current == self.name:
+            self._reload()
+
+    def _reload(self):
+        self.pager.invalidate()
+        self.pager.goto(self.pager.page)
+        self._refresh()
+
+    def on_ok_filter(self):
+        self._ok_filter = (self._ok_filter + 1) % len(OK_FILTERS)
+        self.ids.ok_filter_button.text = OK_FILTERS[self._ok_filter][0]
+        self.on_apply_filters()
+
+    def on_apply_filters(self):
+        if self.pager is None:
+            return
+        self.pager.set_filters(
+            batch=self.ids.batch_filter.text.strip(),
+            lot=self.ids.lot_filter.text.strip(),
+            ok=OK_FILTERS[self._ok_filter][1],
+        )
+        self._refresh()
+
+    def on_page(self, delta=None, page=None):
+        """翻页：delta 相对翻，page 直接跳（-1 = 最后一页）"""
+        if self.pager is None:
+            return
+        if page is not None:
+            self.pager.goto(self.pager.pages - 1 if page < 0 else page)
+        else:
+            self.pager.goto(self.pager.page + delta)
+        self._refresh()
+
+    def _refresh(self):
+        self.ids.table.refresh()
+        first, last = self.pager.span()
+        self.ids.page_label.text = (
+            f"{first}-{last} of {self.pager.total}   "
+            f"(page {self.pager.page + 1} / {self.pager.pages})"
+        )
@@ -1,42 +1,45 @@
-from kivy.clock import Clock
 from kivymd.uix.screen import MDScreen
 
+from logic import profiling
 from logic.models import global_state
 
+# LiveData 字段 -> (label id, 显示格式)
+LABEL_FIELDS = {
+    "status_text": ("status_label", "{}"),
+    "outer_diameter": ("outer_value", "{:0.2f} mm"),
+    "inner_diameter": ("inner_value", "{:0.2f} mm"),
+    "angle_deg": ("angle_value", "{:0.1f} °"),
+    "slide_pos_mm": ("slide_value", "{:0.1f} mm"),
+}
+
 
 class HomeScreen(MDScreen):
     def on_kv_post(self, base_widget):
         # kv 绑定完成后调用，这时 ids 一定已经就绪
         print("HomeScreen ids after kv:", list(self.ids.keys()))
         # 这里先刷新一次
-        self.update_labels(0)
-        # 如需实时刷新，可开启定时器
-        if not hasattr(self, "_home_ev"):
-            self._home_ev = Clock.schedule_interval(self.update_labels, 0.2)
-
-    def update_labels(self, dt):
-        ids = self.ids
-
-        status_label = ids.get("status_label")
-        outer_value = ids.get("outer_value")
-        inner_value = ids.get("inner_value")
-        angle_value = ids.get("angle_value")
-        slide_value = ids.get("slide_value")
+        self.update_labels()
 
-        if status_label:
-            status_label.text = global_state.live.status_text
+    def on_pre_enter(self, *args):
+        # 只在本页可见时订阅；进来先整页刷新一次，之后只改变了的字段
+        self.update_labels()
+        global_state.live.subscribe(self.update_labels, LABEL_FIELDS)
 
-        if outer_value:
-            outer_value.text = f"{global_state.live.outer_diameter:0.2f} mm"
+    def on_leave(self, *args):
+        global_state.live.unsubscribe(self.update_labels)
 
-        if inner_value:
-            inner_value.text = f"{global_state.live.inner_diameter:0.2f} mm"
-
-        if angle_value:
-            angle_value.text = f"{global_state.live.angle_deg:0.1f} °"
-
-        if slide_value:
-            slide_value.text = f"{global_state.live.slide_pos_mm:0.1f} mm"
+    @profiling.timed("home.update_labels")
+    def update_labels(self, changed=None):
+        """changed 为变过的字段名集合；None = 全部刷新"""
+        ids = self.ids
+        live = global_state.live
+        for name in LABEL_FIELDS if changed is None else changed:
+            spec = LABEL_FIELDS.get(name)
+            if spec is None:
+                continue
+            label = ids.get(spec[0])
+            if label:
+                label.text = spec[1].format(getattr(live, name))
 
     def on_start_button(self):
         self.manager.current = "auto"
@@ -17,21 +17,9 @@ class ManualScreen(MDScreen):
     rotary_step_deg = NumericProperty(5.0)
 
     def on_kv_post(self, base_widget):
-        """kv 绑定完成后，先把 global_state 初始化各个位置量"""
+        """kv 绑定完成后，先按 global_state 里的各轴位置刷一遍显示"""
         live = global_state.live
 
-        def init_attr(name, default):
-            if not hasattr(live, name):
-                setattr(live, name, default)
-            return getattr(live, name)
-
-        # 保证这些属性存在
-        init_attr("od_slide_mm", 0.0)  # 外径滑台
-        init_attr("id_slide_mm", 0.0)  # 内径滑台（共轨）
-        init_attr("id_head_mm", 0.0)  # 内径测头伸缩
-        init_attr("pipe_angle_deg", 0.0)  # 主旋转
-        init_attr("aux_angle_deg", 0.0)  # 从旋转
-
         ids = self.ids
         # 位置显示
         if "od_pos_label" in ids:
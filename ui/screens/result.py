@@ -1,12 +1,16 @@
 from kivy.metrics import dp
+from kivymd.app import MDApp
 from kivymd.uix.datatables import MDDataTable
 from kivymd.uix.screen import MDScreen
 
+from frp.config import load_config
+
 
 class ResultScreen(MDScreen):
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        # 先于 super().__init__：kv 规则在里面应用，on_kv_post 会用到
         self.data_table = None
+        super().__init__(**kwargs)
 
     def on_kv_post(self, base_widget):
         """kv 绑定完成后，在装好的容器里创建 MDDataTable"""
@@ -30,10 +34,13 @@ class ResultScreen(MDScreen):
             )
             container.add_widget(self.data_table)
 
-    def show_result(self, res):
+    def show_result(self, res, **meta):
         """
-        把一次测量的结果塞成“单行报表”
+        把一次测量的结果塞成“单行报表”，同时存进结果库。
+        meta 是跟结果一起存的附加信息（rejected / cycle_s / capture，见 logic.results_db）
         """
+        self._record_result(res, meta)
+
         # 先更新表格
         if self.data_table is None:
             # 防御：kv 还没跑 on_kv_post 的极端情况
@@ -57,3 +64,18 @@ class ResultScreen(MDScreen):
         ids = self.ids
         if "res_ok_label" in ids:
             ids.res_ok_label.text = "OK" if res.ok_flag else "NG"
+
+    def _record_result(self, res, meta):
+        """
+        喂给 SPC（违规会进报警列表），再排队写进结果库（后台线程落盘，不卡界面）；
+        批次 / 料号取当前配置
+        """
+        app = MDApp.get_running_app()
+        spc = getattr(app, "spc", None)
+        if spc is not None:
+            spc.add_result(res)
+        store = getattr(app, "results_store", None)
+        if store is None:
+            return
+        cfg = load_config()
+        store.put(res, batch=cfg.get("batch_id", ""), lot=cfg.get("lot_id", ""), **meta)
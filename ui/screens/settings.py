@@ -1,6 +1,6 @@
 from kivymd.uix.screen import MDScreen
 
-from ui.config import load_config, save_config
+from frp.config import load_config, save_config
 
 
 class SettingsScreen(MDScreen):
@@ -15,6 +15,10 @@ class SettingsScreen(MDScreen):
             ids.plc_port_field.text = str(cfg.get("plc_port", "502"))
         if "samples_field" in ids:
             ids.samples_field.text = str(cfg.get("samples_per_rev", "180"))
+        if "batch_field" in ids:
+            ids.batch_field.text = cfg.get("batch_id", "")
+        if "lot_field" in ids:
+            ids.lot_field.text = cfg.get("lot_id", "")
 
     def on_apply_button(self):
         """点击“应用 / 保存”按钮时写回 JSON"""
@@ -36,5 +40,10 @@ class SettingsScreen(MDScreen):
             except Exception:
                 pass
 
+        if "batch_field" in ids:
+            cfg["batch_id"] = ids.batch_field.text.strip()
+        if "lot_field" in ids:
+            cfg["lot_id"] = ids.lot_field.text.strip()
+
         save_config(cfg)
         # 这里如果要同步到测量核心，可以在后面派发事件 / 调用接口
@@ -1,3 +1,20 @@
-from .live_plot import LivePlotWidget
+from kivy.factory import Factory
 
-__all__ = ["LivePlotWidget"]
+# 只登记模块名，kv 第一次用到这些类时 Factory 才 import（启动时不加载）
+WIDGETS = {
+    "HistoryRow": "ui.widgets.history_table",
+    "HistoryTable": "ui.widgets.history_table",
+    "LivePlotWidget": "ui.widgets.live_plot",
+    "PerfOverlay": "ui.widgets.perf_overlay",
+}
+
+for _name, _module in WIDGETS.items():
+    Factory.register(_name, module=_module)
+
+__all__ = list(WIDGETS)
+
+
+def __getattr__(name):
+    if name in WIDGETS:
+        return getattr(Factory, name)
+    raise AttributeError(name)
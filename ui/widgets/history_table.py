@@ -0,0 +1,71 @@
+from kivy.properties import BooleanProperty, ListProperty, NumericProperty, ObjectProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.label import MDLabel
+
+from logic.history import HISTORY_COLUMNS
+
+OK_COLOR = (0.4, 1, 0.5, 1)
+NG_COLOR = (1, 0.35, 0.35, 1)
+
+
+class HistoryRow(RecycleDataViewBehavior, BoxLayout):
+    """RecycleView 的一行：每列一个 label，建一次之后只换文字（行控件会被复用）"""
+
+    cells = ListProperty()
+    ok = BooleanProperty(True)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._labels = [
+            MDLabel(halign="center", font_style="Body2", theme_text_color="Custom")
+            for _ in HISTORY_COLUMNS
+        ]
+        for lbl in self._labels:
+            self.add_widget(lbl)
+
+    def refresh_view_attrs(self, rv, index, data):
+        color = OK_COLOR if data.get("ok", True) else NG_COLOR
+        for lbl, text in zip(self._labels, data["cells"]):
+            lbl.text = text
+            lbl.text_color = color
+        return super().refresh_view_attrs(rv, index, data)
+
+
+class HistoryTable(BoxLayout):
+    """
+    表头 + RecycleView。只显示 pager（logic.history.HistoryPager）的当前页，
+    RecycleView 只给看得见的那几行建控件；点表头按该列排序（再点一次反向）。
+    """
+
+    pager = ObjectProperty(None, allownone=True)
+    row_height = NumericProperty(32)
+
+    def on_kv_post(self, base_widget):
+        header = self.ids.header
+        self._header_buttons = {}
+        for name, title, _ in HISTORY_COLUMNS:
+            btn = MDFlatButton(text=title, size_hint_x=1)
+            btn.bind(on_release=lambda _btn, name=name: self.sort_by(name))
+            header.add_widget(btn)
+            self._header_buttons[name] = (btn, title)
+
+    def sort_by(self, column):
+        if self.pager is None:
+            return
+        self.pager.set_sort(column)
+        self.refresh()
+
+    def refresh(self):
+        """重新取当前页（页缓存命中时不查库）"""
+        if self.pager is None:
+            self.ids.rv.data = []
+            return
+        for name, (btn, title) in self._header_buttons.items():
+            mark = ""
+            if name == self.pager.sort_by:
+                mark = " v" if self.pager.descending else " ^"
+            btn.text = title + mark
+        self.ids.rv.data = self.pager.rows()
+        self.ids.rv.scroll_y = 1
@@ -1,13 +1,56 @@
-from kivy.properties import ListProperty
+import numpy as np
+from kivy.graphics import Color, Mesh
 from kivy.uix.widget import Widget
 
+from logic import profiling
+from logic.plot_math import autoscale, new_vertex_buffer, series_to_vertices
+from logic.ringbuffer import RingBuffer
+
+# 每条曲线最多画多少个顶点（Mesh 的 index 是 uint16，上限 65535）；
+# 抽稀后每像素 2 个点，够 4096 像素宽
+MAX_POINTS = 8192
+
 
 class LivePlotWidget(Widget):
-    """简单工业风实时曲线控件：黑底 + 两条滚动线"""
+    """简单工业风实时曲线控件：黑底 + 两条滚动线
+
+    两条线都是 line_strip 模式的 Mesh，顶点放在预分配的 float32 数组里，
+    Kivy 直接按 buffer 原地读取，每帧不再重建 Python 点列表。
+    数据多于每像素 2 个点时先做 min-max 抽稀，顶点数只跟控件宽度有关。
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._outer_verts = new_vertex_buffer(MAX_POINTS)
+        self._inner_verts = new_vertex_buffer(MAX_POINTS)
+        self._indices = np.arange(MAX_POINTS, dtype=np.uint16)
+        self._outer_n = 0
+        self._inner_n = 0
+
+        with self.canvas.after:
+            Color(0.49, 0.88, 1, 1)  # 青色：外径
+            self._outer_mesh = Mesh(mode="line_strip")
+            Color(0.8, 0.4, 1, 1)  # 紫色：内径
+            self._inner_mesh = Mesh(mode="line_strip")
 
-    outer_points = ListProperty([])
-    inner_points = ListProperty([])
+    @staticmethod
+    def _values_and_range(data):
+        """RingBuffer 直接拿窗口视图和增量维护的 min/max；普通序列现算"""
+        if isinstance(data, RingBuffer):
+            if not len(data):
+                return None, 0.0, 0.0
+            return data.view(), data.min(), data.max()
+        values = np.asarray(data, dtype=np.float64).reshape(-1)
+        if not values.size:
+            return None, 0.0, 0.0
+        return values, float(values.min()), float(values.max())
 
+    def _push(self, mesh, verts, n):
+        # 同一块内存重新赋一次，Kivy 才会标记需要重新上传
+        mesh.vertices = verts[:n].reshape(-1)
+        mesh.indices = self._indices[:n]
+
+    @profiling.timed("live_plot.update_data")
     def update_data(
         self,
         od_list,
@@ -17,49 +60,39 @@ class LivePlotWidget(Widget):
         inner_y_min=None,
         inner_y_max=None,
     ):
-        """按时间顺序滚动显示，外径用 y_min/y_max，内径用自己的一套缩放"""
+        """按时间顺序滚动显示，外径用 y_min/y_max，内径用自己的一套缩放
+
+        od_list / id_list 可以是 RingBuffer、numpy 数组或普通列表，长度不限。
+        """
 
-        if not self.width or not self.height or not od_list or not id_list:
+        if not self.width or not self.height:
+            return
+
+        od_vals, _, _ = self._values_and_range(od_list)
+        id_vals, id_lo, id_hi = self._values_and_range(id_list)
+        if od_vals is None or id_vals is None:
             return
 
         # 防御：长度不一致直接放弃这一帧
-        if len(od_list) != len(id_list):
+        if od_vals.shape[0] != id_vals.shape[0]:
             return
 
         w, h = self.width, self.height
         x0, y0 = self.x, self.y
-        n = len(od_list) - 1 if len(od_list) > 1 else 1
 
         # ---- 内径的纵轴范围：自动按当前窗口数据自适应缩放 ----
         if inner_y_min is None or inner_y_max is None:
-            v_min = min(id_list)
-            v_max = max(id_list)
-            span = v_max - v_min
-            if span == 0:
-                # 完全不变时给一点假的跨度，避免全挤在中间
-                span = 0.01
-            # 给一点边界余量，避免贴边
-            inner_y_min = v_min - 0.3 * span
-            inner_y_max = v_max + 0.3 * span
-
-        def to_points(values, vmin, vmax):
-            pts = []
-            for i, val in enumerate(values):
-                # X：按索引线性铺满整个宽度
-                x = x0 + (i / n) * w
-
-                # Y：映射到高度的 10%~90%
-                if vmax == vmin:
-                    y_norm = 0.5
-                else:
-                    y_norm = (val - vmin) / (vmax - vmin)
-                y_norm = max(0.0, min(1.0, y_norm))
-                y = y0 + 0.1 * h + y_norm * 0.8 * h
-
-                pts.extend([x, y])
-            return pts
+            inner_y_min, inner_y_max = autoscale(id_lo, id_hi)
 
+        # 每条线先 min-max 抽稀到每像素最多 2 个点，再映射成顶点
         # 外径：用 y_min / y_max（绝对值）
-        self.outer_points = to_points(od_list, y_min, y_max)
+        self._outer_n = series_to_vertices(
+            od_vals, y_min, y_max, x0, y0, w, h, self._outer_verts
+        )
         # 内径：用 inner_y_min / inner_y_max（局部自动缩放）
-        self.inner_points = to_points(id_list, inner_y_min, inner_y_max)
+        self._inner_n = series_to_vertices(
+            id_vals, inner_y_min, inner_y_max, x0, y0, w, h, self._inner_verts
+        )
+
+        self._push(self._outer_mesh, self._outer_verts, self._outer_n)
+        self._push(self._inner_mesh, self._inner_verts, self._inner_n)
@@ -0,0 +1,85 @@
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+
+from logic import profiling
+
+# 浮层刷新周期：只在显示时刷新
+REFRESH_S = 0.5
+# F12
+TOGGLE_KEY = 293
+
+
+class PerfOverlay(Label):
+    """
+    性能统计浮层：盖在所有页面上面（直接加在 Window 上），F12 显示 / 隐藏。
+    内容来自 logic.profiling.snapshot()：帧率、各回调耗时、定时器抖动、ctypes 调用次数。
+    """
+
+    def __init__(self, window=Window, **kwargs):
+        self._window = window
+        self._ev = None
+        kwargs.setdefault("font_name", "RobotoMono-Regular")
+        kwargs.setdefault("font_size", "12sp")
+        kwargs.setdefault("color", (0.85, 1, 0.85, 1))
+        kwargs.setdefault("size_hint", (None, None))
+        kwargs.setdefault("halign", "left")
+        kwargs.setdefault("valign", "top")
+        kwargs.setdefault("padding", (8, 6))
+        super().__init__(**kwargs)
+        with self.canvas.before:
+            Color(0, 0, 0, 0.7)
+            self._bg = Rectangle()
+        self.bind(texture_size=self._layout)
+
+    @classmethod
+    def install(cls, window=Window):
+        """绑定 F12；返回浮层（初始隐藏）。Window 只弱引用回调，调用方要留着返回值"""
+        overlay = cls(window=window)
+        window.bind(on_key_down=overlay._on_key_down)
+        return overlay
+
+    def _layout(self, *args):
+        self.size = self.texture_size
+        self.pos = (8, self._window.height - self.height - 8)
+        self._bg.pos = self.pos
+        self._bg.size = self.size
+
+    @property
+    def shown(self) -> bool:
+        return self._ev is not None
+
+    def toggle(self):
+        if self.shown:
+            self._ev.cancel()
+            self._ev = None
+            self._window.remove_widget(self)
+        else:
+            profiling.enable()  # 没开统计时按 F12 也直接开始记
+            self._window.add_widget(self)
+            self._ev = Clock.schedule_interval(
+                profiling.interval("perf_overlay.refresh", REFRESH_S, self.refresh), REFRESH_S
+            )
+            self.refresh()
+
+    def _on_key_down(self, window, key, *args):
+        if key == TOGGLE_KEY:
+            self.toggle()
+            return True
+        return False
+
+    def refresh(self, dt=None):
+        snap = profiling.snapshot()
+        lines = [f"FPS {Clock.get_fps():5.1f}   uptime {snap['uptime_s']:.0f} s"]
+        if snap["timers"]:
+            lines.append(f"{'':32}{'n':>8}{'mean':>9}{'p95':>9}{'max':>9}  ms")
+            for name, h in snap["timers"].items():
+                lines.append(
+                    f"{name[:31]:32}{h['count']:>8}{h['mean_ms']:>9.2f}"
+                    f"{h['p95_ms']:>9.2f}{h['max_ms']:>9.2f}"
+                )
+        for name, n in snap["counters"].items():
+            lines.append(f"{name[:31]:32}{n:>8}")
+        self.text = "\n".join(lines)
+        self._layout()